@@ -0,0 +1 @@
+"""Performance benchmarks of pipel, see benchmarks/README.md"""
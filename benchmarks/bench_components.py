@@ -0,0 +1,53 @@
+"""Per call overhead of the components, with and without caching"""
+import itertools
+import os
+import tempfile
+
+from pipel import UnsafePipelineComponent, PipelineComponent, PipelData, LRUCache, DiskCache
+
+from .common import Results, per_call
+
+
+class UnsafeAdder(UnsafePipelineComponent):
+
+    def _run(self, x):
+        return PipelData(args=(x + 1,))
+
+
+class SafeAdder(PipelineComponent):
+
+    def validate_input(self, data):
+        pass
+
+    def validate_output(self, data):
+        pass
+
+    def _run(self, x):
+        return PipelData(args=(x + 1,))
+
+
+def run(results: Results, quick: bool) -> None:
+    number, repeat = (2_000, 3) if quick else (50_000, 5)
+    data = PipelData(args=(1,))
+    cases = {
+        'unsafe': UnsafeAdder(),
+        'unsafe_lru_cache': UnsafeAdder(cache_size=128),
+        'unsafe_backend_cache': UnsafeAdder(cache=LRUCache(128)),
+        'safe': SafeAdder(),
+        'safe_lru_cache': SafeAdder(cache_size=128),
+    }
+    # Baseline: the bare work of the component
+    results.add('components', 'bare_run', {}, **per_call(lambda: UnsafeAdder._run(None, 1), number, repeat))
+    for name, component in cases.items():
+        results.add('components', name, {}, **per_call(lambda: component(data), number, repeat))
+
+    # Disk cache: a hit only reads, a put writes a new entry
+    with tempfile.TemporaryDirectory() as directory:
+        component = UnsafeAdder(cache=DiskCache(os.path.join(directory, 'cache.sqlite')))
+        results.add('components', 'disk_cache_hit', {}, **per_call(lambda: component(data), number // 10, repeat))
+        counter = itertools.count(2)
+        results.add(
+            'components', 'disk_cache_put', {},
+            **per_call(lambda: component(PipelData(args=(next(counter),))), number // 10, repeat)
+        )
+        component.cache.close()
@@ -0,0 +1,72 @@
+"""DAGPipeline construction and run on wide (fan-out/fan-in) and deep (chain) graphs"""
+import time
+import tracemalloc
+from typing import List, Tuple
+
+from pipel import DAGPipeline, UnsafePipelineComponent, PipelData
+
+from .common import Results, per_call
+
+
+class Counter(UnsafePipelineComponent):
+
+    def _run(self, *args, **kwargs):
+        return PipelData(args=(len(args),))
+
+
+class Payload(UnsafePipelineComponent):
+    """Outputs a new payload of the given size, like a transform producing a copy"""
+
+    def __init__(self, size: int, **kwargs):
+        super().__init__(**kwargs)
+        self.size = size
+
+    def _run(self, *args, **kwargs):
+        return PipelData(args=(bytes(self.size),))
+
+
+def _peak_bytes(func) -> int:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def wide(n: int) -> List[Tuple[int, int]]:
+    """0 -> 1..n-2 -> n-1"""
+    return [(0, i) for i in range(1, n - 1)] + [(i, n - 1) for i in range(1, n - 1)]
+
+
+def deep(n: int) -> List[Tuple[int, int]]:
+    """0 -> 1 -> ... -> n-1"""
+    return [(i, i + 1) for i in range(n - 1)]
+
+
+def run(results: Results, quick: bool, sizes: List[int]) -> None:
+    repeat = 3
+    data = {0: PipelData(args=(1,))}
+    for shape, make_edges in (('wide', wide), ('deep', deep)):
+        for n in sizes:
+            edges = make_edges(n)
+            components = [Counter() for _ in range(n)]
+            params = {'nodes': n}
+            start = time.perf_counter()
+            dag = DAGPipeline(components, edges=edges)
+            results.add('dag', f'{shape}_build', params, best_s=time.perf_counter() - start)
+            number = max(1, 1_000 // n)
+            results.add('dag', f'{shape}_run', params, **per_call(lambda: dag.run(data), number, repeat))
+
+    # Peak memory of run and run(low_memory=True) on large payloads
+    payload_size = 100_000
+    for shape, make_edges in (('wide', wide), ('deep', deep)):
+        for n in (s for s in sizes if s <= 1_000):
+            dag = DAGPipeline([Payload(payload_size) for _ in range(n)], edges=make_edges(n))
+            for low_memory in (False, True):
+                params = {'nodes': n, 'payload_bytes': payload_size, 'low_memory': low_memory}
+                results.add(
+                    'dag', f'{shape}_payload_run', params,
+                    peak_bytes=_peak_bytes(lambda: dag.run(data, low_memory=low_memory)),
+                    **per_call(lambda: dag.run(data, low_memory=low_memory), 1, repeat)
+                )
@@ -0,0 +1,55 @@
+"""PipelPool and ManagedPipeline throughput and latency against workers and payload size"""
+import time
+from typing import Dict
+
+from pipel import PipelData
+from pipel.multiprocessing import PicklablePipelineComponent, PipelPool, ManagedPipeline
+
+from .common import Results, percentile
+
+
+class Echo(PicklablePipelineComponent):
+
+    def _run(self, i, payload):
+        return PipelData(args=(i, payload), kwargs={})
+
+
+def _drive(put, get, items: int, payload_size: int, in_flight: int) -> Dict[str, float]:
+    """Closed loop: at most in_flight items are queued or running, a new one is sent as each result
+    comes back, so the latencies are those of an item in a busy pool and not its rank in a backlog"""
+    payload = b'x' * payload_size
+    sent = {}
+    latencies = []
+    start = time.perf_counter()
+    next_item = 0
+    for _ in range(items):
+        while next_item < items and next_item - len(latencies) < in_flight:
+            sent[next_item] = time.perf_counter()
+            put(PipelData(args=(next_item, payload), kwargs={}))
+            next_item += 1
+        out = get()
+        latencies.append(time.perf_counter() - sent.pop(out.args[0]))
+    elapsed = time.perf_counter() - start
+    return {
+        'items_per_s': items / elapsed,
+        'p50_s': percentile(latencies, 50),
+        'p99_s': percentile(latencies, 99),
+    }
+
+
+def run(results: Results, quick: bool) -> None:
+    items = 200 if quick else 2_000
+    workers = (1, 2) if quick else (1, 2, 4, 8)
+    payloads = (100, 100_000) if quick else (100, 10_000, 1_000_000)
+    for num_workers in workers:
+        for payload_size in payloads:
+            # Two items per worker keep every worker busy without building a queue
+            in_flight = 2 * num_workers
+            params = {'workers': num_workers, 'payload_bytes': payload_size, 'items': items, 'in_flight': in_flight}
+            with PipelPool(Echo(), num_workers=num_workers, job_timeout=0.05) as pool:
+                results.add('pool', 'pipel_pool', params, **_drive(pool.put, pool.get, items, payload_size, in_flight))
+            pools = [PipelPool(Echo(), num_workers=1, job_timeout=0.05) for _ in range(2)]
+            with ManagedPipeline(pools) as managed:
+                for i in range(len(managed)):
+                    managed.add_worker(i, num_workers - 1)
+                results.add('pool', 'managed_pipeline_2_stages', params, **_drive(managed.put, managed.get, items, payload_size, in_flight))
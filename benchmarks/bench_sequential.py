@@ -0,0 +1,27 @@
+"""SequentialPipeline execution modes on pipelines of small stages"""
+from pipel import SequentialPipeline, UnsafePipelineComponent, PipelData
+
+from .common import Results, async_per_call, per_call
+
+
+class Adder(UnsafePipelineComponent):
+
+    def _run(self, x):
+        return PipelData(args=(x + 1,))
+
+
+def run(results: Results, quick: bool) -> None:
+    number, repeat = (500, 3) if quick else (5_000, 5)
+    data = PipelData(args=(1,))
+    for stages in (1, 10, 50):
+        pipeline = SequentialPipeline([Adder() for _ in range(stages)])
+        params = {'stages': stages}
+        results.add('sequential', 'run_sync', params, **per_call(lambda: pipeline.run(data), number, repeat))
+        compiled = pipeline.compile()
+        results.add('sequential', 'compiled', params, **per_call(lambda: compiled(data), number, repeat))
+        results.add('sequential', 'arun', params, **async_per_call(lambda: pipeline.arun(data), number, repeat))
+        # A new event loop per call
+        results.add(
+            'sequential', 'run_async', params,
+            **per_call(lambda: pipeline.run(data, exec_mode='async'), max(1, number // 10), repeat)
+        )
@@ -0,0 +1,41 @@
+import asyncio
+import statistics
+import timeit
+from typing import Any, Callable, Dict, List
+
+
+class Results:
+    """Collects the measurements of a benchmark run"""
+    records: List[Dict[str, Any]]
+
+    def __init__(self):
+        self.records = []
+
+    def add(self, suite: str, name: str, params: Dict[str, Any], **metrics: float) -> None:
+        self.records.append({'suite': suite, 'name': name, 'params': params, 'metrics': metrics})
+
+
+def per_call(func: Callable[[], Any], number: int, repeat: int) -> Dict[str, float]:
+    """Seconds per call of func, best and median of repeat rounds of number calls"""
+    # Warm up caches and lazy initializations
+    func()
+    rounds = [t / number for t in timeit.Timer(func).repeat(repeat=repeat, number=number)]
+    return {'best_s': min(rounds), 'median_s': statistics.median(rounds)}
+
+
+def async_per_call(factory: Callable[[], Any], number: int, repeat: int) -> Dict[str, float]:
+    """Same as per_call for a coroutine factory, every round runs on one event loop"""
+    async def round_():
+        start = timeit.default_timer()
+        for _ in range(number):
+            await factory()
+        return (timeit.default_timer() - start) / number
+
+    asyncio.run(factory())
+    rounds = [asyncio.run(round_()) for _ in range(repeat)]
+    return {'best_s': min(rounds), 'median_s': statistics.median(rounds)}
+
+
+def percentile(values: List[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, round(p / 100 * len(values)) - 1))]
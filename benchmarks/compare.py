@@ -0,0 +1,56 @@
+"""Compares two benchmark reports and lists the regressions.
+
+    python -m benchmarks.compare baseline.json results.json --threshold 0.1
+
+Metrics ending in `_per_s` are higher-is-better, the others are durations.
+Exits with 1 when a metric regressed more than the threshold.
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, Tuple
+
+
+def _index(report: Dict[str, Any]) -> Dict[Tuple[str, str, str], Dict[str, float]]:
+    return {
+        (r['suite'], r['name'], json.dumps(r['params'], sort_keys=True)): r['metrics']
+        for r in report['results']
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float):
+    """Yields (key, metric, old, new, change, regressed), change > 0 is worse"""
+    old_index = _index(baseline)
+    for key, metrics in _index(current).items():
+        old_metrics = old_index.get(key)
+        if old_metrics is None:
+            continue
+        for metric, new in metrics.items():
+            old = old_metrics.get(metric)
+            if not old or not new:
+                continue
+            change = old / new - 1 if metric.endswith('_per_s') else new / old - 1
+            yield key, metric, old, new, change, change > threshold
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=0.1, help='relative slowdown reported as regression')
+    args = parser.parse_args(argv)
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    regressions = 0
+    for (suite, name, params), metric, old, new, change, regressed in compare(baseline, current, args.threshold):
+        flag = 'REGRESSION' if regressed else ''
+        print(f'{suite:12} {name:28} {params:40} {metric:12} {old:12.4g} {new:12.4g} {change:+8.1%} {flag}')
+        regressions += regressed
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""Runs the benchmarks and writes the results as JSON.
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --quick --suites components sequential
+"""
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+from typing import Optional
+
+from . import bench_components, bench_dag, bench_pool, bench_sequential
+from .common import Results
+
+SUITES = ('components', 'sequential', 'dag', 'pool')
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--suites', nargs='+', choices=SUITES, default=list(SUITES))
+    parser.add_argument('--quick', action='store_true', help='fewer rounds and sizes, for smoke runs')
+    parser.add_argument('--dag-sizes', nargs='+', type=int, default=None, help='node counts of the DAG graphs')
+    parser.add_argument('--output', default=None, help='JSON file, stdout by default')
+    args = parser.parse_args(argv)
+
+    results = Results()
+    for suite in args.suites:
+        print(f'Running {suite}...', file=sys.stderr)
+        if suite == 'components':
+            bench_components.run(results, args.quick)
+        elif suite == 'sequential':
+            bench_sequential.run(results, args.quick)
+        elif suite == 'dag':
+            sizes = args.dag_sizes or ([10, 100, 1000] if args.quick else [10, 100, 1000, 10000])
+            bench_dag.run(results, args.quick, sizes)
+        elif suite == 'pool':
+            bench_pool.run(results, args.quick)
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'commit': _commit(),
+            'date': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'quick': args.quick,
+        },
+        'results': results.records,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
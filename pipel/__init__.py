@@ -1,6 +1,12 @@
+from .profiling import *
 from .sequential_pipeline import *
 from .pipeline_component import *
 from .pipel_types import *
+from .cache import *
+from .fingerprint import *
+from .disk_cache import *
+from .hooks import *
+from .validation import *
 from .dag_pipeline import *
 
 
@@ -0,0 +1,450 @@
+import asyncio
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict, namedtuple
+from functools import _make_key, wraps
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Optional
+
+from .pipel_types import PipelData
+
+# Same fields as functools' cache_info() plus eviction and memory statistics
+CacheInfo = namedtuple(
+    'CacheInfo',
+    ['hits', 'misses', 'maxsize', 'currsize', 'evictions', 'nbytes'],
+    defaults=(0, 0)
+)
+
+# Returned by the backends on a miss, results may legitimately be None
+_MISSING = object()
+
+
+def estimate_size(obj: Any) -> int:
+    """Estimates the memory footprint of obj in bytes.
+
+    Containers and PipelData are traversed, buffers (bytes, memoryview,
+    array-likes exposing `nbytes`) are measured by their payload size.
+    Shared objects are counted once.
+    """
+    seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        nbytes = getattr(item, 'nbytes', None)
+        if isinstance(nbytes, int):
+            size += nbytes
+            continue
+        size += sys.getsizeof(item)
+        if isinstance(item, PipelData):
+            stack.append(item.args)
+            stack.append(item.kwargs)
+        elif isinstance(item, (dict, MappingProxyType)):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (tuple, list, set, frozenset)):
+            stack.extend(item)
+    return size
+
+
+class CacheBackend(ABC):
+    """Storage used by the components to cache their results.
+
+    Backends keep the statistics, subclasses only implement the storage
+    and the eviction policy through `_get`, `_put`, `_clear` and `__len__`.
+    Every public method holds the backend lock, so a backend can be shared
+    by threads.
+    """
+    maxsize: Optional[int]
+    hits: int
+    misses: int
+    evictions: int
+    nbytes: int
+
+    def __init__(self, maxsize: Optional[int] = 128, *, sizeof: Optional[Callable[[Any], int]] = estimate_size):
+        if maxsize is not None and maxsize < 0:
+            raise ValueError(f'maxsize must be non negative. Found {maxsize}')
+        self.maxsize = maxsize
+        self.sizeof = sizeof
+        self.hits = self.misses = self.evictions = self.nbytes = 0
+        self._lock = threading.RLock()
+
+    def bind(self, owner) -> 'CacheBackend':
+        """Called by the component owning the cache, returns the backend to use.
+
+        In-memory backends are private to their owner and return themselves,
+        shared backends use it to namespace the keys of each component.
+        """
+        return self
+
+    def make_key(self, args: tuple, kwargs: dict):
+        """Builds the cache key of a call"""
+        return _make_key(args, kwargs, False)
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._get(key)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def put(self, key, value) -> None:
+        if self.maxsize == 0:
+            return
+        nbytes = self.sizeof(value) if self.sizeof else 0
+        with self._lock:
+            self._put(key, value, nbytes)
+
+    def record(self, hits: int = 0, misses: int = 0) -> None:
+        """Accounts for lookups served without the backend, e.g. de-duplicated calls"""
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def clear(self) -> None:
+        """Empties the cache and resets the statistics"""
+        with self._lock:
+            self._clear()
+            self.hits = self.misses = self.evictions = self.nbytes = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self), self.evictions, self.nbytes)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    @abstractmethod
+    def copy(self) -> 'CacheBackend':
+        """Returns an empty backend with the same configuration"""
+        raise NotImplementedError(f'copy() not implemented for {self.__class__.__name__}')
+
+    @abstractmethod
+    def _get(self, key):
+        """Returns the cached value or _MISSING"""
+        raise NotImplementedError(f'_get() not implemented for {self.__class__.__name__}')
+
+    @abstractmethod
+    def _put(self, key, value, nbytes: int) -> None:
+        raise NotImplementedError(f'_put() not implemented for {self.__class__.__name__}')
+
+    @abstractmethod
+    def _clear(self) -> None:
+        raise NotImplementedError(f'_clear() not implemented for {self.__class__.__name__}')
+
+    @abstractmethod
+    def __len__(self) -> int:
+        raise NotImplementedError(f'__len__() not implemented for {self.__class__.__name__}')
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(maxsize={self.maxsize})'
+
+
+class LRUCache(CacheBackend):
+    """Evicts the least recently used entry"""
+
+    def __init__(self, maxsize: Optional[int] = 128, *, sizeof: Optional[Callable[[Any], int]] = estimate_size):
+        super().__init__(maxsize, sizeof=sizeof)
+        # key -> (value, nbytes, ...)
+        self._data = OrderedDict()
+
+    def copy(self) -> 'LRUCache':
+        return self.__class__(self.maxsize, sizeof=self.sizeof)
+
+    def _entry(self, value, nbytes: int) -> tuple:
+        return (value, nbytes)
+
+    def _overflow(self) -> bool:
+        return self.maxsize is not None and len(self._data) > self.maxsize
+
+    def _evict(self) -> None:
+        _, entry = self._data.popitem(last=False)
+        self.nbytes -= entry[1]
+        self.evictions += 1
+
+    def _get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        self._data.move_to_end(key)
+        return entry[0]
+
+    def _put(self, key, value, nbytes: int) -> None:
+        old = self._data.pop(key, None)
+        if old is not None:
+            self.nbytes -= old[1]
+        self._data[key] = self._entry(value, nbytes)
+        self.nbytes += nbytes
+        while self._overflow():
+            self._evict()
+
+    def _clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TTLCache(LRUCache):
+    """LRU cache whose entries expire ttl seconds after being stored.
+
+    Expired entries are dropped lazily when looked up, or all at once
+    with `expire()`. They count as evictions.
+    """
+    ttl: float
+
+    def __init__(
+        self,
+        ttl: float,
+        maxsize: Optional[int] = 128, *,
+        timer: Callable[[], float] = time.monotonic,
+        sizeof: Optional[Callable[[Any], int]] = estimate_size
+    ):
+        if ttl <= 0:
+            raise ValueError(f'ttl must be positive. Found {ttl}')
+        super().__init__(maxsize, sizeof=sizeof)
+        self.ttl = ttl
+        self.timer = timer
+
+    def copy(self) -> 'TTLCache':
+        return self.__class__(self.ttl, self.maxsize, timer=self.timer, sizeof=self.sizeof)
+
+    def _entry(self, value, nbytes: int) -> tuple:
+        return (value, nbytes, self.timer() + self.ttl)
+
+    def _drop(self, key) -> None:
+        entry = self._data.pop(key)
+        self.nbytes -= entry[1]
+        self.evictions += 1
+
+    def _get(self, key):
+        entry = self._data.get(key)
+        if entry is not None and entry[2] <= self.timer():
+            self._drop(key)
+            return _MISSING
+        return super()._get(key)
+
+    def expire(self) -> None:
+        """Drops every expired entry"""
+        with self._lock:
+            now = self.timer()
+            for key in [k for k, entry in self._data.items() if entry[2] <= now]:
+                self._drop(key)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(ttl={self.ttl}, maxsize={self.maxsize})'
+
+
+class SizedCache(LRUCache):
+    """LRU cache bounded by the estimated memory of the stored results.
+
+    Results larger than max_bytes are never stored, they drop the previous
+    result of their key.
+    """
+    max_bytes: int
+
+    def __init__(
+        self,
+        max_bytes: int,
+        maxsize: Optional[int] = None, *,
+        sizeof: Callable[[Any], int] = estimate_size
+    ):
+        if max_bytes < 0:
+            raise ValueError(f'max_bytes must be non negative. Found {max_bytes}')
+        if sizeof is None:
+            raise ValueError('SizedCache requires a sizeof function.')
+        super().__init__(maxsize, sizeof=sizeof)
+        self.max_bytes = max_bytes
+
+    def copy(self) -> 'SizedCache':
+        return self.__class__(self.max_bytes, self.maxsize, sizeof=self.sizeof)
+
+    def _overflow(self) -> bool:
+        return self.nbytes > self.max_bytes or super()._overflow()
+
+    def _put(self, key, value, nbytes: int) -> None:
+        if nbytes > self.max_bytes:
+            # The previous result of the key is stale, it must not be served instead
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            return
+        super()._put(key, value, nbytes)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(max_bytes={self.max_bytes}, maxsize={self.maxsize})'
+
+
+class LFUCache(CacheBackend):
+    """Evicts the least frequently used entry, ties are broken by recency"""
+
+    def __init__(self, maxsize: Optional[int] = 128, *, sizeof: Optional[Callable[[Any], int]] = estimate_size):
+        super().__init__(maxsize, sizeof=sizeof)
+        # key -> [value, nbytes, frequency]
+        self._data: Dict[Any, list] = {}
+        # frequency -> keys in least recently used order
+        self._buckets: Dict[int, OrderedDict] = defaultdict(OrderedDict)
+        self._min_freq = 0
+
+    def copy(self) -> 'LFUCache':
+        return self.__class__(self.maxsize, sizeof=self.sizeof)
+
+    def _touch(self, key, entry: list) -> None:
+        freq = entry[2]
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+            if self._min_freq == freq:
+                self._min_freq = freq + 1
+        entry[2] = freq + 1
+        self._buckets[freq + 1][key] = None
+
+    def _evict(self) -> None:
+        bucket = self._buckets[self._min_freq]
+        key, _ = bucket.popitem(last=False)
+        if not bucket:
+            del self._buckets[self._min_freq]
+        entry = self._data.pop(key)
+        self.nbytes -= entry[1]
+        self.evictions += 1
+
+    def _get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        self._touch(key, entry)
+        return entry[0]
+
+    def _put(self, key, value, nbytes: int) -> None:
+        entry = self._data.get(key)
+        if entry is not None:
+            self.nbytes += nbytes - entry[1]
+            entry[0], entry[1] = value, nbytes
+            self._touch(key, entry)
+            return
+        if self.maxsize is not None and len(self._data) >= self.maxsize:
+            self._evict()
+        self._data[key] = [value, nbytes, 1]
+        self._buckets[1][key] = None
+        self._min_freq = 1
+        self.nbytes += nbytes
+
+    def _clear(self) -> None:
+        self._data.clear()
+        self._buckets.clear()
+        self._min_freq = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def cached(cache: CacheBackend):
+    """Caches the results of func in the given backend"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = cache.make_key(args, kwargs)
+            value = cache.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            value = func(*args, **kwargs)
+            cache.put(key, value)
+            return value
+
+        wrapper.cache = cache
+        wrapper.cache_info = cache.info
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
+
+
+def async_cached(cache: CacheBackend):
+    """Caches the awaited results of a coroutine function in the given backend.
+
+    Concurrent calls with the same arguments share a single in-flight task
+    (single-flight), so a burst of identical requests awaits the wrapped
+    coroutine only once. Joining an in-flight task counts as a hit.
+    """
+    def decorator(func):
+        in_flight: Dict[Any, asyncio.Future] = {}
+
+        def _store(key, task: asyncio.Future):
+            # Only the task registered for the key may clear it, a cache_clear()
+            # in the middle of the call could have replaced it
+            if in_flight.get(key) is task:
+                del in_flight[key]
+            if task.cancelled() or task.exception() is not None:
+                return
+            cache.put(key, task.result())
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            if cache.maxsize == 0:
+                cache.record(misses=1)
+                return await func(*args, **kwargs)
+
+            key = cache.make_key(args, kwargs)
+            task = in_flight.get(key)
+            # Tasks are bound to the loop that created them
+            if task is not None and task.get_loop() is asyncio.get_running_loop():
+                cache.record(hits=1)
+            else:
+                value = cache.get(key, _MISSING)
+                if value is not _MISSING:
+                    return value
+                task = asyncio.ensure_future(func(*args, **kwargs))
+                in_flight[key] = task
+                task.add_done_callback(lambda t, key=key: _store(key, t))
+            # A cancelled waiter must not cancel the shared task
+            return await asyncio.shield(task)
+
+        def cache_clear() -> None:
+            cache.clear()
+            in_flight.clear()
+
+        wrapper.cache = cache
+        wrapper.cache_info = cache.info
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
+
+
+def async_lru_cache(maxsize: Optional[int] = 128):
+    """LRU cache for coroutine functions.
+
+    Unlike `functools.lru_cache`, which would store the coroutine object,
+    this cache stores the awaited result, see `async_cached`.
+    `maxsize=0` disables caching and de-duplication, `maxsize=None` makes
+    the cache unbounded.
+    """
+    return async_cached(LRUCache(maxsize, sizeof=None))
+
+
+__all__ = [
+    'CacheInfo',
+    'CacheBackend',
+    'LRUCache',
+    'LFUCache',
+    'TTLCache',
+    'SizedCache',
+    'estimate_size',
+    'cached',
+    'async_cached',
+    'async_lru_cache'
+]
@@ -1,81 +1,221 @@
-from typing import List, Dict, Any
-from pipel import PipelData, UnsafePipelineComponent
+import asyncio
+import bisect
+import heapq
+import queue
+import threading
+import weakref
+from typing import AbstractSet, List, Dict, Any, Iterable, Iterator, NamedTuple, Optional, Set, Tuple, Union
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from time import perf_counter
+from itertools import chain
+from pipel import PipelData, UnsafePipelineComponent, Profiler, StageStats, estimate_size
+from pipel.sequential_pipeline import _DONE
 from collections import deque
 
 
+class MemoryInfo(NamedTuple):
+    """Outputs held by the last DAGPipeline.run(low_memory=True), bytes estimated with estimate_size"""
+    peak_outputs: int
+    peak_bytes: int
+
+
+class ExecutionPlan(NamedTuple):
+    """Shape of a DAGPipeline as reported by explain(), costs in seconds or in nodes when none is known"""
+    # Nodes grouped by their longest distance from a starting node
+    levels: List[List[int]]
+    # Size of the widest level. Nodes of different levels can also run at the same
+    # time, so more nodes than this may run at once in run_parallel
+    max_level_width: int
+    critical_path: List[int]
+    critical_path_cost: float
+    total_cost: float
+
+
+class _MemoEntry(NamedTuple):
+    """Output of a node in run_incremental, valid for that component and input fingerprint"""
+    component: Any
+    key: bytes
+    output: PipelData
+    # Outputs of the parents the input was gathered from, in merge order
+    inputs: Tuple[PipelData, ...]
+
+
+class _Stopped(Exception):
+    """Raised in the stream threads once the stream is closed"""
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> None:
+    while True:
+        try:
+            q.put(item, timeout=0.05)
+            return
+        except queue.Full:
+            if stop.is_set():
+                raise _Stopped()
+
+
+def _get(q: queue.Queue, stop: threading.Event):
+    while True:
+        try:
+            return q.get(timeout=0.05)
+        except queue.Empty:
+            if stop.is_set():
+                raise _Stopped()
+
+
+def _timed_call(component, data: PipelData) -> Tuple[PipelData, float]:
+    """Runs in the executor's workers, module level so process pools can pickle it"""
+    start = perf_counter()
+    out = component(data)
+    return out, perf_counter() - start
+
+
 """Directed Acyclic Graph (DAG) Pipeline"""
 
 class DAGPipeline():
     components: List[UnsafePipelineComponent]
-    adj: List[List[bool]]
     n: int
+    # Opt-in instrumentation of run, see stats()
+    profiler: Optional[Profiler] = None
+    # node -> max concurrent calls of the node across the arun calls of an event loop
+    concurrency_limits: Dict[int, int]
+    # Set by run(low_memory=True)
+    memory_info: Optional[MemoryInfo] = None
+    # node -> estimated cost of a call, prioritizes run_parallel, see explain()
+    costs: Dict[int, float]
+
+    # Execution plan, computed at construction and updated in place by the graph edits
+    _children: List[List[int]]
+    _parents: List[List[int]]
+    _in_degree: List[int]
+    # A topological order and the index of each node in it
+    _order: List[int]
+    _position: List[int]
+    _start_set: Set[int]
+    _terminal_set: Set[int]
+    # Sorted lists of the two sets, see _start and _terminal
+    _start_list: Optional[List[int]]
+    _terminal_list: Optional[List[int]]
     
-    def __init__(self, components: List[UnsafePipelineComponent], adj: List[List[bool]]):
+    def __init__(
+        self,
+        components: List[UnsafePipelineComponent],
+        adj: Optional[List[List[bool]]] = None,
+        *,
+        edges: Optional[Iterable[Tuple[int, int]]] = None
+    ):
+        """The graph is either a dense n x n adjacency matrix, adj[i][j] truthy for i -> j,
+        or a list of (parent, child) edges between the indices of the components"""
+        if (adj is None) == (edges is None):
+            raise ValueError("Either adj or edges must be given")
         self.components = components
-        self.n = len(adj)
-        if not self._is_dag(adj):
-            raise ValueError("The given adj must be DAG")
-        self.adj = adj
-    
-    def _is_dag(self, adj):
-        """
-        Validate whether an adjacency matrix represents a DAG.
-        adj: list[list[int]] or list[list[bool]]
-        Returns True if DAG, False otherwise.
-        """
-        if any(len(row) != self.n for row in adj):
-            raise ValueError("Adjacency matrix must be square")
+        if adj is not None:
+            self.n = len(adj)
+            if any(len(row) != self.n for row in adj):
+                raise ValueError("Adjacency matrix must be square")
+            children = [[j for j, flag in enumerate(row) if flag] for row in adj]
+        else:
+            self.n = len(components)
+            children = self._edges_to_children(edges, self.n)
+        self._build_plan(children)
+        self.concurrency_limits = {}
+        self.costs = {}
+        # event loop -> {(node, limit): semaphore}, asyncio primitives belong to one loop
+        self._semaphores = weakref.WeakKeyDictionary()
+        # run_incremental state: node -> _MemoEntry, valid for one merge function and start order
+        self._memo: Dict[int, _MemoEntry] = {}
+        self._memo_signature = None
 
-        for i in range(self.n):
-            if adj[i][i] != 0:
-                return False  # self-loop = not a DAG
+    @classmethod
+    def from_adjacency_list(
+        cls,
+        components: List[UnsafePipelineComponent],
+        adjacency: Union[List[Iterable[int]], Dict[int, Iterable[int]]]
+    ) -> 'DAGPipeline':
+        """adjacency maps each node to its children, as a list indexed by node or a dict"""
+        items = adjacency.items() if isinstance(adjacency, dict) else enumerate(adjacency)
+        return cls(components, edges=[(node, child) for node, children in items for child in children])
 
-        visited = [0] * self.n   # 0 = unvisited, 1 = in recursion stack, 2 = done
+    @staticmethod
+    def _edges_to_children(edges: Iterable[Tuple[int, int]], n: int) -> List[List[int]]:
+        children: List[Dict[int, None]] = [{} for _ in range(n)]
+        for parent, child in edges:
+            if not (0 <= parent < n and 0 <= child < n):
+                raise ValueError(f"Edge ({parent}, {child}) out of range for {n} components")
+            children[parent][child] = None
+        # Children in index order, as read from a matrix row
+        return [sorted(c) for c in children]
 
-        def dfs(v):
-            if visited[v] == 1:
-                return True   # cycle found
-            if visited[v] == 2:
-                return False  # already processed
+    @property
+    def adj(self) -> List[List[bool]]:
+        """Dense adjacency matrix of the graph, built on access"""
+        matrix = [[False] * self.n for _ in range(self.n)]
+        for node, children in enumerate(self._children):
+            for child in children:
+                matrix[node][child] = True
+        return matrix
 
-            visited[v] = 1  # mark as in recursion stack
+    def _build_plan(self, children: List[List[int]]) -> None:
+        """
+        Stores the execution plan of the graph, raises ValueError if it is not a DAG.
+        Kahn's algorithm over the children lists, iterative so deep graphs do not hit the recursion limit.
+        """
+        parents: List[List[int]] = [[] for _ in range(self.n)]
+        for node, node_children in enumerate(children):
+            for child in node_children:
+                parents[child].append(node)
+        in_degree = [len(p) for p in parents]
+        remaining = list(in_degree)
+        order = [node for node in range(self.n) if not remaining[node]]
+        for node in order:
+            for child in children[node]:
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    order.append(child)
+        # Nodes on or behind a cycle never reach in-degree 0, self-loops included
+        if len(order) != self.n:
+            raise ValueError("The given adj must be DAG")
 
-            for u in range(self.n):
-                if adj[v][u] != 0:     # edge v → u
-                    if dfs(u):
-                        return True
-            visited[v] = 2  # finished
-            return False
+        self._children = children
+        self._parents = parents
+        self._in_degree = in_degree
+        self._order = order
+        self._position = [0] * self.n
+        for i, node in enumerate(order):
+            self._position[node] = i
+        self._start_list = [node for node in range(self.n) if not in_degree[node]]
+        self._terminal_list = [node for node in range(self.n) if not children[node]]
+        self._start_set = set(self._start_list)
+        self._terminal_set = set(self._terminal_list)
 
-        for v in range(self.n):
-            if dfs(v):
-                return False
+    @property
+    def _start(self) -> List[int]:
+        """Starting nodes in index order, sorted again on the first access after an edit"""
+        if self._start_list is None:
+            self._start_list = sorted(self._start_set)
+        return self._start_list
 
-        return True
+    @property
+    def _terminal(self) -> List[int]:
+        if self._terminal_list is None:
+            self._terminal_list = sorted(self._terminal_set)
+        return self._terminal_list
 
     def _get_start(self) -> List[int]:
-        """In a DAG the starting nodes have 0 columns
+        """In a DAG the starting nodes have no parents
 
         Returns:
             List[int]: indices of the starting nodes
         """
-        start_nodes = []
-        for col in range(self.n):
-            if all([not self.adj[row][col] for row in range(self.n)]):
-                start_nodes.append(col)
-        return start_nodes
+        return self._start
     
     def _get_terminal(self) -> List[int]:
-        """In a DAG the ending nodes have 0 rows
+        """In a DAG the ending nodes have no children
 
         Returns:
             List[int]: indices of the terminal nodes
         """
-        terminal_nodes = []
-        for row in range(self.n):
-            if all([not self.adj[row][col] for col in range(self.n)]):
-                terminal_nodes.append(row)
-        return terminal_nodes
+        return self._terminal
     
     def _next_state(self, node: int) -> List[int]:
         """Gets the adjacent nodes of node
@@ -86,68 +226,712 @@ class DAGPipeline():
         Returns:
             List[int]: List of adjecent nodes
         """
-        return [i for i, flag in enumerate(self.adj[node]) if flag]
+        return self._children[node]
         
     def _prev_state(self, node: int) -> List[int]:
-        return [i for i in range(self.n) if self.adj[i][node]]
+        return self._parents[node]
+
+    def _check_node(self, node: int) -> None:
+        if not 0 <= node < self.n:
+            raise ValueError(f"Node {node} out of range for {self.n} components")
+
+    def add_node(self, component: UnsafePipelineComponent) -> int:
+        """Appends a node without edges, it is both a starting and a terminal node.
+
+        Returns:
+            int: index of the new node
+        """
+        node = self.n
+        self.components.append(component)
+        self.n += 1
+        self._children.append([])
+        self._parents.append([])
+        self._in_degree.append(0)
+        self._position.append(len(self._order))
+        self._order.append(node)
+        self._start_set.add(node)
+        self._terminal_set.add(node)
+        # The new index is the largest, the sorted lists stay sorted
+        if self._start_list is not None:
+            self._start_list.append(node)
+        if self._terminal_list is not None:
+            self._terminal_list.append(node)
+        return node
+
+    def add_edge(self, parent: int, child: int) -> None:
+        """Adds parent -> child, raises ValueError if it would create a cycle.
+
+        The plan is updated in place: when the child already comes after the
+        parent in the topological order nothing moves, otherwise only the
+        nodes placed between the two are searched for a cycle and reordered.
+        The memoized outputs of the child are dropped, see run_incremental.
+        """
+        self._check_node(parent)
+        self._check_node(child)
+        children = self._children[parent]
+        index = bisect.bisect_left(children, child)
+        if index < len(children) and children[index] == child:
+            return
+        if parent == child:
+            raise ValueError(f"Edge ({parent}, {child}) would create a cycle")
+        if self._position[child] < self._position[parent]:
+            self._reorder(parent, child)
+        children.insert(index, child)
+        bisect.insort(self._parents[child], parent)
+        self._in_degree[child] += 1
+        if self._in_degree[child] == 1:
+            self._start_set.discard(child)
+            self._start_list = None
+        if len(children) == 1:
+            self._terminal_set.discard(parent)
+            self._terminal_list = None
+        self.invalidate([child])
+
+    def _reorder(self, parent: int, child: int) -> None:
+        """Makes room for parent -> child when the child comes first in the order (Pearce-Kelly).
+
+        The descendants of child and the ancestors of parent placed between
+        the two are swapped into the positions they occupy, descendants last.
+        """
+        position = self._position
+        lower, upper = position[child], position[parent]
+        descendants = {child}
+        stack = [child]
+        while stack:
+            for node in self._children[stack.pop()]:
+                if node == parent:
+                    raise ValueError(f"Edge ({parent}, {child}) would create a cycle")
+                if node not in descendants and position[node] < upper:
+                    descendants.add(node)
+                    stack.append(node)
+        ancestors = {parent}
+        stack = [parent]
+        while stack:
+            for node in self._parents[stack.pop()]:
+                if node not in ancestors and position[node] > lower:
+                    ancestors.add(node)
+                    stack.append(node)
+        moved = sorted(ancestors, key=position.__getitem__) + sorted(descendants, key=position.__getitem__)
+        for i, node in zip(sorted(position[node] for node in moved), moved):
+            self._order[i] = node
+            position[node] = i
+
+    def remove_edge(self, parent: int, child: int) -> None:
+        """Removes parent -> child, the memoized outputs of the child are dropped"""
+        self._check_node(parent)
+        self._check_node(child)
+        children = self._children[parent]
+        index = bisect.bisect_left(children, child)
+        if index == len(children) or children[index] != child:
+            raise ValueError(f"There is no edge ({parent}, {child})")
+        del children[index]
+        self._parents[child].remove(parent)
+        self._in_degree[child] -= 1
+        # A topological order stays valid when an edge is removed
+        if not self._in_degree[child]:
+            self._start_set.add(child)
+            self._start_list = None
+        if not children:
+            self._terminal_set.add(parent)
+            self._terminal_list = None
+        self.invalidate([child])
+
+    def replace_component(self, node: int, component: UnsafePipelineComponent) -> None:
+        """Swaps the component of a node, its memoized output is dropped"""
+        self._check_node(node)
+        self.components[node] = component
+        self.invalidate([node])
         
     @staticmethod
     def _default_kwargs_merge(kwarg1: Dict[str, Any], kwarg2: Dict[str, Any]) -> Dict[str, Any]:
         kwarg1.update(kwarg2)
         return kwarg1
         
-    def run(self, data: Dict[int, PipelData], kwargs_merge_func = _default_kwargs_merge) -> Dict[int, PipelData]:
-        """kwargs_merge_func is the custom function that expresses how the kwargs of two PipelData need to merge"""
-        
+    def _check_input(self, data: Dict[int, PipelData]) -> None:
         starting_s = self._get_start()
         assert isinstance(data, dict), "Input data container must be a dictionary."
         assert all(isinstance(d, PipelData) for d in data.values()), "The input data must be of type PipelData."
-        assert all(s in starting_s for s in data.keys()), "All states given input must be starting states."
+        assert all(0 <= s < self.n and not self._in_degree[s] for s in data.keys()), "All states given input must be starting states."
         assert len(starting_s) == len(data.keys()), "The number of starting states is different than the number of inuputs given."
 
-        # Compute in-degrees for all nodes
-        in_deg = {node: len(self._prev_state(node)) for node in range(self.n)}
+    def _select(
+        self,
+        data: Dict[int, PipelData],
+        targets: Optional[Iterable[int]]
+    ) -> Tuple[Dict[int, PipelData], Union[List[List[int]], Dict[int, List[int]]], AbstractSet[int]]:
+        """Checks the inputs of a call and returns (inputs, children of the executed nodes, returned nodes).
+
+        Without targets every node runs and the terminal nodes are returned.
+        With targets only their ancestors run: the inputs must cover the
+        starting nodes among them, inputs of other starting nodes are ignored.
+        """
+        if targets is None:
+            self._check_input(data)
+            return data, self._children, self._terminal_set
+        targets = frozenset(targets)
+        if any(not 0 <= t < self.n for t in targets):
+            raise ValueError(f"Targets must be nodes between 0 and {self.n - 1}. Found {sorted(targets)}")
+        keep = self._ancestors(targets)
+        assert isinstance(data, dict), "Input data container must be a dictionary."
+        assert all(isinstance(d, PipelData) for d in data.values()), "The input data must be of type PipelData."
+        assert all(0 <= s < self.n and not self._in_degree[s] for s in data.keys()), "All states given input must be starting states."
+        assert all(s in data for s in self._start if s in keep), "Missing inputs for the starting states of the targets."
+        inputs = {node: d for node, d in data.items() if node in keep}
+        children = {node: [c for c in self._children[node] if c in keep] for node in keep}
+        return inputs, children, targets
+
+    def _ancestors(self, nodes: Iterable[int]) -> Set[int]:
+        """The nodes and all their ancestors"""
+        closure = set(nodes)
+        stack = list(closure)
+        while stack:
+            for parent in self._parents[stack.pop()]:
+                if parent not in closure:
+                    closure.add(parent)
+                    stack.append(parent)
+        return closure
+
+    def _serial_order(self, start: List[int], children: Union[List[List[int]], Dict[int, List[int]]]) -> List[int]:
+        """Order in which run processes the nodes, it only depends on the topology and the start order"""
+        in_deg = list(self._in_degree)
+        order = list(start)
+        for node in order:
+            for child in children[node]:
+                in_deg[child] -= 1
+                if in_deg[child] == 0:
+                    order.append(child)
+        return order
+
+    def run(
+        self,
+        data: Dict[int, PipelData],
+        kwargs_merge_func = _default_kwargs_merge,
+        targets: Optional[Iterable[int]] = None,
+        low_memory: bool = False
+    ) -> Dict[int, PipelData]:
+        """kwargs_merge_func is the custom function that expresses how the kwargs of two PipelData need to merge.
+
+        By default every node runs and the outputs of the terminal nodes are
+        returned. With targets only the targets and their ancestors run, and
+        the outputs of the targets (terminal or intermediate) are returned.
+
+        With low_memory the output of a node is released as soon as all its
+        children gathered their inputs, unless it is returned, and the peak
+        of the outputs held by the run is reported in `memory_info`.
+        """
         
-        # Storage for merged inputs before processing
-        pending_inputs: Dict[int, PipelData] = {}
+        data, children, outputs = self._select(data, targets)
+
+        # In-degrees of all nodes, from the plan
+        in_deg = list(self._in_degree)
         
-        # Nodes ready to process
-        ready_nodes = deque()
+        # Parents that delivered their output, in delivery order
+        arrived: Dict[int, List[int]] = {}
         
-        for node, d in data.items():
-            pending_inputs[node] = d
-            ready_nodes.append(node)   # start nodes are ready_nodes by definition
+        # Nodes ready to process, with their input
+        ready_nodes = deque(data.items())   # start nodes are ready_nodes by definition
 
         results = {}  # final processed values
+
+        if low_memory:
+            # Children that still have to gather each output
+            consumers = {node: len(children[node]) for node in (children if isinstance(children, dict) else range(self.n))}
+            live_bytes = peak_bytes = peak_outputs = 0
+            sizes: Dict[int, int] = {}
         
         while ready_nodes:
-            node = ready_nodes.popleft()
-            input_data = pending_inputs.pop(node)
+            node, input_data = ready_nodes.popleft()
 
             # Process component for this node
-            output_data: PipelData = self.components[node](input_data)
+            output_data: PipelData = self._call(node, self.components[node], input_data)
+            # The input may be the only reference to a large fan-in tuple
+            del input_data
             results[node] = output_data
+            if low_memory:
+                sizes[node] = estimate_size(output_data)
+                live_bytes += sizes[node]
+                peak_bytes = max(peak_bytes, live_bytes)
+                peak_outputs = max(peak_outputs, len(results))
 
             # Send data to children, but track readiness
-            for child in self._next_state(node):
-                if child not in pending_inputs:
-                    pending_inputs[child] = PipelData((), {})
-
-                pending_inputs[child].args += output_data.args
-                pending_inputs[child].kwargs = kwargs_merge_func(pending_inputs[child].kwargs, output_data.kwargs)
+            for child in children[node]:
+                arrived.setdefault(child, []).append(node)
                 
                 # reduce in-degree
                 in_deg[child] -= 1
 
-                # Child becomes ready_nodes only when all parents delivered data
+                # Child becomes ready_nodes only when all parents delivered data, its input is built once
                 if in_deg[child] == 0:
-                    ready_nodes.append(child)
+                    parents = arrived.pop(child)
+                    ready_nodes.append((child, self._gather(parents, results, kwargs_merge_func)))
+                    if low_memory:
+                        for parent in parents:
+                            consumers[parent] -= 1
+                            if not consumers[parent] and parent not in outputs:
+                                del results[parent]
+                                live_bytes -= sizes.pop(parent)
+            del output_data
 
+        if low_memory:
+            self.memory_info = MemoryInfo(peak_outputs=peak_outputs, peak_bytes=peak_bytes)
         # results now contains output of all nodes
-        return {k: v for k, v in results.items() if k in self._get_terminal()}
+        return {k: v for k, v in results.items() if k in outputs}
+
+    def _call(self, node: int, component, input_data: PipelData) -> PipelData:
+        if self.profiler is None:
+            return component(input_data)
+        with self.profiler.measure(f'{node}:{component.__class__.__name__}', component):
+            return component(input_data)
+
+    def run_batch(
+        self,
+        inputs: Iterable[Dict[int, PipelData]],
+        kwargs_merge_func = _default_kwargs_merge
+    ) -> List[Dict[int, PipelData]]:
+        """Runs many input dicts through the graph, walking it once for the whole batch.
+
+        Each node receives the inputs of every record at once through its
+        component's run_batch, so components with a `_run_batch` hook process
+        them together and the others fall back to one call per record. The
+        ready checks and fan-in plans are computed once per batch instead of
+        once per record. Returns the terminal outputs of each record, in the
+        input order, the same as calling run on each record. With a profiler
+        every node records one call per batch.
+        """
+        records = list(inputs)
+        if not records:
+            return []
+        # start order -> node -> parents in merge order, records usually share one start order
+        plans: Dict[Tuple[int, ...], Dict[int, List[int]]] = {}
+        record_plans = []
+        for data in records:
+            self._check_input(data)
+            signature = tuple(data)
+            plan = plans.get(signature)
+            if plan is None:
+                rank = {node: i for i, node in enumerate(self._serial_order(list(data), self._children))}
+                plan = plans[signature] = {
+                    node: sorted(parents, key=rank.__getitem__) for node, parents in enumerate(self._parents)
+                }
+            record_plans.append(plan)
+        results: List[Dict[int, PipelData]] = [{} for _ in records]
+
+        # Any topological order works, every record of a node is ready once its parents ran
+        for node in self._order:
+            if self._in_degree[node]:
+                batch = [
+                    self._gather(plan[node], record_results, kwargs_merge_func)
+                    for plan, record_results in zip(record_plans, results)
+                ]
+            else:
+                batch = [data[node] for data in records]
+            outputs = self._call_batch(node, self.components[node], batch)
+            for record_results, output_data in zip(results, outputs):
+                record_results[node] = output_data
+
+        return [{node: r[node] for node in self._terminal} for r in results]
+
+    def _call_batch(self, node: int, component, batch: List[PipelData]) -> List[PipelData]:
+        if self.profiler is None:
+            return component.run_batch(batch)
+        with self.profiler.measure(f'{node}:{component.__class__.__name__}', component):
+            return component.run_batch(batch)
+
+    def run_incremental(
+        self,
+        data: Dict[int, PipelData],
+        kwargs_merge_func = _default_kwargs_merge,
+        targets: Optional[Iterable[int]] = None
+    ) -> Dict[int, PipelData]:
+        """Same as run, but reuses the outputs of the previous call whose inputs did not change.
+
+        The output of every node is kept with the fingerprint of its input
+        and its component: a node runs again only if its input fingerprint
+        changed or its component was replaced. Nodes whose parents returned
+        the very outputs their memo was gathered from are reused without
+        fingerprinting, so re-running after changing one start input only
+        recomputes its descendants (and stops early where a recomputed output
+        feeds an unchanged input). Calls that raise or stop at targets leave
+        a memo that later calls check in the same way. Inputs that can not be
+        fingerprinted are recomputed every time. Changing kwargs_merge_func
+        or the start order drops the memo.
+        """
+        data, children, outputs = self._select(data, targets)
+        signature = (kwargs_merge_func, tuple(data))
+        if signature != self._memo_signature:
+            self._memo = {}
+            self._memo_signature = signature
+        order = self._serial_order(list(data), children)
+        rank = {node: i for i, node in enumerate(order)}
+        memo = self._memo
+        results: Dict[int, PipelData] = {}
+
+        for node in order:
+            component = self.components[node]
+            parents = sorted(self._parents[node], key=rank.__getitem__)
+            inputs = tuple(results[parent] for parent in parents)
+            entry = memo.get(node)
+            valid = entry is not None and entry.component is component
+            # The memo was gathered from these exact outputs, whichever call produced them
+            if valid and parents and all(a is b for a, b in zip(inputs, entry.inputs)):
+                results[node] = entry.output
+                continue
+            if node in data:
+                input_data = data[node]
+            else:
+                input_data = self._gather(parents, results, kwargs_merge_func)
+            try:
+                key = input_data.fingerprint()
+            except (TypeError, ValueError):
+                key = None
+            if valid and key is not None and entry.key == key:
+                results[node] = entry.output
+                memo[node] = entry._replace(inputs=inputs)
+                continue
+            output_data = self._call(node, component, input_data)
+            results[node] = output_data
+            if key is None:
+                memo.pop(node, None)
+            else:
+                memo[node] = _MemoEntry(component, key, output_data, inputs)
+
+        return {k: v for k, v in results.items() if k in outputs}
+
+    def invalidate(self, nodes: Optional[Iterable[int]] = None) -> None:
+        """Drops the outputs memoized by run_incremental for the nodes, all of them by default.
+
+        The nodes run again on the next call, their descendants are checked
+        again against their input fingerprints.
+        """
+        if nodes is None:
+            self._memo = {}
+            return
+        for node in nodes:
+            self._memo.pop(node, None)
+
+    def run_parallel(
+        self,
+        data: Dict[int, PipelData],
+        kwargs_merge_func = _default_kwargs_merge,
+        max_workers: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        targets: Optional[Iterable[int]] = None
+    ) -> Dict[int, PipelData]:
+        """Same as run, but every node whose parents are done is dispatched to the executor at once.
+
+        Independent branches run concurrently, at most max_workers nodes at
+        a time (unbounded when None with an executor). Without executor a
+        ThreadPoolExecutor(max_workers) is used for the call. With a
+        ProcessPoolExecutor the components are pickled to the workers for
+        every call (module level classes, picklable attributes and
+        logger_decorator), their caches then live in the worker processes. Fan-in inputs are merged in the
+        order run would merge them, so both return the same results.
+
+        When more nodes are ready than workers are free, the nodes with the
+        longest remaining path to a terminal node are dispatched first,
+        weighted by the estimated cost of each node (see explain()).
+        """
+        data, children, outputs = self._select(data, targets)
+        if max_workers is not None and max_workers < 1:
+            raise ValueError(f'max_workers must be positive. Found {max_workers}')
+        rank = {node: i for i, node in enumerate(self._serial_order(list(data), children))}
+        parents = {node: sorted(self._prev_state(node), key=rank.__getitem__) for node in rank}
+        priority = self._priorities(children)
+        remaining = list(self._in_degree)
+        results: Dict[int, PipelData] = {}
+        # Heap of (-longest remaining path, rank, node, input), the rank breaks ties deterministically
+        ready = [(-priority[node], rank[node], node, d) for node, d in data.items()]
+        heapq.heapify(ready)
+        running: Dict[Future, Tuple[int, float]] = {}
+        pool = executor if executor is not None else ThreadPoolExecutor(max_workers)
+        try:
+            while ready or running:
+                while ready and (max_workers is None or len(running) < max_workers):
+                    _, _, node, input_data = heapq.heappop(ready)
+                    future = pool.submit(_timed_call, self.components[node], input_data)
+                    running[future] = (node, perf_counter())
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node, dispatched = running.pop(future)
+                    component = self.components[node]
+                    try:
+                        output_data, elapsed = future.result()
+                    except BaseException as e:
+                        if self.profiler is not None:
+                            self.profiler.record(f'{node}:{component.__class__.__name__}', component, perf_counter() - dispatched, e)
+                        raise
+                    if self.profiler is not None:
+                        self.profiler.record(f'{node}:{component.__class__.__name__}', component, elapsed)
+                    results[node] = output_data
+                    for child in children[node]:
+                        remaining[child] -= 1
+                        if remaining[child] == 0:
+                            child_input = self._gather(parents[child], results, kwargs_merge_func)
+                            heapq.heappush(ready, (-priority[child], rank[child], child, child_input))
+        finally:
+            for future in running:
+                future.cancel()
+            if executor is None:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+        return {k: v for k, v in results.items() if k in outputs}
+
+    def _node_costs(self) -> List[float]:
+        """Estimated cost of each node: `costs` first, then the mean latency
+        recorded by the profiler, then the mean of the known costs (1 if none)"""
+        costs: List[Optional[float]] = [self.costs.get(node) for node in range(self.n)]
+        if self.profiler is not None:
+            for node, cost in enumerate(costs):
+                if cost is None:
+                    try:
+                        histogram = self.profiler.histogram(f'{node}:{self.components[node].__class__.__name__}')
+                    except KeyError:
+                        continue
+                    if histogram.count:
+                        costs[node] = histogram.mean
+        known = [cost for cost in costs if cost is not None]
+        default = sum(known) / len(known) if known else 1.
+        return [default if cost is None else cost for cost in costs]
+
+    def _priorities(self, children: Union[List[List[int]], Dict[int, List[int]]]) -> Dict[int, float]:
+        """Cost of the longest path from each node to a terminal node, the node included"""
+        costs = self._node_costs()
+        priority: Dict[int, float] = {}
+        for node in reversed(self._order):
+            if isinstance(children, dict) and node not in children:
+                continue
+            priority[node] = costs[node] + max((priority[child] for child in children[node]), default=0.)
+        return priority
+
+    def explain(self) -> ExecutionPlan:
+        """Topological levels, their maximum width and estimated critical path of the graph.
+
+        Costs come from `costs`, then from the profiler's recorded latencies,
+        the others default to the mean of the known ones (1 per node when
+        nothing is known, the critical path is then the longest chain).
+        total_cost / critical_path_cost bounds the speedup of run_parallel.
+        """
+        costs = self._node_costs()
+        priority = self._priorities(self._children)
+        depth = [0] * self.n
+        for node in self._order:
+            for child in self._children[node]:
+                depth[child] = max(depth[child], depth[node] + 1)
+        levels: List[List[int]] = [[] for _ in range(max(depth, default=-1) + 1)]
+        for node in range(self.n):
+            levels[depth[node]].append(node)
+        critical_path: List[int] = []
+        candidates = self._start
+        while candidates:
+            node = max(candidates, key=priority.__getitem__)
+            critical_path.append(node)
+            candidates = self._children[node]
+        return ExecutionPlan(
+            levels=levels,
+            max_level_width=max((len(level) for level in levels), default=0),
+            critical_path=critical_path,
+            critical_path_cost=sum(costs[node] for node in critical_path),
+            total_cost=sum(costs)
+        )
+
+    async def arun(
+        self,
+        data: Dict[int, PipelData],
+        kwargs_merge_func = _default_kwargs_merge,
+        timeouts: Union[None, float, Dict[int, float]] = None,
+        targets: Optional[Iterable[int]] = None
+    ) -> Dict[int, PipelData]:
+        """Same as run on the caller's event loop, every ready node becomes a task.
+
+        Components are awaited in async mode as soon as all their parents
+        finished. `concurrency_limits` caps the concurrent calls of a node
+        across every arun of the loop, `timeouts` (seconds, one value for all
+        the nodes or one per node) bounds each call and raises TimeoutError.
+        The first exception cancels the other tasks and is raised.
+        """
+        data, children, outputs = self._select(data, targets)
+        rank = {node: i for i, node in enumerate(self._serial_order(list(data), children))}
+        parents = {node: sorted(self._prev_state(node), key=rank.__getitem__) for node in rank}
+        remaining = list(self._in_degree)
+        results: Dict[int, PipelData] = {}
+        semaphores = self._semaphores.setdefault(asyncio.get_running_loop(), {})
+
+        async def run_node(node: int, input_data: PipelData) -> PipelData:
+            component = self.components[node]
+            timeout = timeouts.get(node) if isinstance(timeouts, dict) else timeouts
+            limit = self.concurrency_limits.get(node)
+            if limit is None:
+                return await self._acall(node, component, input_data, timeout)
+            semaphore = semaphores.get((node, limit))
+            if semaphore is None:
+                semaphore = semaphores[(node, limit)] = asyncio.Semaphore(limit)
+            async with semaphore:
+                return await self._acall(node, component, input_data, timeout)
+
+        tasks = {asyncio.ensure_future(run_node(node, d)): node for node, d in data.items()}
+        try:
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    node = tasks.pop(task)
+                    results[node] = task.result()
+                    for child in children[node]:
+                        remaining[child] -= 1
+                        if remaining[child] == 0:
+                            child_input = self._gather(parents[child], results, kwargs_merge_func)
+                            tasks[asyncio.ensure_future(run_node(child, child_input))] = child
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        return {k: v for k, v in results.items() if k in outputs}
+
+    async def _acall(self, node: int, component, input_data: PipelData, timeout: Optional[float]) -> PipelData:
+        if self.profiler is None:
+            return await asyncio.wait_for(component(input_data, exec_mode='async'), timeout)
+        with self.profiler.measure(f'{node}:{component.__class__.__name__}', component):
+            return await asyncio.wait_for(component(input_data, exec_mode='async'), timeout)
+
+    @staticmethod
+    def _gather(parents: List[int], results: Dict[int, PipelData], kwargs_merge_func) -> PipelData:
+        """Input of a fan-in node, parents sorted in the order run would merge them.
+
+        The args tuple is built once and the kwargs merged into a new dict,
+        the outputs of the parents are left untouched.
+        """
+        if len(parents) == 1:
+            output = results[parents[0]]
+            return PipelData(output.args, kwargs_merge_func({}, output.kwargs))
+        args = tuple(chain.from_iterable(results[parent].args for parent in parents))
+        kwargs = {}
+        for parent in parents:
+            kwargs = kwargs_merge_func(kwargs, results[parent].kwargs)
+        return PipelData(args, kwargs)
+
+    def stream(
+        self,
+        inputs: Iterable[Dict[int, PipelData]],
+        kwargs_merge_func = _default_kwargs_merge,
+        buffer_size: int = 8
+    ) -> Iterator[Dict[int, PipelData]]:
+        """Runs many input dicts through the graph, yielding the terminal outputs of each in order.
+
+        Every node runs in its own thread and the edges are bounded queues of
+        buffer_size records, so different records occupy different nodes at
+        the same time and a slow node applies backpressure upstream. Nodes
+        process the records in order, each one is yielded as soon as its
+        terminal outputs are all available. Meant for graphs of tens to
+        hundreds of nodes: throughput is limited by the slowest node rather
+        than by the per-record latency. The first exception stops the
+        threads and is raised, closing the generator stops them as well.
+        """
+        if buffer_size < 1:
+            raise ValueError(f'buffer_size must be positive. Found {buffer_size}')
+        stop = threading.Event()
+        # Start nodes read the records, the other nodes one queue per parent
+        start_queues = {node: queue.Queue(buffer_size) for node in self._start}
+        edge_queues = {
+            (parent, child): queue.Queue(buffer_size)
+            for parent in range(self.n) for child in self._children[parent]
+        }
+        results: queue.Queue = queue.Queue(buffer_size * max(1, len(self._terminal)))
+        # start order -> node -> parents in merge order, records usually share one start order
+        plans: Dict[Tuple[int, ...], Dict[int, List[int]]] = {}
+        # Exceptions of the threads, the first one is raised by the generator
+        errors: List[BaseException] = []
+
+        def feed():
+            try:
+                for index, data in enumerate(inputs):
+                    self._check_input(data)
+                    signature = tuple(data)
+                    plan = plans.get(signature)
+                    if plan is None:
+                        rank = {node: i for i, node in enumerate(self._serial_order(list(data), self._children))}
+                        plan = plans[signature] = {
+                            node: sorted(parents, key=rank.__getitem__) for node, parents in enumerate(self._parents)
+                        }
+                    for node, d in data.items():
+                        _put(start_queues[node], (index, plan, d), stop)
+                for q in start_queues.values():
+                    _put(q, _DONE, stop)
+            except _Stopped:
+                pass
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+
+        def work(node: int):
+            component = self.components[node]
+            parents = self._parents[node]
+            in_queues = [start_queues[node]] if not parents else [edge_queues[(p, node)] for p in parents]
+            out_queues = [edge_queues[(node, child)] for child in self._children[node]]
+            try:
+                while True:
+                    items = [_get(q, stop) for q in in_queues]
+                    if items[0] is _DONE:
+                        for q in out_queues:
+                            _put(q, _DONE, stop)
+                        if not out_queues:
+                            _put(results, _DONE, stop)
+                        return
+                    index, plan = items[0][0], items[0][1]
+                    if not parents:
+                        input_data = items[0][2]
+                    else:
+                        outputs = {parent: item[2] for parent, item in zip(parents, items)}
+                        input_data = self._gather(plan[node], outputs, kwargs_merge_func)
+                    output_data = self._call(node, component, input_data)
+                    for q in out_queues:
+                        _put(q, (index, plan, output_data), stop)
+                    if not out_queues:
+                        _put(results, (index, node, output_data), stop)
+            except _Stopped:
+                pass
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+
+        threads = [threading.Thread(target=feed, daemon=True)]
+        threads += [threading.Thread(target=work, args=(node,), daemon=True) for node in range(self.n)]
+        for thread in threads:
+            thread.start()
+        try:
+            pending: Dict[int, Dict[int, PipelData]] = {}
+            next_index = 0
+            finished = 0
+            while finished < len(self._terminal):
+                try:
+                    item = results.get(timeout=0.05)
+                except queue.Empty:
+                    if errors:
+                        raise errors[0]
+                    continue
+                if item is _DONE:
+                    finished += 1
+                    continue
+                index, node, output_data = item
+                pending.setdefault(index, {})[node] = output_data
+                # Terminal nodes process the records in order, so they complete in order
+                while len(pending.get(next_index, ())) == len(self._terminal):
+                    record = pending.pop(next_index)
+                    yield {node: record[node] for node in self._terminal}
+                    next_index += 1
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    def stats(self) -> Dict[str, StageStats]:
+        """Per node snapshot of the profiler, keyed by 'node:ClassName'"""
+        if self.profiler is None:
+            raise ValueError('Profiling is disabled, set dag.profiler = Profiler() first.')
+        return self.profiler.stats()
 
         
         
 __all__ = [
-    'DAGPipeline'
+    'DAGPipeline',
+    'MemoryInfo',
+    'ExecutionPlan'
 ]
@@ -0,0 +1,237 @@
+import os
+import pickle
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from .cache import CacheBackend, CacheInfo, _MISSING
+from .fingerprint import fingerprint
+
+
+class DiskCache(CacheBackend):
+    """Persistent, content-addressed cache backed by a SQLite file.
+
+    Keys are digests of the owning component class, its `cache_version`
+    and the call arguments, so results survive restarts and `deepcopy()`,
+    and are shared by every process opening the same file (e.g. the
+    workers of a `PipelPool`). Bump `cache_version` on the component
+    whenever its results change.
+
+    Values are pickled. `maxsize` (entries) and `max_bytes` (pickled bytes)
+    apply to the namespace of the backend, i.e. to one component class and
+    version: when exceeded its least recently used entries are evicted,
+    other namespaces sharing the file are left untouched. Hits only read:
+    their access times are buffered and written with the next put.
+    """
+    path: str
+    max_bytes: Optional[int]
+    namespace: str
+
+    # Number of rows fetched at a time while evicting
+    _EVICTION_BATCH: int = 64
+    # Buffered access times written at once without waiting for a put
+    _TOUCH_BATCH: int = 256
+
+    def __init__(
+        self,
+        path: str,
+        maxsize: Optional[int] = None, *,
+        max_bytes: Optional[int] = None,
+        namespace: str = '',
+        timeout: float = 30.
+    ):
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError(f'max_bytes must be non negative. Found {max_bytes}')
+        # The size of the entries is their pickled size
+        super().__init__(maxsize, sizeof=None)
+        self.path = os.fspath(path)
+        self.max_bytes = max_bytes
+        self.namespace = namespace
+        self.timeout = timeout
+        self._conn = None
+        # key -> last access time of the hits not written yet
+        self._touched: Dict[bytes, float] = {}
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # Opened lazily, connections can not cross process boundaries
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            # Durable at checkpoints, a crash may lose the last commits but never corrupts the file
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._create_schema(conn)
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            self._conn = conn
+        return self._conn
+
+    @contextmanager
+    def _transaction(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        self.conn.execute('COMMIT')
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection) -> None:
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'key BLOB PRIMARY KEY, namespace TEXT NOT NULL, value BLOB NOT NULL, '
+            'nbytes INTEGER NOT NULL, last_access REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS entries_namespace_access ON entries (namespace, last_access)')
+        # Running totals per namespace, kept by triggers so that puts never scan the entries
+        has_usage = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'usage'").fetchone()
+        if has_usage is None:
+            conn.execute(
+                'CREATE TABLE usage (namespace TEXT PRIMARY KEY, count INTEGER NOT NULL, nbytes INTEGER NOT NULL)'
+            )
+            # Files written before the totals existed
+            conn.execute(
+                'INSERT INTO usage (namespace, count, nbytes) '
+                'SELECT namespace, COUNT(*), SUM(nbytes) FROM entries GROUP BY namespace'
+            )
+        conn.execute(
+            'CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN '
+            'INSERT INTO usage (namespace, count, nbytes) VALUES (NEW.namespace, 1, NEW.nbytes) '
+            'ON CONFLICT (namespace) DO UPDATE SET count = count + 1, nbytes = nbytes + excluded.nbytes; END'
+        )
+        conn.execute(
+            'CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN '
+            'UPDATE usage SET count = count - 1, nbytes = nbytes - OLD.nbytes WHERE namespace = OLD.namespace; END'
+        )
+        conn.execute(
+            'CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF nbytes ON entries BEGIN '
+            'UPDATE usage SET nbytes = nbytes - OLD.nbytes + NEW.nbytes WHERE namespace = NEW.namespace; END'
+        )
+
+    def bind(self, owner) -> 'DiskCache':
+        cls = type(owner)
+        version = getattr(owner, 'cache_version', '')
+        return self.__class__(
+            self.path,
+            self.maxsize,
+            max_bytes=self.max_bytes,
+            namespace=f'{cls.__module__}.{cls.__qualname__}:{version}',
+            timeout=self.timeout
+        )
+
+    def copy(self) -> 'DiskCache':
+        """Returns a new handle on the same file, the entries are shared"""
+        return self.__class__(
+            self.path,
+            self.maxsize,
+            max_bytes=self.max_bytes,
+            namespace=self.namespace,
+            timeout=self.timeout
+        )
+
+    def make_key(self, args: tuple, kwargs: dict) -> bytes:
+        return fingerprint((self.namespace, args, kwargs), digest_size=32)
+
+    def _get(self, key):
+        with self._lock:
+            row = self.conn.execute('SELECT value FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return _MISSING
+            # Only the eviction reads the access times, they are written with the next put
+            self._touched[key] = time.time()
+            if len(self._touched) >= self._TOUCH_BATCH:
+                with self._transaction():
+                    self._flush_touches()
+        return pickle.loads(row[0])
+
+    def _flush_touches(self) -> None:
+        if self._touched:
+            self.conn.executemany(
+                'UPDATE entries SET last_access = ? WHERE key = ?', [(t, k) for k, t in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def _put(self, key, value, nbytes: int) -> None:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if self.max_bytes is not None and len(blob) > self.max_bytes:
+            # The previous result of the key is stale, it must not be served instead
+            with self._lock, self._transaction():
+                self._touched.pop(key, None)
+                self.conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+            return
+        with self._lock, self._transaction():
+            self._flush_touches()
+            # An upsert rather than INSERT OR REPLACE, whose implicit delete would skip the triggers
+            self.conn.execute(
+                'INSERT INTO entries (key, namespace, value, nbytes, last_access) VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET value = excluded.value, nbytes = excluded.nbytes, '
+                'last_access = excluded.last_access',
+                (key, self.namespace, blob, len(blob), time.time())
+            )
+            if self.maxsize is not None or self.max_bytes is not None:
+                self._evict()
+
+    def _evict(self) -> None:
+        count, nbytes = self._usage()
+        while (self.maxsize is not None and count > self.maxsize) or \
+                (self.max_bytes is not None and nbytes > self.max_bytes):
+            rows = self.conn.execute(
+                'SELECT key, nbytes FROM entries WHERE namespace = ? ORDER BY last_access LIMIT ?',
+                (self.namespace, self._EVICTION_BATCH)
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                self.conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+                count -= 1
+                nbytes -= size
+                self.evictions += 1
+                if (self.maxsize is None or count <= self.maxsize) and \
+                        (self.max_bytes is None or nbytes <= self.max_bytes):
+                    break
+
+    def _clear(self) -> None:
+        """Deletes the entries of this namespace only"""
+        with self._lock:
+            self.conn.execute('DELETE FROM entries WHERE namespace = ?', (self.namespace,))
+
+    def _usage(self):
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT count, nbytes FROM usage WHERE namespace = ?', (self.namespace,)
+            ).fetchone()
+        return row if row is not None else (0, 0)
+
+    def info(self) -> CacheInfo:
+        currsize, nbytes = self._usage()
+        return CacheInfo(self.hits, self.misses, self.maxsize, currsize, self.evictions, nbytes)
+
+    def close(self) -> None:
+        if self._conn is not None:
+            with self._lock, self._transaction():
+                self._flush_touches()
+            self._conn.close()
+            self._conn = None
+
+    def __len__(self) -> int:
+        return self._usage()[0]
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state['_conn'] = None
+        state['_touched'] = {}
+        return state
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(path={self.path!r}, maxsize={self.maxsize}, max_bytes={self.max_bytes})'
+
+
+__all__ = [
+    'DiskCache'
+]
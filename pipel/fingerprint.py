@@ -0,0 +1,204 @@
+import dataclasses
+import hashlib
+import pickle
+import struct
+from types import MappingProxyType
+from typing import Any, Callable, Dict
+
+"""Stable content fingerprints for PipelData payloads"""
+
+# Hashers of user defined types: obj -> fingerprintable substitute
+_HASHERS: Dict[type, Callable[[Any], Any]] = {}
+
+DIGEST_SIZE: int = 16
+
+
+def register_hasher(cls: type, func: Callable[[Any], Any]) -> None:
+    """Registers how to fingerprint instances of cls (and its subclasses).
+
+    func receives the instance and returns any fingerprintable object
+    describing its content, e.g. a tuple of fields or a buffer:
+    ```python
+    register_hasher(DataFrame, lambda df: (tuple(df.columns), df.to_numpy()))
+    ```
+    """
+    _HASHERS[cls] = func
+    _resolved.clear()
+
+
+def unregister_hasher(cls: type) -> None:
+    _HASHERS.pop(cls, None)
+    _resolved.clear()
+
+
+def fingerprint(obj: Any, digest_size: int = DIGEST_SIZE) -> bytes:
+    """Returns a digest of the content of obj, stable across processes and runs.
+
+    Nested containers, dataclasses (PipelData included) and buffers are
+    supported. Buffers (bytes, bytearray, memoryview, array-likes) are
+    digested without copying when contiguous. dicts and sets do not depend
+    on their iteration order. Other types use a registered hasher, or
+    their pickled representation as a last resort.
+    """
+    h = hashlib.blake2b(digest_size=digest_size)
+    _feed(obj, h, set())
+    return h.digest()
+
+
+def _tag(h, tag: bytes, size: int) -> None:
+    h.update(tag)
+    h.update(size.to_bytes(8, 'little'))
+
+
+def _feed_none(obj, h, active) -> None:
+    h.update(b'N')
+
+def _feed_bool(obj, h, active) -> None:
+    h.update(b'T' if obj else b'F')
+
+def _feed_int(obj, h, active) -> None:
+    data = obj.to_bytes((obj.bit_length() + 8) // 8, 'little', signed=True)
+    _tag(h, b'i', len(data))
+    h.update(data)
+
+def _feed_float(obj, h, active) -> None:
+    h.update(b'f')
+    h.update(struct.pack('<d', obj))
+
+def _feed_complex(obj, h, active) -> None:
+    h.update(b'c')
+    h.update(struct.pack('<dd', obj.real, obj.imag))
+
+def _feed_str(obj, h, active) -> None:
+    data = obj.encode('utf-8', 'surrogatepass')
+    _tag(h, b's', len(data))
+    h.update(data)
+
+def _feed_bytes(obj, h, active) -> None:
+    # hashlib reads the buffer in place
+    _tag(h, b'b', len(obj))
+    h.update(obj)
+
+def _feed_memoryview(obj: memoryview, h, active, tag: bytes = b'm') -> None:
+    _tag(h, tag, obj.nbytes)
+    h.update(obj.format.encode())
+    h.update(repr(obj.shape).encode())
+    h.update(obj if obj.c_contiguous else obj.tobytes())
+
+def _feed_sequence(tag: bytes):
+    def feed(obj, h, active) -> None:
+        _enter(obj, active)
+        _tag(h, tag, len(obj))
+        for item in obj:
+            _feed(item, h, active)
+        active.discard(id(obj))
+    return feed
+
+def _feed_set(tag: bytes):
+    def feed(obj, h, active) -> None:
+        _enter(obj, active)
+        _tag(h, tag, len(obj))
+        for digest in sorted(_digest(item, active) for item in obj):
+            h.update(digest)
+        active.discard(id(obj))
+    return feed
+
+def _feed_dict(obj, h, active) -> None:
+    _enter(obj, active)
+    _tag(h, b'd', len(obj))
+    for digest in sorted(_digest(k, active) + _digest(v, active) for k, v in obj.items()):
+        h.update(digest)
+    active.discard(id(obj))
+
+def _digest(obj, active) -> bytes:
+    h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    _feed(obj, h, active)
+    return h.digest()
+
+def _enter(obj, active) -> None:
+    if id(obj) in active:
+        raise ValueError(f'Cannot fingerprint self-referencing {type(obj).__name__}')
+    active.add(id(obj))
+
+def _type_name(cls: type) -> bytes:
+    return f'{cls.__module__}.{cls.__qualname__}'.encode()
+
+def _feed_object(obj, h, active) -> None:
+    cls = type(obj)
+    name = _type_name(cls)
+    if dataclasses.is_dataclass(cls):
+        _tag(h, b'D', len(name))
+        h.update(name)
+        _feed(tuple(getattr(obj, f.name) for f in dataclasses.fields(obj)), h, active)
+        return
+    try:
+        view = memoryview(obj)
+    except TypeError:
+        view = None
+    if view is not None:
+        # Array-likes, dtype and shape are part of the format
+        _tag(h, b'B', len(name))
+        h.update(name)
+        _feed_memoryview(view, h, active)
+        return
+    try:
+        data = pickle.dumps(obj, protocol=4)
+    except Exception as e:
+        raise TypeError(
+            f'Cannot fingerprint objects of type {cls.__qualname__}, use register_hasher()'
+        ) from e
+    _tag(h, b'P', len(data))
+    h.update(data)
+
+def _registered(func: Callable[[Any], Any], cls: type):
+    name = _type_name(cls)
+    def feed(obj, h, active) -> None:
+        _tag(h, b'R', len(name))
+        h.update(name)
+        _feed(func(obj), h, active)
+    return feed
+
+_BUILTINS = {
+    type(None): _feed_none,
+    bool: _feed_bool,
+    int: _feed_int,
+    float: _feed_float,
+    complex: _feed_complex,
+    str: _feed_str,
+    bytes: _feed_bytes,
+    bytearray: _feed_bytes,
+    memoryview: _feed_memoryview,
+    tuple: _feed_sequence(b't'),
+    list: _feed_sequence(b'l'),
+    set: _feed_set(b'S'),
+    frozenset: _feed_set(b'z'),
+    dict: _feed_dict,
+    MappingProxyType: _feed_dict,
+}
+
+# type -> feed function, filled on first use of each type
+_resolved: Dict[type, Callable] = {}
+
+def _resolve(cls: type) -> Callable:
+    for base in cls.__mro__:
+        if base in _HASHERS:
+            # Subclasses share the fingerprints of the registered type
+            return _registered(_HASHERS[base], base)
+    for base in cls.__mro__[:-1]:
+        if base in _BUILTINS:
+            return _BUILTINS[base]
+    return _feed_object
+
+def _feed(obj, h, active) -> None:
+    cls = type(obj)
+    feed = _resolved.get(cls)
+    if feed is None:
+        feed = _resolved[cls] = _resolve(cls)
+    feed(obj, h, active)
+
+
+__all__ = [
+    'fingerprint',
+    'register_hasher',
+    'unregister_hasher'
+]
@@ -0,0 +1,105 @@
+import logging
+from contextlib import contextmanager
+from functools import partial
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from .pipel_types import PipelData
+
+
+class ComponentHook:
+    """Observer of the spans of PipelineComponent calls.
+
+    A call goes through the 'validate_input', 'run' and 'validate_output'
+    spans. Hooks are asked once per call whether they are `enabled()`,
+    when none is the call pays no tracing cost at all.
+    """
+
+    def enabled(self) -> bool:
+        return True
+
+    def span_start(self, component, span: str, data: PipelData) -> None:
+        """Called before the span runs, data is the input of the span"""
+        pass
+
+    def span_end(self, component, span: str, elapsed: float, error: Optional[BaseException]) -> None:
+        """Called after the span ran, error is the exception it raised if any"""
+        pass
+
+
+class LoggerHook(ComponentHook):
+    """Logs the spans through a logger.
+
+    Standard library loggers are checked with `isEnabledFor` and receive
+    lazy %-style arguments. Any other object exposing a method named after
+    the level (e.g. `info(msg)`) is always enabled and receives the
+    formatted message.
+    """
+    # span -> (message, whether the component is part of the message)
+    _START: Dict[str, Tuple[str, bool]] = {
+        'validate_input': ('Validating input to %r', True),
+        'run': ('Running %r', True),
+        'validate_output': ('Validating output', False),
+    }
+    _END: Dict[str, Tuple[str, bool]] = {
+        'validate_input': ('Valid input', False),
+        'run': ('Finished running %r', True),
+        'validate_output': ('Valid output from %r', True),
+    }
+
+    def __init__(self, logger: Any, level: int = logging.INFO):
+        self.logger = logger
+        self.level = level
+        self._is_enabled_for = getattr(logger, 'isEnabledFor', None)
+        if self._is_enabled_for is not None:
+            self._log = partial(logger.log, level)
+        else:
+            self._log = getattr(logger, logging.getLevelName(level).lower())
+
+    def enabled(self) -> bool:
+        return self._is_enabled_for is None or self._is_enabled_for(self.level)
+
+    def _emit(self, message: Tuple[str, bool], component) -> None:
+        msg, with_component = message
+        if not with_component:
+            self._log(msg)
+        elif self._is_enabled_for is not None:
+            self._log(msg, component)
+        else:
+            self._log(msg % (component,))
+
+    def span_start(self, component, span: str, data: PipelData) -> None:
+        message = self._START.get(span)
+        if message is not None:
+            self._emit(message, component)
+
+    def span_end(self, component, span: str, elapsed: float, error: Optional[BaseException]) -> None:
+        message = self._END.get(span)
+        if message is not None and error is None:
+            self._emit(message, component)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(logger={repr(self.logger)})'
+
+
+@contextmanager
+def trace_span(hooks: List[ComponentHook], component, span: str, data: PipelData):
+    for hook in hooks:
+        hook.span_start(component, span, data)
+    error = None
+    start = perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        elapsed = perf_counter() - start
+        for hook in hooks:
+            hook.span_end(component, span, elapsed, error)
+
+
+__all__ = [
+    'ComponentHook',
+    'LoggerHook'
+]
@@ -1,18 +1,33 @@
 from abc import ABC, abstractmethod
 from multiprocessing import Queue, Process
 import queue 
-from typing import List, Optional
+from time import perf_counter
+from typing import Dict, List, Optional
 import uuid
 
 from ..pipel_types import PipelData
+from ..cache import CacheBackend, _MISSING
+from ..profiling import Profiler, StageStats
 
 class PicklablePipelineComponent(ABC):
+    cache: Optional[CacheBackend]
+    # Part of the keys of shared cache backends, bump it when _run changes its results
+    cache_version: str = '0'
 
-    def __init__(self):
+    def __init__(self, cache: Optional[CacheBackend] = None):
+        """The cache is carried to the workers, a DiskCache lets them share the results across runs"""
         self.id = uuid.uuid4().hex  
+        self.cache = cache.bind(self) if cache is not None else None
         
     def __call__(self, data: PipelData):
-        return self._run(*data.args, **data.kwargs)
+        if self.cache is None:
+            return self._run(*data.args, **data.kwargs)
+        key = self.cache.make_key((data,), {})
+        out = self.cache.get(key, _MISSING)
+        if out is _MISSING:
+            out = self._run(*data.args, **data.kwargs)
+            self.cache.put(key, out)
+        return out
     
     @abstractmethod
     def _run(self, *args, **kwargs) -> PipelData:
@@ -26,7 +41,9 @@ class PicklablePipelineComponent(ABC):
 
     def deepcopy(self):
         """Returns a new instance of the same derivative class."""
-        return self.__class__()
+        if self.cache is None:
+            return self.__class__()
+        return self.__class__(cache=self.cache.copy())
     
 class PipelPool:
     # PipelPool can only have one internal managed Queue, this happens at __init__ time
@@ -54,6 +71,10 @@ class PipelPool:
     
     # List of workers
     workers: List[Process]
+
+    # Opt-in instrumentation, the workers send their timings on _stats_queue
+    profiler: Optional[Profiler]
+    _stats_queue: Optional[Queue]
         
     def __init__(
             self, 
@@ -63,9 +84,12 @@ class PipelPool:
             in_queues: Optional[List[Queue]] = None,
             out_queues: Optional[List[Queue]] = None,
             event_queue: Optional[Queue] = None,
+            profiler: Optional[Profiler] = None,
         ):
         self._job_timeout = job_timeout
         self.component = component
+        self.profiler = profiler
+        self._stats_queue = Queue() if profiler is not None else None
         
         self.event_queue = event_queue or Queue()
         self._init_data_queues(
@@ -83,14 +107,25 @@ class PipelPool:
         out_queues: List[Queue],
         event_queue: Queue,
         job_timeout: float,
-        stop_token: str
+        stop_token: str,
+        stats_queue: Optional[Queue] = None
     ):
         terminate = False
         while not terminate:
             for in_queue in in_queues:
                 try:
                     data: PipelData = in_queue.get(timeout=job_timeout)
-                    out: PipelData = func(data)
+                    if stats_queue is None:
+                        out: PipelData = func(data)
+                    else:
+                        start = perf_counter()
+                        try:
+                            out = func(data)
+                        except Exception as e:
+                            # Exceptions are not always picklable, their repr is
+                            stats_queue.put((perf_counter() - start, repr(e)))
+                            raise
+                        stats_queue.put((perf_counter() - start, None))
                     # Post the output to all out_queues
                     for out_queue in out_queues:
                         out_queue.put(out)
@@ -113,7 +148,8 @@ class PipelPool:
                                 self.out_queues,
                                 self.event_queue,
                                 self._job_timeout,
-                                self.STOP_TOKEN
+                                self.STOP_TOKEN,
+                                self._stats_queue
                             )
                     )
             proc.start()
@@ -198,6 +234,12 @@ class PipelPool:
             self.remove_workers(len(self), force=force)
         self._close_internal_data_queues()
         self._close_event_queue()
+        if self._stats_queue is not None:
+            # Keeps the timings of the stopped workers
+            self._collect_stats()
+            self._stats_queue.close()
+            self._stats_queue.join_thread()
+            self._stats_queue = None
 
     def remove_workers(self, amount: int, force: bool = False):
         if amount < 0:
@@ -228,6 +270,23 @@ class PipelPool:
         
         self._add_workers(amount)
 
+    def stats(self) -> Dict[str, StageStats]:
+        """Collects the timings sent by the workers so far and returns the profiler snapshot"""
+        if self.profiler is None:
+            raise ValueError('Profiling is disabled, pass a Profiler to the PipelPool.')
+        if self._stats_queue is not None:
+            self._collect_stats()
+        return self.profiler.stats()
+
+    def _collect_stats(self) -> None:
+        name = self.component.__class__.__name__
+        while True:
+            try:
+                elapsed, error = self._stats_queue.get(block=False)
+            except queue.Empty:
+                break
+            self.profiler.record(name, self.component, elapsed, RuntimeError(error) if error else None)
+
     def __len__(self):
         return len(self.workers)
     
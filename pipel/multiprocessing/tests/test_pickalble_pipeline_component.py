@@ -1,6 +1,6 @@
 import pytest
 from pipel.multiprocessing import PicklablePipelineComponent
-from pipel import PipelData
+from pipel import PipelData, DiskCache
 
 class Adder(PicklablePipelineComponent):
     
@@ -22,3 +22,12 @@ def test_picklable_component_run(simple_component):
     data = PipelData(args=(10,), kwargs={})
     out:PipelData = simple_component(data)
     assert out.args[0] == 12
+
+def test_picklable_component_disk_cache(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    data = PipelData(args=(10,), kwargs={})
+    component = Adder(cache=DiskCache(path))
+    component(data)
+    clone = component.deepcopy()
+    assert clone(data).args[0] == 12
+    assert clone.cache.hits == 1
@@ -2,7 +2,7 @@ import time
 import multiprocessing as mp
 from multiprocessing import Queue
 from pipel.multiprocessing import PicklablePipelineComponent, PipelPool
-from pipel import PipelData
+from pipel import PipelData, DiskCache, Profiler
 
 class Adder(PicklablePipelineComponent):
     
@@ -246,4 +246,29 @@ def test_pool_change_component_sub_event_queue():
     e.join_thread()
     sub_e.close()
     sub_e.join_thread()    
-    
\ No newline at end of file
+    
+def test_pool_disk_cache_shared_across_runs(tmp_path):
+    """Workers store their results in the DiskCache, later pools reuse them"""
+    path = str(tmp_path / 'cache.sqlite')
+    input_data = PipelData(args=(10,), kwargs={})
+    with PipelPool(Adder(cache=DiskCache(path))) as pool:
+        pool.put(input_data)
+        data: PipelData = pool.get()
+    assert data.args[0] == 12
+
+    component = Adder(cache=DiskCache(path))
+    assert len(component.cache) == 1
+    with PipelPool(component) as pool:
+        pool.put(input_data)
+        data: PipelData = pool.get()
+    assert data.args[0] == 12
+
+def test_pool_profiler():
+    with PipelPool(Multiplier(), num_workers=2, profiler=Profiler()) as pool:
+        for i in range(4):
+            pool.put(PipelData(args=(i,), kwargs={}))
+        assert sorted(pool.get().args[0] for _ in range(4)) == [0, 2, 4, 6]
+    stats = pool.stats()['Multiplier']
+    assert stats.calls == 4
+    assert stats.errors == 0
+    assert stats.p50 >= 0.5
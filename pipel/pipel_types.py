@@ -1,19 +1,102 @@
-from typing import Literal, Tuple, Any, Dict
+from types import MappingProxyType
+from typing import Literal, Tuple, Any, Dict, Mapping, Optional
 from dataclasses import dataclass, field
+from .fingerprint import fingerprint, register_hasher
 
 EXEC_MODE = Literal['sync', 'async']
 
-@dataclass
+@dataclass(slots=True)
 class PipelData:
     args: Tuple[Any]
     kwargs: Dict[str, Any] = field(default_factory=dict)
-    
+
     # Needed for caching
     def __hash__(self):
-        # convert dict → sorted tuple to make it hashable
-        return hash((self.args, tuple(sorted(self.kwargs.items()))))
+        try:
+            if not self.kwargs:
+                return hash((self.args, ()))
+            # convert dict → sorted tuple to make it hashable
+            return hash((self.args, tuple(sorted(self.kwargs.items()))))
+        except TypeError:
+            # Unhashable payloads (lists, dicts, buffers, arrays...) are hashed by content
+            return hash(self.fingerprint())
+
+    def fingerprint(self) -> bytes:
+        """Stable digest of the content, see pipel.fingerprint"""
+        return fingerprint(self)
+
+    def freeze(self) -> 'FrozenPipelData':
+        """Immutable view sharing the args tuple and the kwargs mapping, nothing is copied"""
+        return FrozenPipelData(self.args, self.kwargs)
+
+
+class FrozenPipelData(PipelData):
+    """Immutable PipelData without per-instance __dict__ and with a cached hash.
+
+    The kwargs mapping is exposed read-only but not copied: the dict given
+    at construction must not be mutated afterwards. Compares equal to a
+    PipelData with the same content.
+    """
+    __slots__ = ('_hash',)
+    kwargs: Mapping[str, Any]
+
+    def __init__(self, args: Tuple[Any], kwargs: Optional[Mapping[str, Any]] = None):
+        if kwargs is None:
+            kwargs = _EMPTY_KWARGS
+        elif not isinstance(kwargs, MappingProxyType):
+            kwargs = MappingProxyType(kwargs)
+        object.__setattr__(self, 'args', args)
+        object.__setattr__(self, 'kwargs', kwargs)
+        object.__setattr__(self, '_hash', None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{self.__class__.__name__} is immutable, use replace()')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{self.__class__.__name__} is immutable, use replace()')
+
+    def __hash__(self):
+        _hash = self._hash
+        if _hash is None:
+            _hash = PipelData.__hash__(self)
+            object.__setattr__(self, '_hash', _hash)
+        return _hash
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, PipelData):
+            return NotImplemented
+        return self.args == other.args and self.kwargs == other.kwargs
+
+    def __reduce__(self):
+        return (self.__class__, (self.args, dict(self.kwargs)))
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(args={self.args!r}, kwargs={dict(self.kwargs)!r})'
+
+    def freeze(self) -> 'FrozenPipelData':
+        return self
+
+    def replace(self, args: Optional[Tuple[Any]] = None, kwargs: Optional[Mapping[str, Any]] = None) -> 'FrozenPipelData':
+        """New FrozenPipelData reusing the args tuple and kwargs mapping that are not replaced"""
+        return FrozenPipelData(
+            self.args if args is None else args,
+            self.kwargs if kwargs is None else kwargs
+        )
+
+    def thaw(self) -> PipelData:
+        """Mutable PipelData, only the kwargs are copied"""
+        return PipelData(self.args, dict(self.kwargs))
+
+
+_EMPTY_KWARGS = MappingProxyType({})
+
+# FrozenPipelData and PipelData with the same content share the fingerprint
+register_hasher(PipelData, lambda data: (data.args, data.kwargs))
 
 __all__ = [
-    'EXEC_MODE', 
-    'PipelData'
+    'EXEC_MODE',
+    'PipelData',
+    'FrozenPipelData'
 ]
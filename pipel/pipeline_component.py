@@ -1,15 +1,24 @@
 from abc import ABC, abstractmethod
-from typing import Any, Optional
+import asyncio
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
 from .pipel_types import EXEC_MODE
-from functools import lru_cache, wraps
+from functools import lru_cache, partial, wraps
 import uuid
 import types
 from .pipel_types import PipelData
+from .cache import CacheBackend, LRUCache, async_cached, async_lru_cache, cached, _MISSING
+from .hooks import ComponentHook, LoggerHook, trace_span
+from .validation import OnCacheMiss, Schema, ValidationPolicy
 
 class UnsafePipelineComponent(ABC):
     """Pipeline component used for quick prototyping"""
     logger: Optional[Any]
     cache_size: Optional[int]
+    cache: Optional[CacheBackend]
+    # Part of the keys of shared cache backends, bump it when _run changes its results
+    cache_version: str = '0'
+    # Blocking components without _a_run are offloaded to the loop's executor in async mode
+    blocking: bool = False
     
     @staticmethod
     def __identity_decorator(func):
@@ -24,14 +33,31 @@ class UnsafePipelineComponent(ABC):
         logger = None,
         cache_size: int = 0,
         logger_decorator = None,
+        cache: Optional[CacheBackend] = None,
     ):
+        if cache is not None and cache_size:
+            raise ValueError('Either cache_size or cache can be given, not both.')
         self.logger = logger
-        self.cache_size = cache_size
+        self.cache = cache.bind(self) if cache is not None else None
+        self.cache_size = cache.maxsize if cache is not None else cache_size
         self.id = uuid.uuid4().hex  
         self.__logger_decorator = logger_decorator or self.__identity_decorator
-        
+        self.__build_runs()
+
+    def __build_runs(self) -> None:
+        """Builds the cached runs behind __call__, again after unpickling"""
+        # A backend replaces the builtin LRU caches, the async path gets its own copy
+        if self.cache is not None:
+            sync_cache = cached(self.cache)
+        elif getattr(self, '_run_batch', None) is not None:
+            # run_batch needs per key access to the cache, lru_cache does not provide it
+            sync_cache = cached(LRUCache(self.cache_size, sizeof=None))
+        else:
+            sync_cache = lru_cache(maxsize=self.cache_size)
+        async_cache = async_cached(self.cache.copy()) if self.cache is not None else async_lru_cache(maxsize=self.cache_size)
+
         # Cached run
-        @lru_cache(maxsize=self.cache_size)
+        @sync_cache
         @self.__logger_decorator
         def __cached_run(data: PipelData) -> Any:
             return self._run(*data.args, **data.kwargs)
@@ -40,12 +66,14 @@ class UnsafePipelineComponent(ABC):
         _a_run = getattr(self, '_a_run', None)
         if _a_run is None:
             async def _a_run(self, *args, **kwargs):
+                if self.blocking:
+                    return await asyncio.get_running_loop().run_in_executor(None, partial(self._run, *args, **kwargs))
                 return self._run(*args, **kwargs)
             setattr(self, '_a_run', types.MethodType(_a_run, self))
         
         
-        # Cached a_run
-        @lru_cache(maxsize=self.cache_size)
+        # Cached a_run, stores the awaited results instead of the coroutines
+        @async_cache
         @self.__logger_decorator
         async def __cached_a_run(data: PipelData) -> Any:
             return await self._a_run(*data.args, **data.kwargs)
@@ -54,6 +82,35 @@ class UnsafePipelineComponent(ABC):
         self.__run = __cached_run
         self.__a_run = __cached_a_run
 
+    # Instance attributes holding closures, rebuilt instead of pickled
+    _UNPICKLED = ('_UnsafePipelineComponent__run', '_UnsafePipelineComponent__a_run')
+
+    def __getstate__(self):
+        """Components are pickled without their cached runs, e.g. for a ProcessPoolExecutor.
+
+        The builtin LRU caches start empty in the other process, backends are
+        pickled with their entries. A custom logger_decorator must be picklable.
+        """
+        state = self.__dict__.copy()
+        for name in self._UNPICKLED:
+            state.pop(name, None)
+        # The async fallback is a closure set on the instance, _a_run methods of the class are kept
+        if '_a_run' in state and not hasattr(type(self), '_a_run'):
+            del state['_a_run']
+        if self.__logger_decorator is self.__identity_decorator:
+            state['_UnsafePipelineComponent__logger_decorator'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.__logger_decorator is None:
+            self.__logger_decorator = self._default_logger_decorator()
+        self.__build_runs()
+
+    def _default_logger_decorator(self):
+        """Decorator of an unpickled component whose decorator was not pickled"""
+        return self.__identity_decorator
+
     def __call__(self, data: PipelData, exec_mode: EXEC_MODE = 'sync'):
         if exec_mode == 'sync':
             return self.__run(data)
@@ -61,6 +118,80 @@ class UnsafePipelineComponent(ABC):
             return self.__a_run(data)
         else:
             raise ValueError('exec_mode must be either \'sync\' or \'async\'.')
+
+    def _fused(self) -> Tuple[Callable, bool]:
+        """Cheapest callable equivalent to a sync call, used by compiled pipelines.
+
+        Returns (function, unpack): with unpack the function takes the args
+        and kwargs of the data instead of the data. Components without cache
+        nor logger decorator are called straight through _run, their calls
+        are not counted in cache_info.
+        """
+        if self.cache is None and not self.cache_size and self.__logger_decorator is self.__identity_decorator:
+            return self._run, True
+        return self.__run, False
+
+    def run_batch(self, batch: Iterable[PipelData]) -> List[PipelData]:
+        """Runs the component on every item of the batch, preserving the order.
+
+        Components implementing `_run_batch(batch: List[PipelData]) -> List[PipelData]`
+        receive all the cache misses of the batch at once, duplicated items
+        are computed once. The others are called item by item. The logger
+        decorator, if any, wraps each miss: the first wrapped call runs the
+        whole batch, the others return their output.
+        """
+        if getattr(self, '_run_batch', None) is None:
+            return [self(data) for data in batch]
+        batch = list(batch)
+        cache = self.__run.cache
+        if cache.maxsize == 0:
+            cache.record(misses=len(batch))
+            return self._execute_batch(batch)
+
+        results: List[Optional[PipelData]] = [None] * len(batch)
+        # key -> positions of the missing item in the batch
+        pending = {}
+        for i, data in enumerate(batch):
+            key = cache.make_key((data,), {})
+            positions = pending.get(key)
+            if positions is not None:
+                cache.record(hits=1)
+                positions.append(i)
+                continue
+            value = cache.get(key, _MISSING)
+            if value is _MISSING:
+                pending[key] = [i]
+            else:
+                results[i] = value
+
+        if pending:
+            outputs = self._execute_batch([batch[positions[0]] for positions in pending.values()])
+            for (key, positions), output in zip(pending.items(), outputs):
+                cache.put(key, output)
+                for i in positions:
+                    results[i] = output
+        return results
+
+    def _execute_batch(self, batch: List[PipelData]) -> List[PipelData]:
+        if self.__logger_decorator is self.__identity_decorator:
+            return self._checked_run_batch(batch)
+        outputs: Optional[List[PipelData]] = None
+
+        def output(i: int, data: PipelData) -> PipelData:
+            nonlocal outputs
+            if outputs is None:
+                outputs = self._checked_run_batch(batch)
+            return outputs[i]
+
+        return [self.__logger_decorator(partial(output, i))(data) for i, data in enumerate(batch)]
+
+    def _checked_run_batch(self, batch: List[PipelData]) -> List[PipelData]:
+        outputs = self._run_batch(batch)
+        if len(outputs) != len(batch):
+            raise ValueError(
+                f'{self.__class__.__name__}._run_batch returned {len(outputs)} outputs for {len(batch)} inputs'
+            )
+        return outputs
     
     @abstractmethod
     def _run(self, *args, **kwargs) -> PipelData:
@@ -72,6 +203,8 @@ class UnsafePipelineComponent(ABC):
         )
 
     def __repr__(self) -> str:
+        if self.cache is not None:
+            return f'{self.__class__.__name__}(id={self.id}, logger={repr(self.logger)}, cache={repr(self.cache)})'
         return f'{self.__class__.__name__}(id={self.id}, logger={repr(self.logger)}, cache_size={self.cache_size})'
         
     def cache_info(self, exec_mode: EXEC_MODE = 'sync'):
@@ -97,38 +230,237 @@ class UnsafePipelineComponent(ABC):
         return self.__class__(
             logger = self.logger,
             logger_decorator = self.__logger_decorator, 
-            cache_size = self.cache_size,
+            cache_size = self.cache_size if self.cache is None else 0,
+            cache = self.cache.copy() if self.cache is not None else None,
         )
 
 class PipelineComponent(UnsafePipelineComponent):
     """The OG component"""
+    hooks: List[ComponentHook]
+    # Declarative alternative to overriding validate_input/validate_output
+    input_schema: Optional[Schema] = None
+    output_schema: Optional[Schema] = None
+    # Hook logging through `logger`, first of `hooks` while there is a logger
+    _logger_hook: Optional[LoggerHook] = None
+
+    def __init__(
+        self, *args,
+        hooks: Optional[List[ComponentHook]] = None,
+        validation: Optional[ValidationPolicy] = None,
+        **kwargs
+    ):
+        cls = self.__class__
+        for method, schema in (('validate_input', 'input_schema'), ('validate_output', 'output_schema')):
+            if getattr(cls, method) is getattr(PipelineComponent, method) and getattr(cls, schema) is None:
+                raise TypeError(f'{cls.__name__} must implement {method} or declare {schema}')
+        self.validation = validation or OnCacheMiss()
+        kwargs.update({'logger_decorator': self._default_logger_decorator()})
+        super().__init__(*args, **kwargs)
+        self.hooks = list(hooks or [])
+        self._sync_logger_hook()
 
-    def __init__(self, *args, **kwargs):
+    def _default_logger_decorator(self):
+        """Validates and traces every call, applied by UnsafePipelineComponent around _run and _a_run"""
 
         def logger_validation_decorator(func):
+            if asyncio.iscoroutinefunction(func):
+                @wraps(func)
+                async def a_wrapper(data: PipelData):
+                    validate = self._validation.on_cache_miss
+                    # Single branch when there is nothing to trace
+                    active = [hook for hook in self.hooks if hook.enabled()] if self.hooks else None
+                    if not active:
+                        if validate:
+                            self.validate_input(data)
+                        result_data: PipelData = await func(data)
+                        if validate:
+                            result_data = self._validated_result(None, result_data)
+                        return result_data
+                    if validate:
+                        self._traced_validation(active, 'validate_input', self.validate_input, data)
+                    with trace_span(active, self, 'run', data):
+                        result_data = await func(data)
+                    if validate:
+                        result_data = self._validated_result(active, result_data)
+                    return result_data
+                return a_wrapper
+
             @wraps(func)
             def wrapper(data: PipelData):
-                self.logger.info(f'Validating input to {repr(self)}') if self.logger else None
-                self.validate_input(data)
-                self.logger.info('Valid input') if self.logger else None
-                self.logger.info(f'Running {repr(self)}') if self.logger else None
-                result_data: PipelData = func(data)
-                self.logger.info(f'Finished running {repr(self)}') if self.logger else None
-                self.logger.info('Validating output') if self.logger else None
-                self.validate_output(result_data)
-                self.logger.info(f'Valid output from {repr(self)}') if self.logger else None
+                validate = self._validation.on_cache_miss
+                # Single branch when there is nothing to trace
+                active = [hook for hook in self.hooks if hook.enabled()] if self.hooks else None
+                if not active:
+                    if validate:
+                        self.validate_input(data)
+                    result_data: PipelData = func(data)
+                    if validate:
+                        result_data = self._validated_result(None, result_data)
+                    return result_data
+                if validate:
+                    self._traced_validation(active, 'validate_input', self.validate_input, data)
+                with trace_span(active, self, 'run', data):
+                    result_data = func(data)
+                if validate:
+                    result_data = self._validated_result(active, result_data)
                 return result_data
             return wrapper 
-        kwargs.update({'logger_decorator': logger_validation_decorator})
-        super().__init__(*args, **kwargs)
-    
-    @abstractmethod
+        return logger_validation_decorator
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        # The validation decorator is a closure, rebuilt by _default_logger_decorator
+        state['_UnsafePipelineComponent__logger_decorator'] = None
+        return state
+
+    @property
+    def logger(self) -> Optional[Any]:
+        return self._logger
+
+    @logger.setter
+    def logger(self, logger: Optional[Any]):
+        """The logger can be replaced or removed at runtime, its hook follows"""
+        self._logger = logger
+        # UnsafePipelineComponent.__init__ sets the logger before the hooks exist
+        if 'hooks' in self.__dict__:
+            self._sync_logger_hook()
+
+    def _sync_logger_hook(self) -> None:
+        if self._logger_hook is not None and self._logger_hook in self.hooks:
+            self.hooks.remove(self._logger_hook)
+        self._logger_hook = LoggerHook(self._logger) if self._logger else None
+        if self._logger_hook is not None:
+            self.hooks.insert(0, self._logger_hook)
+
+    @property
+    def validation(self) -> ValidationPolicy:
+        return self._validation
+
+    @validation.setter
+    def validation(self, policy: ValidationPolicy):
+        """The policy can be switched at runtime"""
+        if not isinstance(policy, ValidationPolicy):
+            raise ValueError('validation must be a ValidationPolicy.')
+        self._validation = policy
+
+    def _validated_result(self, active, result):
+        """Validates the output of a call, returns it or the generator validating its items.
+
+        While streaming a stage may return None (nothing to validate) or an
+        iterable of PipelData, validate_output then checks each item.
+        """
+        if isinstance(result, PipelData):
+            self._traced_validation(active, 'validate_output', self.validate_output, result)
+            return result
+        if result is None:
+            return result
+        if isinstance(result, (list, tuple)):
+            for data in result:
+                self._traced_validation(active, 'validate_output', self.validate_output, data)
+            return result
+        # Other iterables are validated lazily, as the items are emitted
+        return self._validated_items(active, result)
+
+    def _validated_items(self, active, items: Iterable[PipelData]) -> Iterator[PipelData]:
+        for data in items:
+            self._traced_validation(active, 'validate_output', self.validate_output, data)
+            yield data
+
+    def _traced_validation(self, active, span: str, validate, data: PipelData):
+        if not active:
+            validate(data)
+            return
+        with trace_span(active, self, span, data):
+            validate(data)
+
+    def __call__(self, data: PipelData, exec_mode: EXEC_MODE = 'sync'):
+        policy = self._validation
+        # Policies validating on cache misses live in the decorator
+        if policy.on_cache_miss or not policy.should_validate():
+            return super().__call__(data, exec_mode)
+        if exec_mode == 'async':
+            return self.__a_validated_call(data)
+        active = [hook for hook in self.hooks if hook.enabled()] if self.hooks else None
+        self._traced_validation(active, 'validate_input', self.validate_input, data)
+        result_data: PipelData = super().__call__(data, exec_mode)
+        result_data = self._validated_result(active, result_data)
+        return result_data
+
+    def run_batch(self, batch: Iterable[PipelData]) -> List[PipelData]:
+        if getattr(self, '_run_batch', None) is None:
+            # __call__ applies the policy to every item
+            return super().run_batch(batch)
+        policy = self._validation
+        if policy.on_cache_miss:
+            return super().run_batch(batch)
+        batch = list(batch)
+        validate = [policy.should_validate() for _ in batch]
+        active = [hook for hook in self.hooks if hook.enabled()] if self.hooks else None
+        for data, flag in zip(batch, validate):
+            if flag:
+                self._traced_validation(active, 'validate_input', self.validate_input, data)
+        results = super().run_batch(batch)
+        return [
+            self._validated_result(active, result_data) if flag else result_data
+            for result_data, flag in zip(results, validate)
+        ]
+
+    def _execute_batch(self, batch: List[PipelData]) -> List[PipelData]:
+        validate = self._validation.on_cache_miss
+        active = [hook for hook in self.hooks if hook.enabled()] if self.hooks else None
+        if validate:
+            for data in batch:
+                self._traced_validation(active, 'validate_input', self.validate_input, data)
+        # Validation and tracing are applied here once for the batch, not through the decorator
+        if active:
+            with trace_span(active, self, 'run', batch):
+                outputs = self._checked_run_batch(batch)
+        else:
+            outputs = self._checked_run_batch(batch)
+        if validate:
+            outputs = [self._validated_result(active, result_data) for result_data in outputs]
+        return outputs
+
+    def _fused(self) -> Tuple[Callable, bool]:
+        if self.cache is not None or self.cache_size or self.hooks:
+            return self.__call__, False
+        run = self._run
+        validate_input = self.validate_input
+        validate_output = self.validate_output
+
+        def fused(data: PipelData) -> PipelData:
+            # Without cache every call is a miss, the policy is still read at call time
+            policy = self._validation
+            if policy.on_cache_miss or policy.should_validate():
+                validate_input(data)
+                result_data = run(*data.args, **data.kwargs)
+                validate_output(result_data)
+                return result_data
+            return run(*data.args, **data.kwargs)
+        return fused, False
+
+    async def __a_validated_call(self, data: PipelData) -> PipelData:
+        active = [hook for hook in self.hooks if hook.enabled()] if self.hooks else None
+        self._traced_validation(active, 'validate_input', self.validate_input, data)
+        result_data: PipelData = await super().__call__(data, 'async')
+        result_data = self._validated_result(active, result_data)
+        return result_data
+
+    def deepcopy(self):
+        clone = super().deepcopy()
+        # The clone logs through its own hook
+        clone.hooks = [hook for hook in self.hooks if hook is not self._logger_hook]
+        clone._sync_logger_hook()
+        clone.validation = self.validation.copy()
+        return clone
+
     def validate_input(self, data: PipelData):
-        assert 1 != 1
+        """Checks the input_schema, override it for custom validation"""
+        self.input_schema.compile()(data)
 
-    @abstractmethod
     def validate_output(self, data: PipelData):
-        assert 1 != 1
+        """Checks the output_schema, override it for custom validation"""
+        self.output_schema.compile()(data)
         
         
 __all__ = [
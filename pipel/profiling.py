@@ -0,0 +1,217 @@
+import math
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+
+class LatencyHistogram:
+    """HDR-style log-linear histogram of latencies in seconds.
+
+    Values are counted in nanoseconds: below `2 * 10**significant_figures`
+    each nanosecond has its bucket, above the buckets double in width every
+    power of two, so percentiles keep the given number of significant
+    figures at any magnitude in constant memory.
+    """
+    significant_figures: int
+
+    def __init__(self, significant_figures: int = 2):
+        if not 1 <= significant_figures <= 5:
+            raise ValueError(f'significant_figures must be between 1 and 5. Found {significant_figures}')
+        self.significant_figures = significant_figures
+        self._sub_bits = math.ceil(math.log2(2 * 10 ** significant_figures))
+        self._sub_count = 1 << self._sub_bits
+        self._half = self._sub_count >> 1
+        self.reset()
+
+    def reset(self) -> None:
+        self._counts: List[int] = []
+        self.count = 0
+        self.total = 0.
+        self.min = math.inf
+        self.max = 0.
+
+    def _index(self, value: int) -> int:
+        if value < self._sub_count:
+            return value
+        shift = value.bit_length() - self._sub_bits
+        return shift * self._half + (value >> shift)
+
+    def _value(self, index: int) -> float:
+        """Middle of the bucket, in nanoseconds"""
+        if index < self._sub_count:
+            return index
+        shift = (index - self._sub_count) // self._half + 1
+        return ((index - shift * self._half) << shift) + (1 << shift) / 2
+
+    def record(self, elapsed: float) -> None:
+        index = self._index(int(elapsed * 1e9))
+        counts = self._counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+        self.count += 1
+        self.total += elapsed
+        if elapsed < self.min:
+            self.min = elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+    def percentile(self, p: float) -> float:
+        """Latency in seconds below which p percent of the values fall"""
+        if not 0 <= p <= 100:
+            raise ValueError(f'p must be between 0 and 100. Found {p}')
+        if not self.count:
+            return 0.
+        rank = max(1, math.ceil(p / 100 * self.count))
+        # The extremes are tracked exactly
+        if rank == 1:
+            return self.min
+        if rank == self.count:
+            return self.max
+        seen = 0
+        for index, n in enumerate(self._counts):
+            seen += n
+            if seen >= rank:
+                # Never report beyond the observed extremes
+                return min(max(self._value(index) / 1e9, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        if other.significant_figures != self.significant_figures:
+            raise ValueError('Can only merge histograms with the same significant_figures.')
+        if len(other._counts) > len(self._counts):
+            self._counts.extend([0] * (len(other._counts) - len(self._counts)))
+        for index, n in enumerate(other._counts):
+            self._counts[index] += n
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(count={self.count}, mean={self.mean:.3g}, max={self.max:.3g})'
+
+
+class StageStats(NamedTuple):
+    """Snapshot of the calls of a stage, latencies in seconds"""
+    calls: int
+    errors: int
+    total: float
+    mean: float
+    p50: float
+    p90: float
+    p99: float
+    max: float
+    # None when the component has no cache
+    hit_ratio: Optional[float]
+
+
+def _hit_ratio(component) -> Optional[float]:
+    if not getattr(component, 'cache_size', None) and getattr(component, 'cache', None) is None:
+        return None
+    cache_info = getattr(component, 'cache_info', None)
+    if cache_info is None:
+        return None
+    info = cache_info()
+    lookups = info.hits + info.misses
+    return info.hits / lookups if lookups else None
+
+
+class _Stage:
+    __slots__ = ('component', 'histogram', 'errors')
+
+    def __init__(self, component, significant_figures: int):
+        self.component = component
+        self.histogram = LatencyHistogram(significant_figures)
+        self.errors = 0
+
+
+class Profiler:
+    """Records the latency of every stage call of the pipelines it is attached to.
+
+    Profiling is opt-in, pipelines without profiler pay a single attribute
+    check per run:
+    ```python
+    pipeline.profiler = Profiler()
+    pipeline.run(data)
+    pipeline.stats()  # {'0:Adder': StageStats(calls=1, ...), ...}
+    ```
+    The callback, if any, is called with (stage, elapsed, error) after each call.
+    """
+    callback: Optional[Callable[[str, float, Optional[BaseException]], Any]]
+
+    def __init__(
+        self,
+        callback: Optional[Callable[[str, float, Optional[BaseException]], Any]] = None,
+        significant_figures: int = 2
+    ):
+        # Fails early on a wrong precision
+        LatencyHistogram(significant_figures)
+        self.callback = callback
+        self.significant_figures = significant_figures
+        self._stages: Dict[str, _Stage] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, component, elapsed: float, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = self._stages[stage] = _Stage(component, self.significant_figures)
+            entry.histogram.record(elapsed)
+            if error is not None:
+                entry.errors += 1
+        if self.callback is not None:
+            self.callback(stage, elapsed, error)
+
+    @contextmanager
+    def measure(self, stage: str, component):
+        error = None
+        start = perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self.record(stage, component, perf_counter() - start, error)
+
+    def histogram(self, stage: str) -> LatencyHistogram:
+        return self._stages[stage].histogram
+
+    def stats(self) -> Dict[str, StageStats]:
+        """Snapshot of every stage, in order of first call"""
+        with self._lock:
+            stages = list(self._stages.items())
+            return {
+                name: StageStats(
+                    calls=entry.histogram.count,
+                    errors=entry.errors,
+                    total=entry.histogram.total,
+                    mean=entry.histogram.mean,
+                    p50=entry.histogram.percentile(50),
+                    p90=entry.histogram.percentile(90),
+                    p99=entry.histogram.percentile(99),
+                    max=entry.histogram.max,
+                    hit_ratio=_hit_ratio(entry.component),
+                )
+                for name, entry in stages
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(stages={list(self._stages)})'
+
+
+__all__ = [
+    'LatencyHistogram',
+    'StageStats',
+    'Profiler'
+]
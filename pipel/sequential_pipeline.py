@@ -1,9 +1,12 @@
 import asyncio
 from abc import ABC, abstractmethod
-from typing import List
+from concurrent.futures import Executor, ThreadPoolExecutor
+from itertools import islice
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Union
 from typing_extensions import override
 from .pipeline_component import UnsafePipelineComponent, PipelData
 from .pipel_types import EXEC_MODE
+from .profiling import Profiler, StageStats
 
 class ConstrainedPipeline(list, ABC):
 
@@ -17,6 +20,11 @@ class ConstrainedPipeline(list, ABC):
     def __init__(self, pipes: List[UnsafePipelineComponent]):
         self.__validate_input(pipes)
         super().__init__(pipes)
+        self._compiled = None
+
+    def _modified(self) -> None:
+        """Called by every mutating method, invalidates the compiled executor"""
+        self._compiled = None
     
     @override
     def copy(self):
@@ -29,13 +37,40 @@ class ConstrainedPipeline(list, ABC):
         # self.__validate_input(item)
         if not isinstance(item, UnsafePipelineComponent):
             raise ValueError('Can only append UnsafePipelineComponent.')
+        self._modified()
         super().append(item)
+
+    @override
+    def insert(self, index, item) -> None:
+        self._modified()
+        super().insert(index, item)
     
     @override
     def extend(self, iterable) -> None:
         """Appends every elements in the iterable to the list"""
         self.__validate_input(iterable)
+        self._modified()
         super().extend(iterable)
+
+    @override
+    def pop(self, *args):
+        self._modified()
+        return super().pop(*args)
+
+    @override
+    def remove(self, value) -> None:
+        self._modified()
+        super().remove(value)
+
+    @override
+    def clear(self) -> None:
+        self._modified()
+        super().clear()
+
+    @override
+    def reverse(self) -> None:
+        self._modified()
+        super().reverse()
     
     @override   
     def sort(self, *args, **kwargs) -> None:
@@ -46,7 +81,13 @@ class ConstrainedPipeline(list, ABC):
         if not isinstance(item, UnsafePipelineComponent):
             raise ValueError('Can only set UnsafePipelineComponent.')
         self.__validate_input(item)
+        self._modified()
         super().__setitem__(key, item)
+
+    @override
+    def __delitem__(self, key) -> None:
+        self._modified()
+        super().__delitem__(key)
     
     @override
     def __add__(self, other):
@@ -57,6 +98,7 @@ class ConstrainedPipeline(list, ABC):
     @override
     def __iadd__(self, value):
         self.__validate_input(value)
+        self._modified()
         # result = super().__iadd__(value)
         return self.__class__(super().__iadd__(value))
     
@@ -70,6 +112,7 @@ class ConstrainedPipeline(list, ABC):
     
     @override
     def __imul__(self, value):
+        self._modified()
         return self.__class__(super().__imul__(value))
     
     @override
@@ -93,19 +136,308 @@ class ConstrainedPipeline(list, ABC):
     def run(self, *args, **kwargs):
         raise NotImplementedError(f'run() not implemented for {self.__class__.__name__}')
 
+def _emitted(result) -> Iterable[PipelData]:
+    """Outputs of a stage in streaming mode: None filters the item, an iterable explodes it"""
+    if isinstance(result, PipelData):
+        return (result,)
+    if result is None:
+        return ()
+    return result
+
+# End of stream marker of the astream queues
+_DONE = object()
+
+class _Failure:
+    """Carries the exception of an astream task to the consumer"""
+    __slots__ = ('error',)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+class CompiledPipeline:
+    """Frozen sync executor of a SequentialPipeline, see SequentialPipeline.compile.
+
+    The stages are resolved once into their cheapest callables. Mutating the
+    pipeline invalidates the executor, calling it afterwards raises RuntimeError.
+    """
+    __slots__ = ('_pipeline', '_stages')
+
+    def __init__(self, pipeline: 'SequentialPipeline'):
+        self._pipeline = pipeline
+        self._stages = tuple(pipe._fused() for pipe in pipeline)
+
+    @property
+    def valid(self) -> bool:
+        return self._pipeline._compiled is self
+
+    def __call__(self, data: PipelData) -> PipelData:
+        if self._pipeline._compiled is not self:
+            raise RuntimeError('The pipeline was modified after compile(), compile it again.')
+        for func, unpack in self._stages:
+            data = func(*data.args, **data.kwargs) if unpack else func(data)
+        return data
+
+    def __len__(self) -> int:
+        return len(self._stages)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(stages={len(self._stages)}, valid={self.valid})'
+
 class SequentialPipeline(ConstrainedPipeline):
+    # Opt-in instrumentation of run, arun and map, see stats()
+    profiler: Optional[Profiler] = None
 
     def run(self, data: PipelData, exec_mode:EXEC_MODE = 'sync') -> PipelData:
+        if exec_mode == 'async':
+            # One event loop for the whole pipeline, use arun inside a running loop
+            return asyncio.run(self.arun(data))
         _data: PipelData = data
-        for pipe in self:
-            if exec_mode == 'sync':
+        profiler = self.profiler
+        if profiler is None:
+            for pipe in self:
+                _data = pipe(_data, exec_mode=exec_mode)
+            return _data
+        for i, pipe in enumerate(self):
+            with profiler.measure(f'{i}:{pipe.__class__.__name__}', pipe):
                 _data = pipe(_data, exec_mode=exec_mode)
-            else:
-                # Need to wait for the data
-                _data = asyncio.run(pipe(_data, exec_mode=exec_mode))
         return _data
 
+    def stats(self) -> Dict[str, StageStats]:
+        """Per stage snapshot of the profiler, keyed by 'index:ClassName'"""
+        if self.profiler is None:
+            raise ValueError('Profiling is disabled, set pipeline.profiler = Profiler() first.')
+        return self.profiler.stats()
+
+    def compile(self, recompile: bool = False) -> CompiledPipeline:
+        """Returns a fused sync executor of the pipeline.
+
+        Dispatch is resolved once: stages without cache, logger nor hooks call
+        their _run directly, the others skip the exec_mode check. The executor
+        is reused until the pipeline is mutated (append, insert, item
+        assignment...). Components reconfigured afterwards (hooks, cache) are
+        picked up with `recompile=True`.
+        """
+        if self._compiled is None or recompile:
+            self._compiled = CompiledPipeline(self)
+        return self._compiled
+
+    def map(
+        self,
+        inputs: Iterable[PipelData],
+        workers: Optional[int] = None,
+        executor: Optional[Executor] = None
+    ) -> List[PipelData]:
+        """Runs the inputs through the pipeline on a pool of threads.
+
+        Each input goes through every stage in one worker, outputs are
+        returned in the input order. A ThreadPoolExecutor of workers threads
+        is created for the call unless an executor is given. Pays off for
+        stages calling blocking clients or code releasing the GIL.
+        """
+        if executor is not None:
+            return list(executor.map(self.run, inputs))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(self.run, inputs))
+
+    async def arun(self, data: PipelData) -> PipelData:
+        """Runs every stage in async mode on the caller's event loop"""
+        _data: PipelData = data
+        profiler = self.profiler
+        if profiler is None:
+            for pipe in self:
+                _data = await pipe(_data, exec_mode='async')
+            return _data
+        for i, pipe in enumerate(self):
+            with profiler.measure(f'{i}:{pipe.__class__.__name__}', pipe):
+                _data = await pipe(_data, exec_mode='async')
+        return _data
+
+    async def arun_many(self, inputs: Iterable[PipelData], concurrency: int = 16) -> List[PipelData]:
+        """Runs the inputs through arun with at most concurrency of them in flight.
+
+        Outputs are returned in the input order. The first exception cancels
+        the inputs still running and is raised.
+        """
+        if concurrency < 1:
+            raise ValueError(f'concurrency must be positive. Found {concurrency}')
+        inputs = list(inputs)
+        results: List[Optional[PipelData]] = [None] * len(inputs)
+        pending = iter(enumerate(inputs))
+
+        async def worker():
+            # Workers share the iterator, each pulls the next input when done
+            for i, data in pending:
+                results[i] = await self.arun(data)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(min(concurrency, len(inputs)))]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            for task in workers:
+                task.cancel()
+            raise
+        return results
+
+    def run_batch(self, inputs: Iterable[PipelData], batch_size: Optional[int] = None) -> List[PipelData]:
+        """Runs every input through the pipeline, batch_size inputs at a time.
+
+        Each stage processes a whole batch before handing it to the next one,
+        see UnsafePipelineComponent.run_batch. batch_size=None processes all
+        the inputs as one batch. Outputs are returned in the input order.
+        """
+        if batch_size is not None and batch_size < 1:
+            raise ValueError(f'batch_size must be positive. Found {batch_size}')
+        iterator = iter(inputs)
+        outputs: List[PipelData] = []
+        while True:
+            batch = list(islice(iterator, batch_size)) if batch_size else list(iterator)
+            if not batch:
+                return outputs
+            for pipe in self:
+                batch = pipe.run_batch(batch)
+            outputs.extend(batch)
+
+    def stream(self, inputs: Iterable[PipelData], batch_size: Optional[int] = None) -> Iterator[PipelData]:
+        """Lazily pulls the inputs through every stage.
+
+        Only the items in flight are held in memory: one per stage, or one
+        batch of batch_size inputs going through run_batch. In this mode a
+        stage may return None to drop an item, or an iterable of PipelData
+        (e.g. a list, which stays cacheable) to emit many outputs for one input.
+        The stages are the ones in the pipeline when stream is called.
+        """
+        if batch_size is not None and batch_size < 1:
+            raise ValueError(f'batch_size must be positive. Found {batch_size}')
+        pipes = list(self)
+        if batch_size:
+            return self._batched_stream(pipes, iter(inputs), batch_size)
+        stream = iter(inputs)
+        for pipe in pipes:
+            stream = self._stage_stream(pipe, stream)
+        return stream
+
+    async def astream(
+        self,
+        inputs: Union[Iterable[PipelData], AsyncIterable[PipelData]],
+        concurrency: Union[int, List[int]] = 1,
+        queue_size: int = 64,
+        ordered: bool = False
+    ) -> AsyncIterator[PipelData]:
+        """Assembly line over the inputs: every stage runs its own consumer tasks.
+
+        Adjacent stages are connected by asyncio.Queues of queue_size items,
+        so a slow stage applies backpressure upstream. concurrency is the
+        number of tasks per stage, either the same for all of them or one
+        value per stage. Outputs are yielded as they complete, or in the
+        input order with ordered=True. Stages may filter or explode items
+        like in stream(). The first exception stops every stage and is raised.
+        """
+        pipes = list(self)
+        limits = [concurrency] * len(pipes) if isinstance(concurrency, int) else list(concurrency)
+        if len(limits) != len(pipes):
+            raise ValueError(f'concurrency must have one value per stage. Found {len(limits)} for {len(pipes)} stages')
+        if any(limit < 1 for limit in limits):
+            raise ValueError(f'concurrency must be positive. Found {limits}')
+        if queue_size < 1:
+            raise ValueError(f'queue_size must be positive. Found {queue_size}')
+
+        queues = [asyncio.Queue(queue_size) for _ in range(len(pipes) + 1)]
+        # Only when ordered: input index -> items derived from it still in flight
+        alive = {}
+
+        async def feed():
+            try:
+                index = 0
+                if hasattr(inputs, '__aiter__'):
+                    async for data in inputs:
+                        alive[index] = 1
+                        await queues[0].put(((index,), data))
+                        index += 1
+                else:
+                    for data in inputs:
+                        alive[index] = 1
+                        await queues[0].put(((index,), data))
+                        index += 1
+                await queues[0].put(_DONE)
+            except Exception as e:
+                await queues[-1].put(_Failure(e))
+
+        async def stage(pipe: UnsafePipelineComponent, q_in: asyncio.Queue, q_out: asyncio.Queue, running: List[int]):
+            try:
+                while True:
+                    item = await q_in.get()
+                    if item is _DONE:
+                        # Let the sibling tasks see it, the last one closes the next stage
+                        await q_in.put(_DONE)
+                        running[0] -= 1
+                        if running[0] == 0:
+                            await q_out.put(_DONE)
+                        return
+                    key, data = item
+                    result = await pipe(data, exec_mode='async')
+                    if isinstance(result, PipelData):
+                        await q_out.put((key, result))
+                        continue
+                    outputs = list(_emitted(result))
+                    if ordered:
+                        alive[key[0]] += len(outputs) - 1
+                    for i, output in enumerate(outputs):
+                        await q_out.put((key + (i,), output))
+            except Exception as e:
+                await queues[-1].put(_Failure(e))
+
+        tasks = [asyncio.ensure_future(feed())]
+        for pipe, limit, q_in, q_out in zip(pipes, limits, queues, queues[1:]):
+            running = [limit]
+            tasks.extend(asyncio.ensure_future(stage(pipe, q_in, q_out, running)) for _ in range(limit))
+
+        try:
+            # input index -> completed outputs waiting for the previous inputs
+            buffer = {}
+            next_index = 0
+            while True:
+                item = await queues[-1].get()
+                if item is _DONE:
+                    break
+                if isinstance(item, _Failure):
+                    raise item.error
+                key, data = item
+                if not ordered:
+                    yield data
+                    continue
+                buffer.setdefault(key[0], []).append(item)
+                alive[key[0]] -= 1
+                while alive.get(next_index) == 0:
+                    del alive[next_index]
+                    for _, output in sorted(buffer.pop(next_index, ()), key=lambda x: x[0]):
+                        yield output
+                    next_index += 1
+            for index in sorted(buffer):
+                for _, output in sorted(buffer[index], key=lambda x: x[0]):
+                    yield output
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def _stage_stream(pipe: UnsafePipelineComponent, inputs: Iterator[PipelData]) -> Iterator[PipelData]:
+        for data in inputs:
+            yield from _emitted(pipe(data))
+
+    @staticmethod
+    def _batched_stream(pipes: List[UnsafePipelineComponent], inputs: Iterator[PipelData], batch_size: int) -> Iterator[PipelData]:
+        while True:
+            batch = list(islice(inputs, batch_size))
+            if not batch:
+                return
+            for pipe in pipes:
+                batch = [out for result in pipe.run_batch(batch) for out in _emitted(result)]
+                if not batch:
+                    break
+            yield from batch
+
 __all__ = [
     'ConstrainedPipeline',
-    'SequentialPipeline'
+    'SequentialPipeline',
+    'CompiledPipeline'
 ]
\ No newline at end of file
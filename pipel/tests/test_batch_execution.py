@@ -0,0 +1,148 @@
+import pytest
+from pipel import SequentialPipeline, UnsafePipelineComponent, PipelineComponent, PipelData
+from pipel import LRUCache, Always
+
+class Adder(UnsafePipelineComponent):
+    calls: int = 0
+
+    def _run(self, x):
+        self.calls += 1
+        return PipelData(args=(x + 2,))
+
+class BatchMultiplier(UnsafePipelineComponent):
+    batches: list
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.batches = []
+
+    def _run(self, x):
+        return PipelData(args=(x * 10,))
+
+    def _run_batch(self, batch):
+        self.batches.append([data.args[0] for data in batch])
+        return [PipelData(args=(data.args[0] * 10,)) for data in batch]
+
+class BrokenBatch(UnsafePipelineComponent):
+
+    def _run(self, x):
+        return PipelData(args=(x,))
+
+    def _run_batch(self, batch):
+        return []
+
+class SafeBatchMultiplier(PipelineComponent):
+    validations: int = 0
+
+    def validate_input(self, data):
+        self.validations += 1
+        assert isinstance(data.args[0], int)
+
+    def validate_output(self, data):
+        pass
+
+    def _run(self, x):
+        return PipelData(args=(x * 10,))
+
+    def _run_batch(self, batch):
+        return [PipelData(args=(data.args[0] * 10,)) for data in batch]
+
+def inputs(*values):
+    return [PipelData(args=(v,)) for v in values]
+
+def test_component_run_batch_fallback():
+    adder = Adder(cache_size=4)
+    res = adder.run_batch(inputs(1, 2, 1))
+    assert [r.args[0] for r in res] == [3, 4, 3]
+    assert adder.calls == 2
+    assert adder.cache_info().hits == 1
+
+def test_component_run_batch_hook():
+    multiplier = BatchMultiplier()
+    res = multiplier.run_batch(inputs(1, 2, 3))
+    assert [r.args[0] for r in res] == [10, 20, 30]
+    assert multiplier.batches == [[1, 2, 3]]
+    assert multiplier.cache_info().misses == 3
+
+def test_component_run_batch_caching_per_item():
+    multiplier = BatchMultiplier(cache_size=8)
+    multiplier(PipelData(args=(2,)))
+    res = multiplier.run_batch(inputs(1, 2, 3, 1))
+    assert [r.args[0] for r in res] == [10, 20, 30, 10]
+    # 2 was cached, the duplicated 1 is computed once
+    assert multiplier.batches == [[1, 3]]
+    info = multiplier.cache_info()
+    assert info.hits == 2
+    assert info.misses == 3
+    assert info.currsize == 3
+
+def test_component_run_batch_backend():
+    multiplier = BatchMultiplier(cache=LRUCache(2))
+    multiplier.run_batch(inputs(1, 2))
+    multiplier.run_batch(inputs(2, 3))
+    assert multiplier.batches == [[1, 2], [3]]
+
+def test_component_run_batch_wrong_size():
+    with pytest.raises(expected_exception=ValueError):
+        BrokenBatch().run_batch(inputs(1))
+
+def test_component_run_batch_validation():
+    multiplier = SafeBatchMultiplier(cache_size=8)
+    multiplier.run_batch(inputs(1, 2))
+    multiplier.run_batch(inputs(1, 2))
+    assert multiplier.validations == 2
+    with pytest.raises(expected_exception=AssertionError):
+        multiplier.run_batch(inputs('3'))
+    always = SafeBatchMultiplier(cache_size=8, validation=Always())
+    always.run_batch(inputs(1, 2))
+    always.run_batch(inputs(1, 2))
+    assert always.validations == 4
+
+def test_sequential_pipeline_run_batch():
+    multiplier = BatchMultiplier()
+    pipeline = SequentialPipeline([Adder(), multiplier, Adder()])
+    res = pipeline.run_batch(inputs(*range(5)), batch_size=2)
+    assert [r.args[0] for r in res] == [(x + 2) * 10 + 2 for x in range(5)]
+    assert multiplier.batches == [[2, 3], [4, 5], [6]]
+
+def test_sequential_pipeline_run_batch_single_batch():
+    multiplier = BatchMultiplier()
+    pipeline = SequentialPipeline([multiplier])
+    res = pipeline.run_batch(iter(inputs(1, 2, 3)))
+    assert [r.args[0] for r in res] == [10, 20, 30]
+    assert multiplier.batches == [[1, 2, 3]]
+    assert pipeline.run_batch([]) == []
+    with pytest.raises(expected_exception=ValueError):
+        pipeline.run_batch(inputs(1), batch_size=0)
+
+def recording_decorator(log):
+    def decorator(func):
+        def wrapper(data):
+            try:
+                result = func(data)
+            except Exception as e:
+                log.append(('error', data.args[0], str(e)))
+                raise
+            log.append((data.args[0], result.args[0]))
+            return result
+        return wrapper
+    return decorator
+
+def test_component_run_batch_logger_decorator():
+    log = []
+    multiplier = BatchMultiplier(cache_size=8, logger_decorator=recording_decorator(log))
+    multiplier(PipelData(args=(2,)))
+    multiplier.run_batch(inputs(1, 2, 3))
+    # Every miss goes through the decorator, the batch still runs once
+    assert log == [(2, 20), (1, 10), (3, 30)]
+    assert multiplier.batches == [[1, 3]]
+
+def test_component_run_batch_logger_decorator_sees_errors():
+    class Failing(BatchMultiplier):
+        def _run_batch(self, batch):
+            raise RuntimeError('boom')
+
+    log = []
+    with pytest.raises(expected_exception=RuntimeError):
+        Failing(logger_decorator=recording_decorator(log)).run_batch(inputs(1, 2))
+    assert log == [('error', 1, 'boom')]
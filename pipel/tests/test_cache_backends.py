@@ -0,0 +1,139 @@
+import asyncio
+import pytest
+from pipel import UnsafePipelineComponent, PipelData
+from pipel import LRUCache, LFUCache, TTLCache, SizedCache, CacheInfo, estimate_size
+
+class Adder(UnsafePipelineComponent):
+    calls: int = 0
+
+    def _run(self, x):
+        self.calls += 1
+        return PipelData(args=(x + 2,))
+
+class Blob(UnsafePipelineComponent):
+
+    def _run(self, n):
+        return PipelData(args=(bytes(n),))
+
+class FakeTimer:
+    now: float
+
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self):
+        return self.now
+
+def test_component_with_backend():
+    adder = Adder(cache=LRUCache(2))
+    for x in (1, 2, 1, 3):
+        adder(PipelData(args=(x,)))
+    info: CacheInfo = adder.cache_info()
+    assert info.maxsize == 2
+    assert info.hits == 1
+    assert info.misses == 3
+    assert info.currsize == 2
+    assert info.evictions == 1
+    assert info.nbytes > 0
+    assert adder.calls == 3
+
+def test_component_backend_and_cache_size():
+    with pytest.raises(expected_exception=ValueError):
+        Adder(cache=LRUCache(2), cache_size=2)
+
+def test_component_backend_async():
+    adder = Adder(cache=LFUCache(2))
+    input_data = PipelData(args=(1,))
+    asyncio.run(adder(input_data, exec_mode='async'))
+    res = asyncio.run(adder(input_data, exec_mode='async'))
+    assert res.args[0] == 3
+    assert adder.cache_info(exec_mode='async').hits == 1
+    # The sync and async paths do not share the backend
+    assert adder.cache_info().misses == 0
+
+def test_component_backend_deepcopy():
+    adder = Adder(cache=TTLCache(ttl=10, maxsize=2))
+    adder(PipelData(args=(1,)))
+    clone = adder.deepcopy()
+    assert isinstance(clone.cache, TTLCache)
+    assert clone.cache is not adder.cache
+    assert clone.cache.ttl == 10
+    assert clone.cache_info().currsize == 0
+
+def test_component_backend_cache_clear():
+    adder = Adder(cache=LRUCache(2))
+    adder(PipelData(args=(1,)))
+    adder.cache_clear()
+    assert adder.cache_info() == CacheInfo(0, 0, 2, 0, 0, 0)
+
+def test_lru_eviction_order():
+    cache = LRUCache(2, sizeof=None)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.info() == CacheInfo(3, 1, 2, 2, 1, 0)
+
+def test_lfu_eviction_order():
+    cache = LFUCache(2, sizeof=None)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.get('a')
+    cache.get('b')
+    cache.put('c', 3) # b is the least frequently used
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    cache.put('d', 4) # c and d have the same frequency, c is older
+    assert cache.get('c') is None
+    assert cache.get('d') == 4
+    assert cache.evictions == 2
+
+def test_ttl_expiration():
+    timer = FakeTimer()
+    cache = TTLCache(ttl=5, maxsize=10, timer=timer)
+    cache.put('a', 1)
+    timer.now = 4
+    assert cache.get('a') == 1
+    cache.put('b', 2)
+    timer.now = 6
+    assert cache.get('a') is None
+    assert cache.get('b') == 2
+    timer.now = 10
+    cache.expire()
+    assert len(cache) == 0
+    assert cache.evictions == 2
+    assert cache.nbytes == 0
+
+def test_sized_cache_byte_budget():
+    blob = Blob(cache=SizedCache(max_bytes=3000))
+    for n in (1000, 1000, 1000):
+        blob(PipelData(args=(n,)))
+    assert blob.cache_info().currsize == 1
+    for n in (1001, 1002):
+        blob(PipelData(args=(n,)))
+    info = blob.cache_info()
+    assert info.currsize == 2
+    assert info.evictions == 1
+    assert info.nbytes <= 3000
+    # Never stored
+    blob(PipelData(args=(5000,)))
+    assert blob.cache_info().currsize == 2
+
+def test_sized_cache_oversized_put_drops_stale_entry():
+    cache = SizedCache(max_bytes=1000, sizeof=len)
+    cache.put('k', b'x' * 10)
+    cache.put('k', b'y' * 5000)
+    assert cache.get('k') is None
+    assert len(cache) == 0
+    assert cache.nbytes == 0
+
+def test_estimate_size():
+    payload = bytes(10_000)
+    assert estimate_size(PipelData(args=(payload,))) >= 10_000
+    # Shared objects are counted once
+    assert estimate_size(PipelData(args=(payload, payload))) < 20_000
+    assert estimate_size([memoryview(payload)]) >= 10_000
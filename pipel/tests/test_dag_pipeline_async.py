@@ -0,0 +1,96 @@
+import asyncio
+import time
+import pytest
+from pipel import UnsafePipelineComponent, PipelData, DAGPipeline
+
+class Fetcher(UnsafePipelineComponent):
+    active: int = 0
+    peak: int = 0
+
+    def __init__(self, delay=0.1, **kwargs):
+        super().__init__(**kwargs)
+        self.delay = delay
+
+    def _run(self, *args):
+        return PipelData(args=(sum(args) + 1,))
+
+    async def _a_run(self, *args):
+        Fetcher.active += 1
+        Fetcher.peak = max(Fetcher.peak, Fetcher.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            Fetcher.active -= 1
+        return PipelData(args=(sum(args) + 1,))
+
+def fan(n):
+    """0 -> 1..n -> n+1"""
+    adj = [[0] * (n + 2) for _ in range(n + 2)]
+    for i in range(1, n + 1):
+        adj[0][i] = 1
+        adj[i][n + 1] = 1
+    return adj
+
+@pytest.fixture(autouse=True)
+def reset_peak():
+    Fetcher.active = Fetcher.peak = 0
+
+def test_arun_concurrent_branches():
+    n = 20
+    dag = DAGPipeline([Fetcher() for _ in range(n + 2)], fan(n))
+    start = time.perf_counter()
+    res = asyncio.run(dag.arun({0: PipelData(args=(0,))}))
+    assert time.perf_counter() - start < 0.6
+    assert res[n + 1].args[0] == n * 2 + 1
+    assert Fetcher.peak == n
+
+def test_arun_matches_run():
+    adj = [
+        [0, 1, 1, 0],
+        [0, 0, 0, 1],
+        [0, 0, 0, 1],
+        [0, 0, 0, 0],
+    ]
+    dag = DAGPipeline([Fetcher(0.01), Fetcher(0.05), Fetcher(0.), Fetcher(0.)], adj)
+    data = {0: PipelData(args=(1,))}
+    assert asyncio.run(dag.arun(data)) == dag.run(data)
+
+def test_arun_concurrency_limit_across_runs():
+    dag = DAGPipeline([Fetcher(0.05)], [[0]])
+    dag.concurrency_limits[0] = 2
+
+    async def main():
+        return await asyncio.gather(*(dag.arun({0: PipelData(args=(i,))}) for i in range(6)))
+
+    res = asyncio.run(main())
+    assert [r[0].args[0] for r in res] == [i + 1 for i in range(6)]
+    assert Fetcher.peak == 2
+
+def test_arun_timeout():
+    dag = DAGPipeline([Fetcher(0.01), Fetcher(1.)], [[0, 1], [0, 0]])
+    with pytest.raises(expected_exception=asyncio.TimeoutError):
+        asyncio.run(dag.arun({0: PipelData(args=(0,))}, timeouts={1: 0.05}))
+    fast = DAGPipeline([Fetcher(0.01), Fetcher(0.01)], [[0, 1], [0, 0]])
+    res = asyncio.run(fast.arun({0: PipelData(args=(0,))}, timeouts=0.5))
+    assert res[1].args[0] == 2
+
+def test_arun_error_cancels_siblings():
+    class Failing(UnsafePipelineComponent):
+
+        def _run(self, *args):
+            raise RuntimeError('boom')
+
+    adj = [
+        [0, 1, 1],
+        [0, 0, 0],
+        [0, 0, 0],
+    ]
+    dag = DAGPipeline([Fetcher(0.), Failing(), Fetcher(1.)], adj)
+
+    async def main():
+        with pytest.raises(expected_exception=RuntimeError, match='boom'):
+            await dag.arun({0: PipelData(args=(0,))})
+        await asyncio.sleep(0)
+        return Fetcher.active
+
+    assert asyncio.run(main()) == 0
@@ -0,0 +1,69 @@
+import pytest
+from pipel import UnsafePipelineComponent, PipelData, DAGPipeline, Profiler
+
+class Adder(UnsafePipelineComponent):
+    calls: int = 0
+
+    def _run(self, *args, **kwargs):
+        self.calls += 1
+        return PipelData(args=(sum(args) + 1,), kwargs=kwargs)
+
+class BatchTagger(UnsafePipelineComponent):
+    """Appends its tag, records the size of the batches it receives"""
+
+    def __init__(self, tag, **kwargs):
+        super().__init__(**kwargs)
+        self.tag = tag
+        self.batches = []
+
+    def _run(self, *args, **kwargs):
+        return PipelData(args=args + (self.tag,), kwargs={'last': self.tag, **kwargs})
+
+    def _run_batch(self, batch):
+        self.batches.append(len(batch))
+        return [self._run(*data.args, **data.kwargs) for data in batch]
+
+def diamond(components):
+    """0 -> 1, 0 -> 2, 1 -> 3, 2 -> 3, 4 -> 3"""
+    return DAGPipeline(components, edges=[(0, 1), (0, 2), (1, 3), (2, 3), (4, 3)])
+
+def records(n):
+    return [{0: PipelData(args=(i,)), 4: PipelData(args=(-i,), kwargs={'k': i})} for i in range(n)]
+
+def test_run_batch_matches_run():
+    dag = diamond([BatchTagger(tag) for tag in 'abcde'])
+    batch = records(5)
+    assert dag.run_batch(batch) == [dag.run(data) for data in batch]
+
+def test_run_batch_calls_each_node_once():
+    components = [BatchTagger(tag) for tag in 'abcde']
+    dag = diamond(components)
+    dag.run_batch(records(7))
+    assert all(c.batches == [7] for c in components)
+
+def test_run_batch_fallback_per_item():
+    adders = [Adder() for _ in range(5)]
+    dag = diamond(adders)
+    res = dag.run_batch(records(3))
+    assert [r[3].args[0] for r in res] == [i + 6 for i in range(3)]
+    assert all(a.calls == 3 for a in adders)
+
+def test_run_batch_mixed_start_orders():
+    dag = diamond([BatchTagger(tag) for tag in 'abcde'])
+    batch = records(2)
+    batch.append({4: PipelData(args=(9,)), 0: PipelData(args=(8,))})
+    assert dag.run_batch(batch) == [dag.run(data) for data in batch]
+
+def test_run_batch_empty_and_invalid():
+    dag = diamond([Adder() for _ in range(5)])
+    assert dag.run_batch([]) == []
+    with pytest.raises(expected_exception=AssertionError):
+        dag.run_batch([{0: PipelData(args=(1,))}])
+
+def test_run_batch_profiler():
+    dag = diamond([BatchTagger(tag) for tag in 'abcde'])
+    dag.profiler = Profiler()
+    dag.run_batch(records(4))
+    stats = dag.stats()
+    assert len(stats) == 5
+    assert all(s.calls == 1 for s in stats.values())
@@ -0,0 +1,109 @@
+import random
+import pytest
+from pipel import UnsafePipelineComponent, PipelData, DAGPipeline
+
+class Tagger(UnsafePipelineComponent):
+    calls: int = 0
+
+    def __init__(self, tag, **kwargs):
+        super().__init__(**kwargs)
+        self.tag = tag
+
+    def _run(self, *args, **kwargs):
+        self.calls += 1
+        return PipelData(args=args + (self.tag,), kwargs={'last': self.tag, **kwargs})
+
+def assert_plan(dag, expected):
+    """dag has the same plan as expected, up to the topological order which must stay valid"""
+    assert dag.n == expected.n
+    assert dag._children == expected._children
+    assert dag._parents == expected._parents
+    assert dag._in_degree == expected._in_degree
+    assert dag._start == expected._start
+    assert dag._terminal == expected._terminal
+    assert dag._terminal_set == expected._terminal_set
+    assert sorted(dag._order) == list(range(dag.n))
+    assert all(dag._order[dag._position[node]] == node for node in range(dag.n))
+    assert all(dag._position[p] < dag._position[c] for p in range(dag.n) for c in dag._children[p])
+
+def test_build_node_by_node():
+    dag = DAGPipeline([], edges=[])
+    for tag in 'abcde':
+        dag.add_node(Tagger(tag))
+    # Edges added against the initial order force reorderings
+    edges = [(4, 3), (3, 1), (1, 0), (2, 0), (4, 2)]
+    for parent, child in edges:
+        dag.add_edge(parent, child)
+    expected = DAGPipeline([Tagger(tag) for tag in 'abcde'], edges=edges)
+    assert_plan(dag, expected)
+    data = {4: PipelData(args=())}
+    assert dag.run(data) == expected.run(data)
+
+def test_random_edits_match_constructor():
+    rng = random.Random(0)
+    n = 30
+    dag = DAGPipeline([Tagger(i) for i in range(n)], edges=[])
+    edges = set()
+    for _ in range(300):
+        parent, child = rng.randrange(n), rng.randrange(n)
+        if (parent, child) in edges and rng.random() < 0.3:
+            dag.remove_edge(parent, child)
+            edges.discard((parent, child))
+            continue
+        try:
+            dag.add_edge(parent, child)
+            edges.add((parent, child))
+        except ValueError:
+            with pytest.raises(expected_exception=ValueError):
+                DAGPipeline([Tagger(i) for i in range(n)], edges=edges | {(parent, child)})
+        assert_plan(dag, DAGPipeline([Tagger(i) for i in range(n)], edges=edges))
+
+def test_add_edge_rejects_cycles():
+    dag = DAGPipeline([Tagger(tag) for tag in 'abc'], edges=[(0, 1), (1, 2)])
+    for parent, child in [(2, 0), (1, 0), (2, 2)]:
+        with pytest.raises(expected_exception=ValueError):
+            dag.add_edge(parent, child)
+    # The plan is left untouched
+    assert_plan(dag, DAGPipeline([Tagger(tag) for tag in 'abc'], edges=[(0, 1), (1, 2)]))
+    dag.add_edge(0, 1)
+    assert dag._in_degree[1] == 1
+    with pytest.raises(expected_exception=ValueError):
+        dag.add_edge(0, 3)
+
+def test_remove_edge():
+    dag = DAGPipeline([Tagger(tag) for tag in 'abc'], edges=[(0, 1), (0, 2)])
+    dag.remove_edge(0, 2)
+    assert dag._start == [0, 2]
+    assert dag._terminal == [1, 2]
+    assert dag.run({0: PipelData(args=()), 2: PipelData(args=())})[2].args == ('c',)
+    with pytest.raises(expected_exception=ValueError):
+        dag.remove_edge(0, 2)
+
+def test_replace_component_invalidates_memo():
+    taggers = [Tagger(tag) for tag in 'abc']
+    dag = DAGPipeline(taggers, edges=[(0, 1), (1, 2)])
+    data = {0: PipelData(args=())}
+    dag.run_incremental(data)
+    dag.replace_component(1, Tagger('x'))
+    res = dag.run_incremental(data)
+    assert res[2].args == ('a', 'x', 'c')
+    assert taggers[0].calls == 1
+    assert taggers[2].calls == 2
+    assert dag.components[1].tag == 'x'
+
+def test_edge_edits_invalidate_memo():
+    taggers = [Tagger(tag) for tag in 'abc']
+    dag = DAGPipeline(taggers, edges=[(0, 2), (1, 2)])
+    data = {0: PipelData(args=()), 1: PipelData(args=())}
+    dag.run_incremental(data)
+    dag.add_node(Tagger('d'))
+    dag.add_edge(2, 3)
+    assert dag.run_incremental(data)[3].args == ('a', 'b', 'c', 'd')
+    dag.remove_edge(1, 2)
+    res = dag.run_incremental(data)
+    assert res[1].args == ('b',)
+    assert res[3].args == ('a', 'c', 'd')
+    assert taggers[0].calls == 1
+    assert taggers[1].calls == 1
+    # Adding 2 -> 3 did not change the input of 2, removing 1 -> 2 did
+    assert taggers[2].calls == 2
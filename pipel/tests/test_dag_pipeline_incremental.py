@@ -0,0 +1,118 @@
+import pytest
+from pipel import UnsafePipelineComponent, PipelData, DAGPipeline
+
+class Counter(UnsafePipelineComponent):
+
+    def __init__(self, offset=1, **kwargs):
+        super().__init__(**kwargs)
+        self.offset = offset
+        self.calls = 0
+
+    def _run(self, *args):
+        self.calls += 1
+        return PipelData(args=(sum(args) + self.offset,))
+
+class Parity(UnsafePipelineComponent):
+    """Same output for inputs of the same parity"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = 0
+
+    def _run(self, x):
+        self.calls += 1
+        return PipelData(args=(x % 2,))
+
+def build():
+    # 0 -> 2, 1 -> 3, (2, 3) -> 4
+    components = [Counter() for _ in range(5)]
+    dag = DAGPipeline(components, edges=[(0, 2), (1, 3), (2, 4), (3, 4)])
+    return dag, components
+
+def calls(components):
+    return [c.calls for c in components]
+
+def test_only_descendants_of_changed_inputs_run():
+    dag, components = build()
+    data = {0: PipelData(args=(1,)), 1: PipelData(args=(10,))}
+    first = dag.run_incremental(data)
+    assert first == dag.run(data)
+    assert calls(components) == [2, 2, 2, 2, 2]
+    assert dag.run_incremental(data) == first
+    assert calls(components) == [2, 2, 2, 2, 2]
+    res = dag.run_incremental({0: PipelData(args=(1,)), 1: PipelData(args=(20,))})
+    assert res[4].args[0] == (1 + 2) + (20 + 2) + 1
+    assert calls(components) == [2, 3, 2, 3, 3]
+
+def test_early_cutoff():
+    parity = Parity()
+    tail = Counter()
+    dag = DAGPipeline([parity, tail], edges=[(0, 1)])
+    dag.run_incremental({0: PipelData(args=(1,))})
+    dag.run_incremental({0: PipelData(args=(3,))})
+    assert parity.calls == 2
+    # Same parity, same input for the tail
+    assert tail.calls == 1
+
+def test_replaced_component_is_recomputed():
+    dag, components = build()
+    data = {0: PipelData(args=(1,)), 1: PipelData(args=(10,))}
+    dag.run_incremental(data)
+    dag.components[2] = Counter(offset=100)
+    res = dag.run_incremental(data)
+    assert res[4].args[0] == (1 + 1 + 100) + (10 + 2) + 1
+    assert dag.components[2].calls == 1
+    assert calls(components)[:2] == [1, 1]
+
+def test_invalidate():
+    dag, components = build()
+    data = {0: PipelData(args=(1,)), 1: PipelData(args=(10,))}
+    dag.run_incremental(data)
+    dag.invalidate([3])
+    dag.run_incremental(data)
+    # 3 ran again with the same output, 4 is reused
+    assert calls(components) == [1, 1, 1, 2, 1]
+    dag.invalidate()
+    dag.run_incremental(data)
+    assert calls(components) == [2, 2, 2, 3, 2]
+
+def test_unfingerprintable_inputs_always_run():
+    class Echo(UnsafePipelineComponent):
+        calls = 0
+
+        def _run(self, x):
+            Echo.calls += 1
+            return PipelData(args=(x,))
+
+    dag = DAGPipeline([Echo()], edges=[])
+    data = {0: PipelData(args=(lambda: None,))}
+    dag.run_incremental(data)
+    dag.run_incremental(data)
+    assert Echo.calls == 2
+
+def test_merge_function_change_drops_memo():
+    dag, components = build()
+    data = {0: PipelData(args=(1,)), 1: PipelData(args=(10,))}
+    dag.run_incremental(data)
+    dag.run_incremental(data, kwargs_merge_func=lambda a, b: {**a, **b})
+    assert calls(components) == [2, 2, 2, 2, 2]
+
+def test_call_raising_partway_leaves_consistent_memo():
+    class Flaky(Counter):
+        fail = False
+
+        def _run(self, *args):
+            if self.fail:
+                raise RuntimeError('flaky')
+            return super()._run(*args)
+
+    # 0 -> 1 -> 3, 0 -> 2
+    flaky = Flaky(offset=100)
+    dag = DAGPipeline([Counter(), Counter(), flaky, Counter()], edges=[(0, 1), (0, 2), (1, 3)])
+    dag.run_incremental({0: PipelData(args=(1,))})
+    data = {0: PipelData(args=(10,))}
+    flaky.fail = True
+    with pytest.raises(expected_exception=RuntimeError):
+        dag.run_incremental(data)
+    flaky.fail = False
+    assert dag.run_incremental(data) == dag.run(data)
@@ -0,0 +1,78 @@
+import weakref
+from pipel import UnsafePipelineComponent, PipelData, DAGPipeline
+
+class Blob:
+    alive = weakref.WeakSet()
+
+    def __init__(self, size=1_000):
+        self.payload = bytes(size)
+        Blob.alive.add(self)
+
+class Producer(UnsafePipelineComponent):
+    """Outputs a new blob, records how many blobs are alive when it runs"""
+    seen: list
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.seen = []
+
+    def _run(self, *args, **kwargs):
+        self.seen.append(len(Blob.alive))
+        blob = Blob()
+        # The payload is listed for estimate_size
+        return PipelData(args=(blob, blob.payload), kwargs={'n': sum(isinstance(a, Blob) for a in args)})
+
+def chain(n):
+    return DAGPipeline([Producer() for _ in range(n)], edges=[(i, i + 1) for i in range(n - 1)])
+
+def test_low_memory_same_results():
+    dag = DAGPipeline([Producer() for _ in range(5)], edges=[(0, 1), (0, 2), (1, 3), (2, 3), (3, 4)])
+    data = {0: PipelData(args=(Blob(),))}
+    assert dag.run(data, low_memory=True)[4].kwargs == dag.run(data)[4].kwargs == {'n': 1}
+
+def test_low_memory_releases_intermediate_outputs():
+    data = {0: PipelData(args=(1,))}
+    dag = chain(6)
+    dag.run(data)
+    # Every previous output is still held
+    assert dag.components[-1].seen[-1] == 5
+    del Blob.alive
+    Blob.alive = weakref.WeakSet()
+    dag = chain(6)
+    dag.run(data, low_memory=True)
+    # Only the input of the node is alive
+    assert dag.components[-1].seen[-1] == 1
+    assert dag.memory_info.peak_outputs == 1
+    assert dag.memory_info.peak_bytes >= 1_000
+
+def test_low_memory_peak_on_fan_in():
+    n = 10
+    edges = [(0, i) for i in range(1, n + 1)] + [(i, n + 1) for i in range(1, n + 1)]
+    dag = DAGPipeline([Producer() for _ in range(n + 2)], edges=edges)
+    res = dag.run({0: PipelData(args=(1,))}, low_memory=True)
+    assert res[n + 1].kwargs == {'n': n}
+    assert dag.memory_info.peak_outputs == n
+
+def test_low_memory_keeps_targets():
+    dag = chain(4)
+    res = dag.run({0: PipelData(args=(1,))}, targets=[1, 3], low_memory=True)
+    assert sorted(res) == [1, 3]
+
+def test_fan_in_leaves_parent_outputs_untouched():
+    shared = {'a': 1}
+
+    class Emit(UnsafePipelineComponent):
+
+        def _run(self, *args, **kwargs):
+            return PipelData(args=(1,), kwargs=shared)
+
+    class Sink(UnsafePipelineComponent):
+
+        def _run(self, *args, **kwargs):
+            return PipelData(args=args, kwargs=kwargs)
+
+    dag = DAGPipeline([Emit(), Emit(), Sink()], edges=[(0, 2), (1, 2)])
+    res = dag.run({0: PipelData(args=()), 1: PipelData(args=())}, kwargs_merge_func=lambda a, b: {**a, **b, 'b': 2})
+    assert res[2].args == (1, 1)
+    assert res[2].kwargs == {'a': 1, 'b': 2}
+    assert shared == {'a': 1}
@@ -0,0 +1,129 @@
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import pytest
+from pipel import UnsafePipelineComponent, PipelineComponent, PipelData, DAGPipeline, Profiler, LRUCache
+from pipel.multiprocessing import PicklablePipelineComponent
+
+class Sleeper(UnsafePipelineComponent):
+
+    def _run(self, *args, **kwargs):
+        time.sleep(0.1)
+        return PipelData(args=(sum(args) + 1,))
+
+class Tagger(UnsafePipelineComponent):
+    """Outputs its tag, delayed so that completion order differs from index order"""
+
+    def __init__(self, tag, delay=0., **kwargs):
+        super().__init__(**kwargs)
+        self.tag = tag
+        self.delay = delay
+
+    def _run(self, *args, **kwargs):
+        time.sleep(self.delay)
+        return PipelData(args=args + (self.tag,), kwargs={'last': self.tag, **kwargs})
+
+class Failing(UnsafePipelineComponent):
+
+    def _run(self, *args, **kwargs):
+        raise RuntimeError('boom')
+
+class PicklableAdder(PicklablePipelineComponent):
+
+    def _run(self, *args):
+        return PipelData(args=(sum(args) + 2,), kwargs={})
+
+class SafeAdder(PipelineComponent):
+
+    def validate_input(self, data):
+        assert all(isinstance(x, int) for x in data.args)
+
+    def validate_output(self, data):
+        pass
+
+    def _run(self, *args):
+        return PipelData(args=(sum(args) + 2,))
+
+def fan(n):
+    """0 -> 1..n -> n+1"""
+    adj = [[0] * (n + 2) for _ in range(n + 2)]
+    for i in range(1, n + 1):
+        adj[0][i] = 1
+        adj[i][n + 1] = 1
+    return adj
+
+def test_parallel_wall_time_follows_critical_path():
+    n = 8
+    dag = DAGPipeline([Sleeper() for _ in range(n + 2)], fan(n))
+    start = time.perf_counter()
+    res = dag.run_parallel({0: PipelData(args=(0,))}, max_workers=n)
+    elapsed = time.perf_counter() - start
+    assert res[n + 1].args[0] == n * 2 + 1
+    # 3 levels of 0.1s instead of n + 2 sequential calls
+    assert elapsed < 0.6
+
+def test_parallel_matches_run():
+    # Branch 1 finishes last, its output must still come first in the merge
+    components = [Tagger('a'), Tagger('b', delay=0.05), Tagger('c'), Tagger('d'), Tagger('e')]
+    adj = [
+        [0, 1, 1, 0, 0],
+        [0, 0, 0, 0, 1],
+        [0, 0, 0, 0, 1],
+        [0, 0, 0, 0, 1],
+        [0, 0, 0, 0, 0],
+    ]
+    dag = DAGPipeline(components, adj)
+    data = {0: PipelData(args=()), 3: PipelData(args=())}
+    assert dag.run_parallel(data, max_workers=4) == dag.run(data)
+
+def test_max_workers_limits_parallelism():
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    class Tracked(UnsafePipelineComponent):
+
+        def _run(self, *args):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.pop()
+            return PipelData(args=(1,))
+
+    dag = DAGPipeline([Tracked() for _ in range(8)], fan(6))
+    dag.run_parallel({0: PipelData(args=(1,))}, max_workers=2)
+    assert max(peak) == 2
+    with pytest.raises(expected_exception=ValueError):
+        dag.run_parallel({0: PipelData(args=(1,))}, max_workers=0)
+
+def test_parallel_external_executor_and_profiler():
+    dag = DAGPipeline([Sleeper() for _ in range(5)], fan(3))
+    dag.profiler = Profiler()
+    with ThreadPoolExecutor(4) as executor:
+        res = dag.run_parallel({0: PipelData(args=(0,))}, executor=executor)
+    assert res[4].args[0] == 7
+    stats = dag.stats()
+    assert len(stats) == 5
+    assert all(s.p50 >= 0.1 for s in stats.values())
+
+def test_parallel_error_propagates():
+    dag = DAGPipeline([Sleeper(), Failing(), Sleeper()], [[0, 1, 0], [0, 0, 1], [0, 0, 0]])
+    with pytest.raises(expected_exception=RuntimeError, match='boom'):
+        dag.run_parallel({0: PipelData(args=(0,))})
+
+def test_parallel_process_pool():
+    dag = DAGPipeline([PicklableAdder() for _ in range(5)], fan(3))
+    with ProcessPoolExecutor(2) as executor:
+        res = dag.run_parallel({0: PipelData(args=(0,), kwargs={})}, executor=executor)
+    assert res[4].args[0] == 3 * 4 + 2
+
+def test_parallel_process_pool_regular_components():
+    components = [SafeAdder(), Sleeper(cache=LRUCache(4)), SafeAdder(cache_size=4), Sleeper(), SafeAdder()]
+    dag = DAGPipeline(components, fan(3))
+    data = {0: PipelData(args=(0,))}
+    with ProcessPoolExecutor(2) as executor:
+        assert dag.run_parallel(data, executor=executor) == dag.run(data)
+    with ProcessPoolExecutor(1) as executor, pytest.raises(expected_exception=AssertionError):
+        dag.run_parallel({0: PipelData(args=('0',))}, executor=executor)
@@ -0,0 +1,63 @@
+import sys
+import pytest
+from pipel import UnsafePipelineComponent, PipelData, DAGPipeline
+
+class Counter(UnsafePipelineComponent):
+
+    def _run(self, *args):
+        return PipelData(args=(sum(args) + 1,))
+
+ADJ = [
+    [0, 1, 1, 0],
+    [0, 0, 0, 1],
+    [0, 0, 0, 1],
+    [0, 0, 0, 0],
+]
+
+def test_edges_match_matrix():
+    data = {0: PipelData(args=(1,))}
+    dense = DAGPipeline([Counter() for _ in range(4)], ADJ)
+    sparse = DAGPipeline([Counter() for _ in range(4)], edges=[(2, 3), (0, 1), (1, 3), (0, 2), (0, 1)])
+    listed = DAGPipeline.from_adjacency_list([Counter() for _ in range(4)], {0: [1, 2], 1: [3], 2: [3]})
+    assert sparse.adj == dense.adj == [[bool(v) for v in row] for row in ADJ]
+    assert sparse.run(data) == dense.run(data) == listed.run(data)
+
+def test_plan():
+    dag = DAGPipeline([Counter() for _ in range(4)], ADJ)
+    assert dag._get_start() == [0]
+    assert dag._get_terminal() == [3]
+    assert dag._prev_state(3) == [1, 2]
+    assert dag._next_state(0) == [1, 2]
+    assert dag._order == [0, 1, 2, 3]
+
+def test_build_plan_cycle_keeps_plan():
+    dag = DAGPipeline([Counter() for _ in range(4)], ADJ)
+    with pytest.raises(expected_exception=ValueError, match='DAG'):
+        dag._build_plan([[1], [2], [3], [0]])
+    assert dag._order == [0, 1, 2, 3]
+    assert dag._next_state(3) == []
+
+def test_edges_errors():
+    with pytest.raises(expected_exception=ValueError, match='DAG'):
+        DAGPipeline([Counter() for _ in range(3)], edges=[(0, 1), (1, 2), (2, 1)])
+    with pytest.raises(expected_exception=ValueError, match='DAG'):
+        DAGPipeline([Counter()], edges=[(0, 0)])
+    with pytest.raises(expected_exception=ValueError, match='out of range'):
+        DAGPipeline([Counter()], edges=[(0, 1)])
+    with pytest.raises(expected_exception=ValueError):
+        DAGPipeline([Counter()])
+    with pytest.raises(expected_exception=ValueError):
+        DAGPipeline([Counter()], [[0]], edges=[])
+
+def test_deep_graph_beyond_recursion_limit():
+    n = sys.getrecursionlimit() * 2
+    dag = DAGPipeline([Counter() for _ in range(n)], edges=[(i, i + 1) for i in range(n - 1)])
+    res = dag.run({0: PipelData(args=(0,))})
+    assert res[n - 1].args[0] == n
+
+def test_wide_graph():
+    n = 5_000
+    edges = [(0, i) for i in range(1, n - 1)] + [(i, n - 1) for i in range(1, n - 1)]
+    dag = DAGPipeline([Counter() for _ in range(n)], edges=edges)
+    res = dag.run({0: PipelData(args=(0,))})
+    assert res[n - 1].args[0] == (n - 2) * 2 + 1
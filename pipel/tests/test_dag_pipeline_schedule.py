@@ -0,0 +1,85 @@
+import time
+from pipel import UnsafePipelineComponent, PipelData, DAGPipeline, Profiler, ExecutionPlan
+
+class Recorder(UnsafePipelineComponent):
+    """Appends its tag to a shared log when it runs"""
+
+    def __init__(self, tag, log, delay=0., **kwargs):
+        super().__init__(**kwargs)
+        self.tag = tag
+        self.log = log
+        self.delay = delay
+
+    def _run(self, *args, **kwargs):
+        time.sleep(self.delay)
+        self.log.append(self.tag)
+        return PipelData(args=(self.tag,))
+
+def leaf_and_chain(log, delays=(0., 0., 0., 0.)):
+    """0 alone, 1 -> 2 -> 3"""
+    components = [Recorder(i, log, delay) for i, delay in enumerate(delays)]
+    return DAGPipeline(components, edges=[(1, 2), (2, 3)])
+
+def inputs():
+    return {0: PipelData(args=()), 1: PipelData(args=())}
+
+def test_longest_path_dispatched_first():
+    log = []
+    dag = leaf_and_chain(log)
+    res = dag.run_parallel(inputs(), max_workers=1)
+    # Ties are broken by the order of run
+    assert log == [1, 2, 0, 3]
+    assert res == dag.run(inputs())
+
+def test_user_costs():
+    log = []
+    dag = leaf_and_chain(log)
+    dag.costs = {0: 10., 1: 1., 2: 1., 3: 1.}
+    dag.run_parallel(inputs(), max_workers=1)
+    assert log[0] == 0
+
+def test_costs_learned_from_profiler():
+    log = []
+    dag = leaf_and_chain(log, delays=(0.05, 0., 0., 0.))
+    dag.profiler = Profiler()
+    dag.run(inputs())
+    plan = dag.explain()
+    assert plan.critical_path == [0]
+    assert plan.critical_path_cost >= 0.05
+    log.clear()
+    dag.run_parallel(inputs(), max_workers=1)
+    assert log[0] == 0
+
+def test_explain():
+    # 0 -> 1..3 -> 4, 5 alone
+    dag = DAGPipeline(
+        [Recorder(i, []) for i in range(6)],
+        edges=[(0, 1), (0, 2), (0, 3), (1, 4), (2, 4), (3, 4)]
+    )
+    dag.costs = {0: 1., 1: 1., 2: 5., 3: 1., 4: 1., 5: 1.}
+    plan = dag.explain()
+    assert isinstance(plan, ExecutionPlan)
+    assert plan.levels == [[0, 5], [1, 2, 3], [4]]
+    assert plan.max_level_width == 3
+    assert plan.critical_path == [0, 2, 4]
+    assert plan.critical_path_cost == 7.
+    assert plan.total_cost == 10.
+
+def test_explain_unit_costs():
+    dag = DAGPipeline([Recorder(i, []) for i in range(4)], edges=[(0, 1), (1, 2)])
+    plan = dag.explain()
+    assert plan.critical_path == [0, 1, 2]
+    assert plan.critical_path_cost == 3.
+    assert plan.total_cost == 4.
+    # Unknown costs default to the mean of the known ones
+    dag.costs = {0: 2., 3: 4.}
+    plan = dag.explain()
+    assert plan.critical_path_cost == 8.
+    assert plan.total_cost == 12.
+
+def test_levels_are_not_the_parallelism():
+    dag = DAGPipeline([Recorder(i, []) for i in range(6)], edges=[(0, 3), (0, 4)])
+    plan = dag.explain()
+    assert plan.levels == [[0, 1, 2, 5], [3, 4]]
+    # 3 and 4 can run alongside 1, 2 and 5, the widest level only counts 4
+    assert plan.max_level_width == 4
@@ -0,0 +1,74 @@
+import threading
+import time
+import pytest
+from pipel import UnsafePipelineComponent, PipelData, DAGPipeline
+
+class Slow(UnsafePipelineComponent):
+
+    def __init__(self, delay=0.01, **kwargs):
+        super().__init__(**kwargs)
+        self.delay = delay
+
+    def _run(self, *args, **kwargs):
+        time.sleep(self.delay)
+        return PipelData(args=(sum(args) + 1,), kwargs=kwargs)
+
+class Failing(UnsafePipelineComponent):
+
+    def _run(self, x, **kwargs):
+        if x > 5:
+            raise RuntimeError('boom')
+        return PipelData(args=(x,))
+
+DIAMOND = [(0, 1), (0, 2), (1, 3), (2, 3), (3, 4), (3, 5)]
+
+def records(n):
+    return [{0: PipelData(args=(i,), kwargs={'i': i})} for i in range(n)]
+
+def test_stream_matches_run():
+    dag = DAGPipeline([Slow(0) for _ in range(6)], edges=DIAMOND)
+    assert list(dag.stream(records(30), buffer_size=2)) == [dag.run(r) for r in records(30)]
+
+def test_stream_pipelines_records():
+    dag = DAGPipeline([Slow() for _ in range(6)], edges=DIAMOND)
+    start = time.perf_counter()
+    out = list(dag.stream(records(40)))
+    elapsed = time.perf_counter() - start
+    assert len(out) == 40
+    # Sequentially 40 records * 4 levels * 10ms, pipelined about 40 * 10ms
+    assert elapsed < 1.2
+
+def test_stream_is_lazy_and_bounded():
+    pulled = []
+
+    def source():
+        for i in range(1000):
+            pulled.append(i)
+            yield {0: PipelData(args=(i,))}
+
+    dag = DAGPipeline([Slow(0), Slow(0)], edges=[(0, 1)])
+    stream = dag.stream(source(), buffer_size=2)
+    assert next(stream)[1].args[0] == 2
+    time.sleep(0.05)
+    # Only the buffers were filled ahead
+    assert len(pulled) < 20
+    stream.close()
+
+def test_stream_error_stops_threads():
+    before = threading.active_count()
+    dag = DAGPipeline([Slow(0), Failing(), Slow(0)], edges=[(0, 1), (1, 2)])
+    out = []
+    with pytest.raises(expected_exception=RuntimeError, match='boom'):
+        for res in dag.stream(records(100)):
+            out.append(res)
+    # Records completed before the failure are yielded in order
+    assert len(out) <= 5
+    assert [r[2].args[0] for r in out] == [i + 2 for i in range(len(out))]
+    assert threading.active_count() == before
+
+def test_stream_invalid_record():
+    dag = DAGPipeline([Slow(0), Slow(0)], edges=[(0, 1)])
+    with pytest.raises(expected_exception=AssertionError):
+        list(dag.stream([{1: PipelData(args=(1,))}]))
+    with pytest.raises(expected_exception=ValueError):
+        next(dag.stream([], buffer_size=0))
@@ -0,0 +1,66 @@
+import asyncio
+import pytest
+from pipel import UnsafePipelineComponent, PipelData, DAGPipeline
+
+class Counter(UnsafePipelineComponent):
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = 0
+
+    def _run(self, *args):
+        self.calls += 1
+        return PipelData(args=(sum(args) + 1,))
+
+def build():
+    # 0 -> 1 -> 2 -> 3, 4 -> 5 -> 3
+    components = [Counter() for _ in range(6)]
+    dag = DAGPipeline(components, edges=[(0, 1), (1, 2), (2, 3), (4, 5), (5, 3)])
+    return dag, components
+
+def test_targets_run_ancestors_only():
+    dag, components = build()
+    res = dag.run({0: PipelData(args=(0,)), 4: PipelData(args=(0,))}, targets=[1])
+    assert list(res) == [1]
+    assert res[1].args[0] == 2
+    assert [c.calls for c in components] == [1, 1, 0, 0, 0, 0]
+
+def test_targets_only_need_their_inputs():
+    dag, components = build()
+    res = dag.run({4: PipelData(args=(0,))}, targets=[5])
+    assert res[5].args[0] == 2
+    with pytest.raises(expected_exception=AssertionError, match='Missing inputs'):
+        dag.run({4: PipelData(args=(0,))}, targets=[3])
+    with pytest.raises(expected_exception=ValueError):
+        dag.run({4: PipelData(args=(0,))}, targets=[6])
+
+def test_intermediate_and_terminal_targets():
+    dag, _ = build()
+    data = {0: PipelData(args=(0,)), 4: PipelData(args=(0,))}
+    full = dag.run(data)
+    res = dag.run(data, targets=[2, 3, 5])
+    assert res[3] == full[3]
+    assert res[2].args[0] == 3
+    assert res[5].args[0] == 2
+
+def test_targets_every_executor():
+    dag, components = build()
+    data = {0: PipelData(args=(0,)), 4: PipelData(args=(0,))}
+    expected = dag.run(data, targets=[2])
+    assert dag.run_parallel(data, targets=[2]) == expected
+    assert asyncio.run(dag.arun(data, targets=[2])) == expected
+    assert dag.run_incremental(data, targets=[2]) == expected
+    assert [c.calls for c in components[3:]] == [0, 0, 0]
+
+def test_incremental_targeted_then_full_call():
+    # 0 -> 1 -> 2
+    components = [Counter() for _ in range(3)]
+    dag = DAGPipeline(components, edges=[(0, 1), (1, 2)])
+    dag.run_incremental({0: PipelData(args=(1,))})
+    data = {0: PipelData(args=(10,))}
+    assert dag.run_incremental(data, targets=[1])[1].args == (12,)
+    # 2 was outside the targets, its memo is stale and must not be reused
+    res = dag.run_incremental(data)
+    # 1 is reused, 2 is recomputed from it
+    assert [c.calls for c in components] == [2, 2, 2]
+    assert res == dag.run(data) == {2: PipelData(args=(13,))}
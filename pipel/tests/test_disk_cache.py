@@ -0,0 +1,164 @@
+import asyncio
+import pickle
+import pytest
+from pipel import UnsafePipelineComponent, PipelData, DiskCache
+
+class Adder(UnsafePipelineComponent):
+    calls: int = 0
+
+    def _run(self, x):
+        self.calls += 1
+        return PipelData(args=(x + 2,))
+
+class VersionedAdder(Adder):
+    cache_version = '1'
+
+class Multiplier(UnsafePipelineComponent):
+    calls: int = 0
+
+    def _run(self, x):
+        self.calls += 1
+        return PipelData(args=(x * 10,))
+
+@pytest.fixture
+def cache_path(tmp_path) -> str:
+    return str(tmp_path / 'cache.sqlite')
+
+def test_disk_cache_hit(cache_path):
+    adder = Adder(cache=DiskCache(cache_path))
+    input_data = PipelData(args=(1,))
+    assert adder(input_data).args[0] == 3
+    assert adder(input_data).args[0] == 3
+    info = adder.cache_info()
+    assert info.hits == 1
+    assert info.misses == 1
+    assert info.currsize == 1
+    assert info.nbytes > 0
+    assert adder.calls == 1
+
+def test_disk_cache_survives_new_instances(cache_path):
+    input_data = PipelData(args=(1,), kwargs={})
+    Adder(cache=DiskCache(cache_path))(input_data)
+    # New process or deploy: a brand new backend on the same file
+    adder = Adder(cache=DiskCache(cache_path))
+    assert adder(input_data).args[0] == 3
+    assert adder.calls == 0
+    clone = adder.deepcopy()
+    clone(input_data)
+    assert clone.calls == 0
+
+def test_disk_cache_async_shares_entries(cache_path):
+    adder = Adder(cache=DiskCache(cache_path))
+    input_data = PipelData(args=(1,))
+    adder(input_data)
+    res = asyncio.run(adder(input_data, exec_mode='async'))
+    assert res.args[0] == 3
+    assert adder.calls == 1
+
+def test_disk_cache_namespaces(cache_path):
+    input_data = PipelData(args=(1,))
+    Adder(cache=DiskCache(cache_path))(input_data)
+    # Different class, same input
+    multiplier = Multiplier(cache=DiskCache(cache_path))
+    assert multiplier(input_data).args[0] == 10
+    # Different version, same class
+    versioned = VersionedAdder(cache=DiskCache(cache_path))
+    versioned(input_data)
+    assert versioned.calls == 1
+
+def test_disk_cache_clear_only_own_namespace(cache_path):
+    input_data = PipelData(args=(1,))
+    adder = Adder(cache=DiskCache(cache_path))
+    multiplier = Multiplier(cache=DiskCache(cache_path))
+    adder(input_data)
+    multiplier(input_data)
+    adder.cache_clear()
+    assert adder.cache_info().currsize == 0
+    assert multiplier.cache_info().currsize == 1
+
+def test_disk_cache_maxsize_eviction(cache_path):
+    adder = Adder(cache=DiskCache(cache_path, maxsize=2))
+    for x in (1, 2, 1, 3):
+        adder(PipelData(args=(x,)))
+    info = adder.cache_info()
+    assert info.currsize == 2
+    assert info.evictions == 1
+    # 2 was the least recently used
+    adder(PipelData(args=(1,)))
+    adder(PipelData(args=(3,)))
+    assert adder.calls == 3
+
+def test_disk_cache_max_bytes(cache_path):
+    adder = Adder(cache=DiskCache(cache_path, max_bytes=300))
+    for x in range(10):
+        adder(PipelData(args=(x,)))
+    assert adder.cache_info().nbytes <= 300
+
+def test_disk_cache_oversized_put_drops_stale_entry(cache_path):
+    cache = DiskCache(cache_path, max_bytes=1000)
+    key = cache.make_key((1,), {})
+    cache.put(key, b'x' * 10)
+    cache.get(key)
+    cache.put(key, b'y' * 5000)
+    assert cache.get(key) is None
+    assert len(cache) == 0
+    assert cache.info().nbytes == 0
+
+def test_disk_cache_picklable(cache_path):
+    adder = Adder(cache=DiskCache(cache_path))
+    adder(PipelData(args=(1,)))
+    cache = pickle.loads(pickle.dumps(adder.cache))
+    key = cache.make_key((PipelData(args=(1,)),), {})
+    assert cache.get(key).args[0] == 3
+
+def test_disk_cache_limits_per_namespace(cache_path):
+    multiplier = Multiplier(cache=DiskCache(cache_path))
+    for x in range(50):
+        multiplier(PipelData(args=(x,)))
+    adder = Adder(cache=DiskCache(cache_path, maxsize=2))
+    for x in range(3):
+        adder(PipelData(args=(x,)))
+    assert adder.cache_info().currsize == 2
+    assert adder.cache_info().evictions == 1
+    assert multiplier.cache_info().currsize == 50
+    assert multiplier.cache_info().evictions == 0
+
+def test_disk_cache_running_totals(cache_path):
+    cache = DiskCache(cache_path)
+    for x in (1, 2, 3, 2):
+        cache.put(cache.make_key((x,), {}), 'v' * x)
+    key = cache.make_key((3,), {})
+    cache.put(key, 'v' * 100)
+    assert len(cache) == 3
+    assert cache.info().nbytes == cache.conn.execute('SELECT SUM(nbytes) FROM entries').fetchone()[0]
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.info().nbytes == 0
+
+def test_disk_cache_totals_of_older_files(cache_path):
+    import sqlite3
+    conn = sqlite3.connect(cache_path)
+    conn.execute(
+        'CREATE TABLE entries (key BLOB PRIMARY KEY, namespace TEXT NOT NULL, value BLOB NOT NULL, '
+        'nbytes INTEGER NOT NULL, last_access REAL NOT NULL)'
+    )
+    conn.executemany('INSERT INTO entries VALUES (?, ?, ?, ?, ?)', [(b'a', '', b'x', 10, 0.), (b'b', '', b'y', 5, 1.)])
+    conn.commit()
+    conn.close()
+    cache = DiskCache(cache_path)
+    assert len(cache) == 2
+    assert cache.info().nbytes == 15
+
+def test_disk_cache_hits_do_not_write(cache_path):
+    adder = Adder(cache=DiskCache(cache_path, maxsize=2))
+    adder(PipelData(args=(1,)))
+    adder(PipelData(args=(2,)))
+    conn = adder.cache.conn
+    changes = conn.total_changes
+    for _ in range(10):
+        adder(PipelData(args=(1,)))
+    assert conn.total_changes == changes
+    # The buffered access is written before evicting: 2 is the least recently used
+    adder(PipelData(args=(3,)))
+    adder(PipelData(args=(1,)))
+    assert adder.calls == 3
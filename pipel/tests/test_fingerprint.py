@@ -0,0 +1,78 @@
+import array
+import pytest
+from pipel import UnsafePipelineComponent, PipelData, LRUCache
+from pipel import fingerprint, register_hasher, unregister_hasher
+
+class Point:
+    x: int
+    y: int
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+class Summer(UnsafePipelineComponent):
+    calls: int = 0
+
+    def _run(self, values, *, scale=1):
+        self.calls += 1
+        return PipelData(args=(sum(values) * scale,))
+
+def test_fingerprint_is_deterministic():
+    payload = {'a': [1, 2.5, 'x'], 'b': {3, 4}, 'c': (None, True, b'raw')}
+    assert fingerprint(payload) == fingerprint(payload)
+    assert len(fingerprint(payload)) == 16
+    assert len(fingerprint(payload, digest_size=32)) == 32
+
+def test_fingerprint_order_independence():
+    assert fingerprint({'a': 1, 'b': 2}) == fingerprint({'b': 2, 'a': 1})
+    assert fingerprint({'x', 'y', 'z'}) == fingerprint({'z', 'y', 'x'})
+
+def test_fingerprint_distinguishes_types():
+    assert fingerprint([1, 2]) != fingerprint((1, 2))
+    assert fingerprint(1) != fingerprint(1.0)
+    assert fingerprint('1') != fingerprint(b'1')
+    assert fingerprint({1}) != fingerprint(frozenset({1}))
+    assert fingerprint(((1, 2), 3)) != fingerprint((1, (2, 3)))
+
+def test_fingerprint_buffers():
+    data = bytearray(b'abcdef')
+    assert fingerprint(memoryview(data)) == fingerprint(memoryview(bytes(data)))
+    # Non contiguous views
+    assert fingerprint(memoryview(data)[::2]) == fingerprint(memoryview(b'ace'))
+    # Array-likes exposing the buffer protocol, the item format is part of the digest
+    assert fingerprint(array.array('i', [1, 2])) == fingerprint(array.array('i', [1, 2]))
+    assert fingerprint(array.array('i', [1, 2])) != fingerprint(array.array('l', [1, 2]))
+
+def test_fingerprint_self_reference():
+    payload = []
+    payload.append(payload)
+    with pytest.raises(expected_exception=ValueError):
+        fingerprint(payload)
+
+def test_fingerprint_registered_hasher():
+    register_hasher(Point, lambda p: (p.x, p.y))
+    try:
+        assert fingerprint(Point(1, 2)) == fingerprint(Point(1, 2))
+        assert fingerprint(Point(1, 2)) != fingerprint(Point(2, 1))
+        assert fingerprint(Point(1, 2)) != fingerprint((1, 2))
+    finally:
+        unregister_hasher(Point)
+
+def test_fingerprint_unpicklable():
+    with pytest.raises(expected_exception=TypeError):
+        fingerprint(lambda x: x)
+
+def test_pipeldata_unhashable_payloads():
+    data = PipelData(args=([1, 2], {'a': bytearray(b'x')}), kwargs={'scale': [3]})
+    assert hash(data) == hash(PipelData(args=([1, 2], {'a': bytearray(b'x')}), kwargs={'scale': [3]}))
+    assert data.fingerprint() == PipelData(args=([1, 2], {'a': bytearray(b'x')}), kwargs={'scale': [3]}).fingerprint()
+    assert data.fingerprint() != PipelData(args=([1, 2],), kwargs={'scale': [3]}).fingerprint()
+
+def test_component_caching_unhashable_payloads():
+    for summer in (Summer(cache_size=2), Summer(cache=LRUCache(2))):
+        summer(PipelData(args=([1, 2, 3],), kwargs={'scale': 2}))
+        res = summer(PipelData(args=([1, 2, 3],), kwargs={'scale': 2}))
+        assert res.args[0] == 12
+        assert summer.calls == 1
+        assert summer.cache_info().hits == 1
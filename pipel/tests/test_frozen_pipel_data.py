@@ -0,0 +1,61 @@
+import pickle
+import pytest
+from pipel import UnsafePipelineComponent, PipelData, FrozenPipelData
+
+class Adder(UnsafePipelineComponent):
+
+    def _run(self, x, *, y=0):
+        return FrozenPipelData(args=(x + y + 2,))
+
+def test_pipeldata_has_no_dict():
+    assert not hasattr(PipelData(args=(1,)), '__dict__')
+    assert not hasattr(FrozenPipelData(args=(1,)), '__dict__')
+
+def test_frozen_pipeldata_is_immutable():
+    data = FrozenPipelData(args=(1,), kwargs={'y': 2})
+    with pytest.raises(expected_exception=AttributeError):
+        data.args = (2,)
+    with pytest.raises(expected_exception=AttributeError):
+        data.args += (2,)
+    with pytest.raises(expected_exception=TypeError):
+        data.kwargs['y'] = 3
+
+def test_freeze_shares_payload():
+    kwargs = {'y': 2}
+    data = PipelData(args=(1,), kwargs=kwargs)
+    frozen = data.freeze()
+    assert isinstance(frozen, PipelData)
+    assert frozen.args is data.args
+    assert frozen.freeze() is frozen
+    replaced = frozen.replace(args=(5,))
+    assert replaced.kwargs is frozen.kwargs
+    assert replaced.args == (5,)
+    assert frozen.thaw() == data
+
+def test_frozen_pipeldata_equality_and_hash():
+    data = PipelData(args=(1, 'a'), kwargs={'y': 2})
+    frozen = data.freeze()
+    assert frozen == data
+    assert data == frozen
+    assert hash(frozen) == hash(data)
+    assert frozen.fingerprint() == data.fingerprint()
+    assert frozen != FrozenPipelData(args=(1, 'a'))
+
+def test_frozen_pipeldata_hash_is_cached():
+    frozen = FrozenPipelData(args=([1, 2],))
+    assert frozen._hash is None
+    first = hash(frozen)
+    assert frozen._hash == first
+    assert hash(frozen) == first
+
+def test_frozen_pipeldata_pickle():
+    frozen = FrozenPipelData(args=(1,), kwargs={'y': 2})
+    assert pickle.loads(pickle.dumps(frozen)) == frozen
+
+def test_frozen_pipeldata_with_components():
+    adder = Adder(cache_size=2)
+    res = adder(FrozenPipelData(args=(1,), kwargs={'y': 2}))
+    assert res.args[0] == 5
+    # Cache hit with the equivalent mutable input
+    adder(PipelData(args=(1,), kwargs={'y': 2}))
+    assert adder.cache_info().hits == 1
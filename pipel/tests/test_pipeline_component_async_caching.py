@@ -0,0 +1,131 @@
+import asyncio
+import pytest
+from pipel import UnsafePipelineComponent, PipelData, async_lru_cache
+
+class SlowAdder(UnsafePipelineComponent):
+    calls: int = 0
+
+    def _run(self, x):
+        return PipelData(args=(x + 2,))
+
+    async def _a_run(self, x):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return PipelData(args=(x + 2,))
+
+class FailingAdder(UnsafePipelineComponent):
+    calls: int = 0
+
+    def _run(self, x):
+        raise ValueError('Failing')
+
+    async def _a_run(self, x):
+        self.calls += 1
+        raise ValueError('Failing')
+
+def test_async_cache_stores_results():
+    adder = SlowAdder(cache_size=2)
+    input_data = PipelData(args=(1,))
+
+    async def main():
+        first = await adder(input_data, exec_mode='async')
+        second = await adder(input_data, exec_mode='async') # Hit
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first == second == PipelData(args=(3,))
+    info = adder.cache_info(exec_mode='async')
+    assert info.hits == 1
+    assert info.misses == 1
+    assert info.currsize == 1
+    assert adder.calls == 1
+
+def test_async_cache_hit_across_event_loops():
+    adder = SlowAdder(cache_size=2)
+    input_data = PipelData(args=(1,))
+    asyncio.run(adder(input_data, exec_mode='async'))
+    res = asyncio.run(adder(input_data, exec_mode='async'))
+    assert res.args[0] == 3
+    assert adder.calls == 1
+
+def test_async_cache_single_flight():
+    adder = SlowAdder(cache_size=2)
+    input_data = PipelData(args=(1,))
+
+    async def main():
+        return await asyncio.gather(*[adder(input_data, exec_mode='async') for _ in range(10)])
+
+    results = asyncio.run(main())
+    assert all(r.args[0] == 3 for r in results)
+    assert adder.calls == 1
+    info = adder.cache_info(exec_mode='async')
+    assert info.misses == 1
+    assert info.hits == 9
+
+def test_async_cache_zero_size():
+    adder = SlowAdder()
+    input_data = PipelData(args=(1,))
+
+    async def main():
+        return await asyncio.gather(*[adder(input_data, exec_mode='async') for _ in range(3)])
+
+    asyncio.run(main())
+    assert adder.calls == 3
+    info = adder.cache_info(exec_mode='async')
+    assert info.maxsize == 0
+    assert info.misses == 3
+    assert info.currsize == 0
+
+def test_async_cache_eviction():
+    adder = SlowAdder(cache_size=2)
+
+    async def main():
+        for x in (1, 2, 1, 3):
+            await adder(PipelData(args=(x,)), exec_mode='async')
+
+    asyncio.run(main())
+    info = adder.cache_info(exec_mode='async')
+    assert info.hits == 1
+    assert info.misses == 3
+    assert info.currsize == 2
+
+def test_async_cache_clear():
+    adder = SlowAdder(cache_size=2)
+    asyncio.run(adder(PipelData(args=(1,)), exec_mode='async'))
+    adder.cache_clear(exec_mode='async')
+    info = adder.cache_info(exec_mode='async')
+    assert info.currsize == 0
+    assert info.misses == 0
+
+def test_async_cache_exceptions_are_not_cached():
+    adder = FailingAdder(cache_size=2)
+    input_data = PipelData(args=(1,))
+
+    async def main():
+        return await asyncio.gather(
+            *[adder(input_data, exec_mode='async') for _ in range(3)],
+            return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert adder.calls == 1
+    with pytest.raises(expected_exception=ValueError):
+        asyncio.run(adder(input_data, exec_mode='async'))
+    assert adder.calls == 2
+    assert adder.cache_info(exec_mode='async').currsize == 0
+
+def test_async_lru_cache_decorator():
+    calls = []
+
+    @async_lru_cache(maxsize=None)
+    async def square(x):
+        calls.append(x)
+        return x * x
+
+    async def main():
+        return [await square(x) for x in (2, 2, 3)]
+
+    assert asyncio.run(main()) == [4, 4, 9]
+    assert calls == [2, 3]
+    assert square.cache_info().maxsize is None
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import pytest
+from pipel import PipelineComponent, PipelData, ComponentHook, LoggerHook
+
+class SafeAdder(PipelineComponent):
+    reprs: int = 0
+
+    def validate_input(self, data: PipelData):
+        for d in data.args:
+            assert isinstance(d, int)
+
+    def validate_output(self, out_data: PipelData):
+        for d in out_data.args:
+            assert isinstance(d, int)
+
+    def _run(self, x):
+        return PipelData(args=(x + 2,))
+
+    async def _a_run(self, x):
+        return PipelData(args=(x + 2,))
+
+    def __repr__(self):
+        self.reprs += 1
+        return super().__repr__()
+
+class RecordingHook(ComponentHook):
+    events: list
+
+    def __init__(self):
+        self.events = []
+
+    def span_start(self, component, span, data):
+        self.events.append(('start', span, data))
+
+    def span_end(self, component, span, elapsed, error):
+        assert elapsed >= 0
+        self.events.append(('end', span, type(error).__name__ if error else None))
+
+class DisabledHook(RecordingHook):
+
+    def enabled(self):
+        return False
+
+def test_disabled_logger_does_not_format():
+    logger = logging.getLogger('pipel.tests.disabled')
+    logger.setLevel(logging.WARNING)
+    adder = SafeAdder(logger=logger)
+    adder(PipelData(args=(1,)))
+    assert adder.reprs == 0
+
+def test_enabled_std_logger(caplog):
+    logger = logging.getLogger('pipel.tests.enabled')
+    adder = SafeAdder(logger=logger)
+    with caplog.at_level(logging.INFO, logger='pipel.tests.enabled'):
+        adder(PipelData(args=(1,)))
+    assert [r.getMessage() for r in caplog.records] == [
+        f'Validating input to {repr(adder)}',
+        'Valid input',
+        f'Running {repr(adder)}',
+        f'Finished running {repr(adder)}',
+        'Validating output',
+        f'Valid output from {repr(adder)}'
+    ]
+
+def test_logger_hook_level(caplog):
+    logger = logging.getLogger('pipel.tests.level')
+    adder = SafeAdder(hooks=[LoggerHook(logger, level=logging.DEBUG)])
+    with caplog.at_level(logging.INFO, logger='pipel.tests.level'):
+        adder(PipelData(args=(1,)))
+    assert not caplog.records
+    with caplog.at_level(logging.DEBUG, logger='pipel.tests.level'):
+        adder(PipelData(args=(1,)))
+    assert len(caplog.records) == 6
+
+def test_structured_spans():
+    hook = RecordingHook()
+    adder = SafeAdder(hooks=[hook, DisabledHook()])
+    input_data = PipelData(args=(1,))
+    adder(input_data)
+    assert hook.events == [
+        ('start', 'validate_input', input_data),
+        ('end', 'validate_input', None),
+        ('start', 'run', input_data),
+        ('end', 'run', None),
+        ('start', 'validate_output', PipelData(args=(3,))),
+        ('end', 'validate_output', None),
+    ]
+
+def test_span_error():
+    hook = RecordingHook()
+    adder = SafeAdder(hooks=[hook])
+    with pytest.raises(expected_exception=AssertionError):
+        adder(PipelData(args=('1',)))
+    assert hook.events[-1] == ('end', 'validate_input', 'AssertionError')
+
+def test_async_validation_and_spans():
+    hook = RecordingHook()
+    adder = SafeAdder(hooks=[hook])
+    res = asyncio.run(adder(PipelData(args=(1,)), exec_mode='async'))
+    assert res.args[0] == 3
+    assert [e[:2] for e in hook.events] == [
+        ('start', 'validate_input'),
+        ('end', 'validate_input'),
+        ('start', 'run'),
+        ('end', 'run'),
+        ('start', 'validate_output'),
+        ('end', 'validate_output'),
+    ]
+    with pytest.raises(expected_exception=AssertionError):
+        asyncio.run(adder(PipelData(args=('1',)), exec_mode='async'))
+
+def test_hooks_deepcopy():
+    hook = RecordingHook()
+    clone = SafeAdder(hooks=[hook]).deepcopy()
+    clone(PipelData(args=(1,)))
+    assert len(hook.events) == 6
+
+def test_logger_reassigned_at_runtime(caplog):
+    logger = logging.getLogger('pipel.tests.runtime')
+    hook = RecordingHook()
+    adder = SafeAdder(hooks=[hook])
+    adder.logger = logger
+    with caplog.at_level(logging.INFO, logger='pipel.tests.runtime'):
+        adder(PipelData(args=(1,)))
+        assert len(caplog.records) == 6
+        adder.logger = None
+        adder(PipelData(args=(2,)))
+        assert len(caplog.records) == 6
+    # Custom hooks are kept across the changes
+    assert adder.hooks == [hook]
+    assert len(hook.events) == 12
+
+def test_deepcopy_has_its_own_logger_hook():
+    adder = SafeAdder(logger=logging.getLogger('pipel.tests.copy'))
+    clone = adder.deepcopy()
+    clone.logger = None
+    assert clone.hooks == []
+    assert len(adder.hooks) == 1
@@ -0,0 +1,65 @@
+import asyncio
+import logging
+import pickle
+import pytest
+from pipel import UnsafePipelineComponent, PipelineComponent, PipelData, LRUCache, Always
+
+class Adder(UnsafePipelineComponent):
+
+    def _run(self, x):
+        return PipelData(args=(x + 1,))
+
+class AsyncAdder(Adder):
+
+    async def _a_run(self, x):
+        return PipelData(args=(x + 10,))
+
+class SafeAdder(PipelineComponent):
+
+    def validate_input(self, data):
+        assert isinstance(data.args[0], int)
+
+    def validate_output(self, data):
+        pass
+
+    def _run(self, x):
+        return PipelData(args=(x + 1,))
+
+def roundtrip(component):
+    return pickle.loads(pickle.dumps(component))
+
+def test_unsafe_component_pickle():
+    adder = Adder(cache_size=2)
+    adder(PipelData(args=(1,)))
+    clone = roundtrip(adder)
+    assert clone.id == adder.id
+    assert clone(PipelData(args=(1,))).args[0] == 2
+    # The builtin LRU cache starts empty
+    assert clone.cache_info().misses == 1
+    assert asyncio.run(clone(PipelData(args=(1,)), exec_mode='async')).args[0] == 2
+    assert asyncio.run(roundtrip(AsyncAdder())(PipelData(args=(1,)), exec_mode='async')).args[0] == 11
+
+def test_backend_entries_are_pickled():
+    adder = Adder(cache=LRUCache(4))
+    adder(PipelData(args=(1,)))
+    clone = roundtrip(adder)
+    clone(PipelData(args=(1,)))
+    assert clone.cache_info().hits == 1
+
+def test_pipeline_component_pickle():
+    logger = logging.getLogger('pipel.tests.pickle')
+    safe = SafeAdder(logger=logger, validation=Always())
+    clone = roundtrip(safe)
+    assert clone(PipelData(args=(1,))).args[0] == 2
+    assert clone.logger is logger
+    assert len(clone.hooks) == 1
+    with pytest.raises(expected_exception=AssertionError):
+        clone(PipelData(args=('1',)))
+    # The validation decorator is rebuilt for the clone
+    with pytest.raises(expected_exception=AssertionError):
+        roundtrip(SafeAdder())(PipelData(args=('1',)))
+
+def test_unpicklable_logger_decorator():
+    adder = Adder(logger_decorator=lambda func: func)
+    with pytest.raises(expected_exception=Exception):
+        pickle.dumps(adder)
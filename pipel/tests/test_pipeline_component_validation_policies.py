@@ -0,0 +1,112 @@
+import asyncio
+from typing import Any
+import pytest
+from pipel import PipelineComponent, PipelData
+from pipel import Always, OnCacheMiss, FirstN, Sampled, Schema
+
+class CountingAdder(PipelineComponent):
+    validations: int = 0
+
+    def validate_input(self, data: PipelData):
+        self.validations += 1
+
+    def validate_output(self, data: PipelData):
+        pass
+
+    def _run(self, x):
+        return PipelData(args=(x + 2,))
+
+    async def _a_run(self, x):
+        return PipelData(args=(x + 2,))
+
+class SchemaAdder(PipelineComponent):
+    input_schema = Schema(int, scale=(int, float))
+    output_schema = Schema(int)
+
+    def _run(self, x, *, scale=1):
+        return PipelData(args=(x * scale + 2,))
+
+def run_many(component, n, x=1):
+    for _ in range(n):
+        component(PipelData(args=(x,)))
+
+def test_default_policy_validates_cache_misses():
+    adder = CountingAdder(cache_size=2)
+    assert isinstance(adder.validation, OnCacheMiss)
+    run_many(adder, 5)
+    assert adder.validations == 1
+
+def test_always_validates_cache_hits():
+    adder = CountingAdder(cache_size=2, validation=Always())
+    run_many(adder, 5)
+    assert adder.validations == 5
+    assert adder.cache_info().hits == 4
+
+def test_first_n():
+    adder = CountingAdder(validation=FirstN(3))
+    run_many(adder, 10)
+    assert adder.validations == 3
+    # The clone starts counting again
+    clone = adder.deepcopy()
+    run_many(clone, 10)
+    assert clone.validations == 3
+
+def test_sampled():
+    adder = CountingAdder(validation=Sampled(0.25, seed=0))
+    run_many(adder, 1000)
+    assert 150 < adder.validations < 350
+    never = CountingAdder(validation=Sampled(0))
+    run_many(never, 10)
+    assert never.validations == 0
+
+def test_switch_policy_at_runtime():
+    adder = CountingAdder(validation=Sampled(0))
+    run_many(adder, 3)
+    assert adder.validations == 0
+    adder.validation = Always()
+    run_many(adder, 3)
+    assert adder.validations == 3
+    with pytest.raises(expected_exception=ValueError):
+        adder.validation = 'always'
+
+def test_policy_async():
+    adder = CountingAdder(cache_size=2, validation=Always())
+
+    async def main():
+        for _ in range(3):
+            res = await adder(PipelData(args=(1,)), exec_mode='async')
+        return res
+
+    assert asyncio.run(main()).args[0] == 3
+    assert adder.validations == 3
+
+def test_schema_component():
+    adder = SchemaAdder()
+    assert adder(PipelData(args=(1,), kwargs={'scale': 3})).args[0] == 5
+    with pytest.raises(expected_exception=ValueError, match='args'):
+        adder(PipelData(args=('1',), kwargs={'scale': 3}))
+    with pytest.raises(expected_exception=ValueError, match='Missing kwarg'):
+        adder(PipelData(args=(1,)))
+    with pytest.raises(expected_exception=ValueError, match='args'):
+        adder(PipelData(args=(1, 2), kwargs={'scale': 3}))
+    # The output schema catches the float result
+    with pytest.raises(expected_exception=ValueError):
+        adder(PipelData(args=(1,), kwargs={'scale': 1.5}))
+
+def test_schema_compiled_once():
+    schema = Schema(Any, None, strict=True, name=str)
+    checker = schema.compile()
+    assert schema.compile() is checker
+    checker(PipelData(args=(object(), None), kwargs={'name': 'a'}))
+    with pytest.raises(expected_exception=ValueError, match='Unexpected kwargs'):
+        checker(PipelData(args=(1, 2), kwargs={'name': 'a', 'other': 1}))
+
+def test_missing_validation():
+    class NoValidation(PipelineComponent):
+        input_schema = Schema(int)
+
+        def _run(self, x):
+            return PipelData(args=(x,))
+
+    with pytest.raises(expected_exception=TypeError, match='validate_output'):
+        NoValidation()
@@ -0,0 +1,86 @@
+import asyncio
+import random
+import pytest
+from pipel import SequentialPipeline, UnsafePipelineComponent, PipelData, DAGPipeline
+from pipel import Profiler, LatencyHistogram
+
+class Adder(UnsafePipelineComponent):
+
+    def _run(self, x):
+        return PipelData(args=(x + 2,))
+
+class Failing(UnsafePipelineComponent):
+
+    def _run(self, x):
+        if x > 3:
+            raise ValueError(x)
+        return PipelData(args=(x,))
+
+def test_histogram_percentiles():
+    rng = random.Random(0)
+    values = sorted(rng.uniform(1e-6, 1e-1) for _ in range(10_000))
+    histogram = LatencyHistogram(significant_figures=2)
+    for v in values:
+        histogram.record(v)
+    assert histogram.count == len(values)
+    for p in (50, 90, 99):
+        exact = values[int(p / 100 * len(values)) - 1]
+        assert histogram.percentile(p) == pytest.approx(exact, rel=0.02)
+    assert histogram.percentile(100) == values[-1]
+    assert histogram.percentile(0) == values[0]
+    with pytest.raises(expected_exception=ValueError):
+        histogram.percentile(101)
+
+def test_histogram_merge():
+    a, b = LatencyHistogram(), LatencyHistogram()
+    a.record(0.001)
+    b.record(0.002)
+    b.record(0.003)
+    a.merge(b)
+    assert a.count == 3
+    assert a.max == 0.003
+    assert a.mean == pytest.approx(0.002)
+    with pytest.raises(expected_exception=ValueError):
+        a.merge(LatencyHistogram(significant_figures=3))
+
+def test_sequential_pipeline_stats():
+    pipeline = SequentialPipeline([Adder(cache_size=4), Adder()])
+    with pytest.raises(expected_exception=ValueError):
+        pipeline.stats()
+    pipeline.profiler = Profiler()
+    for _ in range(3):
+        pipeline.run(PipelData(args=(1,)))
+    stats = pipeline.stats()
+    assert list(stats) == ['0:Adder', '1:Adder']
+    assert stats['0:Adder'].calls == 3
+    assert stats['0:Adder'].hit_ratio == pytest.approx(2 / 3)
+    assert stats['1:Adder'].hit_ratio is None
+    assert stats['1:Adder'].p50 <= stats['1:Adder'].p99 <= stats['1:Adder'].max
+
+def test_errors_and_callback():
+    events = []
+    pipeline = SequentialPipeline([Adder(), Failing()])
+    pipeline.profiler = Profiler(callback=lambda stage, elapsed, error: events.append((stage, error)))
+    pipeline.run(PipelData(args=(1,)))
+    with pytest.raises(expected_exception=ValueError):
+        pipeline.run(PipelData(args=(5,)))
+    assert pipeline.stats()['1:Failing'].errors == 1
+    assert [(stage, type(error).__name__) for stage, error in events][-2:] == [
+        ('0:Adder', 'NoneType'), ('1:Failing', 'ValueError')
+    ]
+
+def test_async_and_map_are_profiled():
+    pipeline = SequentialPipeline([Adder()])
+    pipeline.profiler = Profiler()
+    asyncio.run(pipeline.arun(PipelData(args=(1,))))
+    pipeline.map([PipelData(args=(i,)) for i in range(10)], workers=4)
+    assert pipeline.stats()['0:Adder'].calls == 11
+    pipeline.profiler.reset()
+    assert pipeline.stats() == {}
+
+def test_dag_stats():
+    adj = [[0, 1, 1], [0, 0, 0], [0, 0, 0]]
+    dag = DAGPipeline([Adder(), Adder(), Adder()], adj)
+    dag.profiler = Profiler()
+    dag.run({0: PipelData(args=(1,))})
+    assert sorted(dag.stats()) == ['0:Adder', '1:Adder', '2:Adder']
@@ -0,0 +1,106 @@
+import asyncio
+import random
+import pytest
+from pipel import SequentialPipeline, UnsafePipelineComponent, PipelData
+
+class Sleeper(UnsafePipelineComponent):
+    running: int
+    max_running: int
+
+    def __init__(self, delay: float = 0.01, jitter: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self.delay = delay
+        self.jitter = jitter
+        self.running = self.max_running = 0
+
+    def _run(self, x):
+        return PipelData(args=(x + 1,))
+
+    async def _a_run(self, x):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(self.delay * random.random() if self.jitter else self.delay)
+        self.running -= 1
+        return PipelData(args=(x + 1,))
+
+class Explode(UnsafePipelineComponent):
+
+    def _run(self, x):
+        return [PipelData(args=(x, i)) for i in range(x % 3)]
+
+    async def _a_run(self, x):
+        await asyncio.sleep(0.001 * (x % 4))
+        return [PipelData(args=(x, i)) for i in range(x % 3)]
+
+class Failing(UnsafePipelineComponent):
+
+    def _run(self, x):
+        raise ValueError('Failing')
+
+    async def _a_run(self, x):
+        if x == 3:
+            raise ValueError('Failing')
+        return PipelData(args=(x,))
+
+async def collect(aiter):
+    return [out async for out in aiter]
+
+def test_astream_overlaps_stages():
+    first, second = Sleeper(0.02), Sleeper(0.02)
+    pipeline = SequentialPipeline([first, second])
+    loop_time = []
+
+    async def main():
+        t0 = asyncio.get_running_loop().time()
+        res = await collect(pipeline.astream([PipelData(args=(x,)) for x in range(5)], ordered=True))
+        loop_time.append(asyncio.get_running_loop().time() - t0)
+        return res
+
+    res = asyncio.run(main())
+    assert [r.args[0] for r in res] == [x + 2 for x in range(5)]
+    # Sequential would take 5 * 2 * 0.02 = 0.2s, the assembly line about 6 * 0.02
+    assert loop_time[0] < 0.18
+
+def test_astream_per_stage_concurrency():
+    first, second = Sleeper(), Sleeper()
+    pipeline = SequentialPipeline([first, second])
+    res = asyncio.run(collect(pipeline.astream([PipelData(args=(x,)) for x in range(20)], concurrency=[4, 1])))
+    assert sorted(r.args[0] for r in res) == [x + 2 for x in range(20)]
+    assert 1 < first.max_running <= 4
+    assert second.max_running == 1
+
+def test_astream_ordered_with_jitter():
+    pipeline = SequentialPipeline([Sleeper(0.01, jitter=True), Sleeper(0.01, jitter=True)])
+    res = asyncio.run(collect(pipeline.astream([PipelData(args=(x,)) for x in range(30)], concurrency=8, ordered=True)))
+    assert [r.args[0] for r in res] == [x + 2 for x in range(30)]
+
+def test_astream_async_iterable_and_explode():
+    async def source():
+        for x in range(8):
+            await asyncio.sleep(0)
+            yield PipelData(args=(x,))
+
+    pipeline = SequentialPipeline([Explode()])
+    res = asyncio.run(collect(pipeline.astream(source(), concurrency=4, ordered=True)))
+    assert [r.args for r in res] == [(x, i) for x in range(8) for i in range(x % 3)]
+
+def test_astream_exception():
+    pipeline = SequentialPipeline([Failing(), Sleeper()])
+    with pytest.raises(expected_exception=ValueError, match='Failing'):
+        asyncio.run(collect(pipeline.astream([PipelData(args=(x,)) for x in range(10)], concurrency=2)))
+
+def test_astream_invalid_arguments():
+    pipeline = SequentialPipeline([Sleeper()])
+    with pytest.raises(expected_exception=ValueError):
+        asyncio.run(collect(pipeline.astream([], concurrency=[1, 2])))
+    with pytest.raises(expected_exception=ValueError):
+        asyncio.run(collect(pipeline.astream([], queue_size=0)))
+
+def test_astream_early_exit():
+    pipeline = SequentialPipeline([Sleeper(0.001)])
+
+    async def main():
+        async for out in pipeline.astream(PipelData(args=(x,)) for x in range(1000)):
+            return out
+
+    assert asyncio.run(main()).args[0] >= 1
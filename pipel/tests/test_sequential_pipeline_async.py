@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+from pipel import SequentialPipeline, UnsafePipelineComponent, PipelData
+
+class SlowAdder(UnsafePipelineComponent):
+    running: int = 0
+    max_running: int = 0
+
+    def _run(self, x):
+        return PipelData(args=(x + 2,))
+
+    async def _a_run(self, x):
+        SlowAdder.running += 1
+        SlowAdder.max_running = max(SlowAdder.max_running, SlowAdder.running)
+        await asyncio.sleep(0.01)
+        SlowAdder.running -= 1
+        return PipelData(args=(x + 2,))
+
+class Failing(UnsafePipelineComponent):
+
+    def _run(self, x):
+        raise ValueError('Failing')
+
+    async def _a_run(self, x):
+        if x == 5:
+            raise ValueError('Failing')
+        return PipelData(args=(x,))
+
+@pytest.fixture(autouse=True)
+def reset_counters():
+    SlowAdder.running = SlowAdder.max_running = 0
+
+def test_arun_inside_running_loop():
+    pipeline = SequentialPipeline([SlowAdder(), SlowAdder()])
+
+    async def main():
+        return await pipeline.arun(PipelData(args=(1,)))
+
+    assert asyncio.run(main()).args[0] == 5
+
+def test_run_async_single_loop():
+    pipeline = SequentialPipeline([SlowAdder(), SlowAdder()])
+    assert pipeline.run(PipelData(args=(1,)), exec_mode='async').args[0] == 5
+
+def test_arun_many_order_and_concurrency():
+    pipeline = SequentialPipeline([SlowAdder(), SlowAdder()])
+    inputs = [PipelData(args=(x,)) for x in range(20)]
+    res = asyncio.run(pipeline.arun_many(inputs, concurrency=4))
+    assert [r.args[0] for r in res] == [x + 4 for x in range(20)]
+    assert 1 < SlowAdder.max_running <= 4
+
+def test_arun_many_empty_and_invalid():
+    pipeline = SequentialPipeline([SlowAdder()])
+    assert asyncio.run(pipeline.arun_many([])) == []
+    with pytest.raises(expected_exception=ValueError):
+        asyncio.run(pipeline.arun_many([], concurrency=0))
+
+def test_arun_many_exception():
+    pipeline = SequentialPipeline([Failing(), SlowAdder()])
+    with pytest.raises(expected_exception=ValueError):
+        asyncio.run(pipeline.arun_many([PipelData(args=(x,)) for x in range(10)], concurrency=3))
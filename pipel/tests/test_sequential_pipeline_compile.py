@@ -0,0 +1,96 @@
+import pytest
+from pipel import SequentialPipeline, UnsafePipelineComponent, PipelineComponent, PipelData
+from pipel import Always, Sampled, ComponentHook
+
+class Adder(UnsafePipelineComponent):
+    calls: int = 0
+
+    def _run(self, x, *, step=2):
+        self.calls += 1
+        return PipelData(args=(x + step,), kwargs={'step': step})
+
+class SafeAdder(PipelineComponent):
+    validations: int = 0
+
+    def validate_input(self, data):
+        self.validations += 1
+        assert isinstance(data.args[0], int)
+
+    def validate_output(self, data):
+        pass
+
+    def _run(self, x, **kwargs):
+        return PipelData(args=(x + 2,))
+
+def test_compiled_matches_run():
+    pipeline = SequentialPipeline([Adder(), Adder(cache_size=4), SafeAdder(), Adder()])
+    compiled = pipeline.compile()
+    for x in range(10):
+        data = PipelData(args=(x,), kwargs={'step': 3})
+        assert compiled(data) == pipeline.run(data)
+    assert len(compiled) == 4
+
+def test_compiled_is_reused_until_mutated():
+    pipeline = SequentialPipeline([Adder()])
+    compiled = pipeline.compile()
+    assert pipeline.compile() is compiled
+    pipeline.append(Adder())
+    assert not compiled.valid
+    with pytest.raises(expected_exception=RuntimeError):
+        compiled(PipelData(args=(1,)))
+    assert pipeline.compile()(PipelData(args=(1,))).args[0] == 5
+
+@pytest.mark.parametrize('mutate', [
+    lambda p: p.append(Adder()),
+    lambda p: p.insert(0, Adder()),
+    lambda p: p.__setitem__(0, Adder()),
+    lambda p: p.__delitem__(0),
+    lambda p: p.extend([Adder()]),
+    lambda p: p.pop(),
+    lambda p: p.reverse(),
+    lambda p: p.clear(),
+])
+def test_mutations_invalidate(mutate):
+    pipeline = SequentialPipeline([Adder(), Adder()])
+    compiled = pipeline.compile()
+    mutate(pipeline)
+    assert not compiled.valid
+
+def test_cached_stage_keeps_caching():
+    adder = Adder(cache_size=4)
+    compiled = SequentialPipeline([adder]).compile()
+    for _ in range(3):
+        compiled(PipelData(args=(1,)))
+    assert adder.calls == 1
+    assert adder.cache_info().hits == 2
+
+def test_uncached_stage_runs_directly():
+    adder = Adder()
+    func, unpack = adder._fused()
+    assert unpack
+    assert func == adder._run
+
+def test_validation_policy_read_at_call_time():
+    safe = SafeAdder(validation=Sampled(0))
+    compiled = SequentialPipeline([safe]).compile()
+    compiled(PipelData(args=(1,)))
+    assert safe.validations == 0
+    safe.validation = Always()
+    compiled(PipelData(args=(1,)))
+    assert safe.validations == 1
+    with pytest.raises(expected_exception=AssertionError):
+        compiled(PipelData(args=('1',)))
+
+def test_recompile_picks_up_hooks():
+    events = []
+
+    class Hook(ComponentHook):
+        def span_start(self, component, span, data):
+            events.append(span)
+
+    safe = SafeAdder()
+    pipeline = SequentialPipeline([safe])
+    pipeline.compile()(PipelData(args=(1,)))
+    safe.hooks.append(Hook())
+    pipeline.compile(recompile=True)(PipelData(args=(1,)))
+    assert events == ['validate_input', 'run', 'validate_output']
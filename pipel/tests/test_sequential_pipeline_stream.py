@@ -0,0 +1,119 @@
+import pytest
+from pipel import SequentialPipeline, UnsafePipelineComponent, PipelineComponent, PipelData, Schema, Always
+
+class Adder(UnsafePipelineComponent):
+    calls: int = 0
+
+    def _run(self, x):
+        self.calls += 1
+        return PipelData(args=(x + 2,))
+
+class EvenFilter(UnsafePipelineComponent):
+
+    def _run(self, x):
+        return PipelData(args=(x,)) if x % 2 == 0 else None
+
+class Repeat(UnsafePipelineComponent):
+
+    def _run(self, x):
+        return [PipelData(args=(x,)) for _ in range(x % 3)]
+
+class SafeAdder(PipelineComponent):
+
+    def validate_input(self, data):
+        assert data.args[0] >= 0
+
+    def validate_output(self, data):
+        pass
+
+    def _run(self, x):
+        return PipelData(args=(x + 2,))
+
+def test_stream_is_lazy():
+    adder = Adder()
+    pulled = []
+
+    def source():
+        for x in range(1000):
+            pulled.append(x)
+            yield PipelData(args=(x,))
+
+    stream = SequentialPipeline([adder, Adder()]).stream(source())
+    assert adder.calls == 0
+    first = next(stream)
+    assert first.args[0] == 4
+    assert pulled == [0]
+    assert adder.calls == 1
+
+def test_stream_outputs():
+    pipeline = SequentialPipeline([Adder(), Adder()])
+    res = list(pipeline.stream(PipelData(args=(x,)) for x in range(5)))
+    assert [r.args[0] for r in res] == [x + 4 for x in range(5)]
+
+def test_stream_filter_and_explode():
+    pipeline = SequentialPipeline([EvenFilter(), Repeat(), Adder()])
+    res = list(pipeline.stream(PipelData(args=(x,)) for x in range(6)))
+    # 0 -> dropped by Repeat, 2 -> twice, 4 -> once
+    assert [r.args[0] for r in res] == [4, 4, 6]
+
+def test_stream_caching_and_validation():
+    adder = Adder(cache_size=4)
+    pipeline = SequentialPipeline([adder, SafeAdder()])
+    res = list(pipeline.stream(PipelData(args=(x % 2,)) for x in range(10)))
+    assert [r.args[0] for r in res] == [(x % 2) + 4 for x in range(10)]
+    assert adder.calls == 2
+    with pytest.raises(expected_exception=AssertionError):
+        list(SequentialPipeline([SafeAdder()]).stream([PipelData(args=(-1,))]))
+
+def test_stream_batched():
+    pipeline = SequentialPipeline([EvenFilter(), Repeat(), Adder()])
+    res = list(pipeline.stream((PipelData(args=(x,)) for x in range(6)), batch_size=4))
+    assert [r.args[0] for r in res] == [4, 4, 6]
+    with pytest.raises(expected_exception=ValueError):
+        pipeline.stream([], batch_size=0)
+
+def test_stream_snapshot_of_stages():
+    pipeline = SequentialPipeline([Adder()])
+    stream = pipeline.stream([PipelData(args=(1,))])
+    pipeline.append(Adder())
+    assert next(stream).args[0] == 3
+
+class SafeRepeat(PipelineComponent):
+    """Explode and filter stage validating every emitted item"""
+    checked: int = 0
+
+    def validate_input(self, data):
+        pass
+
+    def validate_output(self, data):
+        assert isinstance(data, PipelData)
+        assert data.args[0] >= 0
+        self.checked += 1
+
+    def _run(self, x):
+        if x % 3 == 0:
+            return None
+        return [PipelData(args=(x - 2,)) for _ in range(x % 3)]
+
+class SchemaRepeat(PipelineComponent):
+    input_schema = Schema(int)
+    output_schema = Schema(int)
+
+    def _run(self, x):
+        return (PipelData(args=(x,)) for _ in range(2))
+
+@pytest.mark.parametrize('batch_size', [None, 2])
+@pytest.mark.parametrize('make_validation', [lambda: None, Always])
+def test_stream_validates_emitted_items(batch_size, make_validation):
+    stage = SafeRepeat(validation=make_validation())
+    res = list(SequentialPipeline([stage]).stream((PipelData(args=(x,)) for x in range(2, 6)), batch_size=batch_size))
+    assert [r.args[0] for r in res] == [0, 0, 2, 3, 3]
+    assert stage.checked == 5
+    with pytest.raises(expected_exception=AssertionError):
+        list(SequentialPipeline([SafeRepeat()]).stream([PipelData(args=(1,))], batch_size=batch_size))
+
+def test_stream_schema_on_emitted_items():
+    pipeline = SequentialPipeline([SchemaRepeat()])
+    assert [r.args[0] for r in pipeline.stream([PipelData(args=(1,))])] == [1, 1]
+    with pytest.raises(expected_exception=Exception):
+        list(SequentialPipeline([SchemaRepeat()]).stream([PipelData(args=('1',))]))
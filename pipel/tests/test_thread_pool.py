@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from pipel import SequentialPipeline, UnsafePipelineComponent, PipelData
+from pipel import LRUCache, LFUCache, TTLCache, SizedCache
+
+class Adder(UnsafePipelineComponent):
+
+    def _run(self, x):
+        return PipelData(args=(x + 2,))
+
+class Sleeper(UnsafePipelineComponent):
+    blocking = True
+
+    def _run(self, x):
+        time.sleep(0.05)
+        return PipelData(args=(x,))
+
+def inputs(*values):
+    return [PipelData(args=(v,)) for v in values]
+
+def test_map_preserves_order():
+    pipeline = SequentialPipeline([Adder(), Adder()])
+    res = pipeline.map(inputs(*range(50)), workers=4)
+    assert [r.args[0] for r in res] == [x + 4 for x in range(50)]
+
+def test_map_with_executor():
+    pipeline = SequentialPipeline([Adder()])
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        res = pipeline.map(inputs(1, 2, 3), executor=executor)
+    assert [r.args[0] for r in res] == [3, 4, 5]
+
+@pytest.mark.parametrize('make_cache', [
+    lambda: LRUCache(16),
+    lambda: LFUCache(16),
+    lambda: TTLCache(60, maxsize=16),
+    lambda: SizedCache(10_000),
+])
+def test_cache_thread_safety(make_cache):
+    adder = Adder(cache=make_cache())
+    pipeline = SequentialPipeline([adder])
+    values = [i % 40 for i in range(2000)]
+    res = pipeline.map(inputs(*values), workers=8)
+    assert [r.args[0] for r in res] == [v + 2 for v in values]
+    info = adder.cache_info()
+    assert info.hits + info.misses == len(values)
+    assert info.currsize <= 16 or info.maxsize is None
+
+def test_blocking_component_offloaded():
+    sleeper = Sleeper()
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        res = await sleeper(PipelData(args=(1,)), exec_mode='async')
+        task.cancel()
+        return res, ticks
+
+    res, ticks = asyncio.run(main())
+    assert res.args[0] == 1
+    # The loop kept running while _run slept in the executor
+    assert ticks > 2
+
+def test_blocking_component_runs_in_other_thread():
+    threads = []
+
+    class Recorder(UnsafePipelineComponent):
+        blocking = True
+
+        def _run(self, x):
+            threads.append(threading.get_ident())
+            return PipelData(args=(x,))
+
+    asyncio.run(Recorder()(PipelData(args=(1,)), exec_mode='async'))
+    assert threads[0] != threading.get_ident()
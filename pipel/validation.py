@@ -0,0 +1,152 @@
+import itertools
+import random
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .pipel_types import PipelData
+
+
+class ValidationPolicy:
+    """Decides which calls of a PipelineComponent are validated.
+
+    Policies with `on_cache_miss = True` validate inside the cached path,
+    i.e. only the calls that actually run the component. The others are
+    asked `should_validate()` on every call, cache hits included.
+    """
+    on_cache_miss: bool = False
+
+    def should_validate(self) -> bool:
+        return True
+
+    def copy(self) -> 'ValidationPolicy':
+        """Returns the same policy with its state reset"""
+        return self.__class__()
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}()'
+
+
+class Always(ValidationPolicy):
+    """Validates every call, cache hits included"""
+
+
+class OnCacheMiss(ValidationPolicy):
+    """Validates only the calls that run the component, the default"""
+    on_cache_miss = True
+
+
+class FirstN(ValidationPolicy):
+    """Validates the first n calls, then trusts the component"""
+    n: int
+
+    def __init__(self, n: int):
+        if n < 0:
+            raise ValueError(f'n must be non negative. Found {n}')
+        self.n = n
+        self._calls = itertools.count()
+
+    def should_validate(self) -> bool:
+        return next(self._calls) < self.n
+
+    def copy(self) -> 'FirstN':
+        return self.__class__(self.n)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(n={self.n})'
+
+
+class Sampled(ValidationPolicy):
+    """Validates each call with probability rate"""
+    rate: float
+
+    def __init__(self, rate: float, seed: Optional[int] = None):
+        if not 0 <= rate <= 1:
+            raise ValueError(f'rate must be between 0 and 1. Found {rate}')
+        self.rate = rate
+        self.seed = seed
+        self._random = random.Random(seed).random
+
+    def should_validate(self) -> bool:
+        return self._random() < self.rate
+
+    def copy(self) -> 'Sampled':
+        return self.__class__(self.rate, self.seed)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(rate={self.rate})'
+
+
+def _type_check(spec) -> Optional[Tuple[type, ...]]:
+    """None when anything is accepted"""
+    if spec is None or spec is Any:
+        return None
+    if isinstance(spec, type):
+        return (spec,)
+    if isinstance(spec, tuple) and all(isinstance(t, type) for t in spec):
+        return spec
+    raise ValueError(f'Schema types must be a type, a tuple of types, Any or None. Found {spec!r}')
+
+
+class Schema:
+    """Declarative description of a PipelData, compiled once into a checker.
+
+    Positional types describe `args` (exactly that many are expected),
+    keyword types the required `kwargs`. A type can be a class, a tuple of
+    classes, `Any` or `None`. With `strict=True` no other kwargs are allowed.
+    ```python
+    Schema(int, (int, float), scale=float)
+    ```
+    The checker raises ValueError on the first mismatch.
+    """
+    args: Tuple[Any, ...]
+    kwargs: Dict[str, Any]
+    strict: bool
+
+    def __init__(self, *args, strict: bool = False, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        self.strict = strict
+        self._checker = None
+
+    def compile(self) -> Callable[[PipelData], None]:
+        if self._checker is not None:
+            return self._checker
+        n_args = len(self.args)
+        arg_checks = [(i, t) for i, t in enumerate(map(_type_check, self.args)) if t is not None]
+        kwarg_checks = [(k, _type_check(t)) for k, t in self.kwargs.items()]
+        names = frozenset(self.kwargs)
+        strict = self.strict
+
+        def checker(data: PipelData) -> None:
+            args = data.args
+            if len(args) != n_args:
+                raise ValueError(f'Expected {n_args} args, found {len(args)}')
+            for i, types in arg_checks:
+                if not isinstance(args[i], types):
+                    raise ValueError(f'args[{i}] must be {types}, found {type(args[i]).__name__}')
+            kwargs = data.kwargs
+            for name, types in kwarg_checks:
+                if name not in kwargs:
+                    raise ValueError(f'Missing kwarg {name!r}')
+                if types is not None and not isinstance(kwargs[name], types):
+                    raise ValueError(f'kwargs[{name!r}] must be {types}, found {type(kwargs[name]).__name__}')
+            if strict and len(kwargs) != len(names):
+                raise ValueError(f'Unexpected kwargs {sorted(kwargs.keys() - names)}')
+
+        self._checker = checker
+        return checker
+
+    def __call__(self, data: PipelData) -> None:
+        self.compile()(data)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(args={self.args!r}, kwargs={self.kwargs!r}, strict={self.strict})'
+
+
+__all__ = [
+    'ValidationPolicy',
+    'Always',
+    'OnCacheMiss',
+    'FirstN',
+    'Sampled',
+    'Schema'
+]